@@ -8,13 +8,14 @@ from django.http import HttpResponse
 from openpyxl import Workbook
 from openpyxl.worksheet.datavalidation import DataValidation
 from django.db.models import F, ExpressionWrapper, BooleanField, Q
-from django.db import transaction
 from datetime import date
-import pandas as pd
 
 from core.mixins import InstitutionalIsolationMixin
+from core.utils.upload_jobs import save_upload, upload_error_payload, wants_async
+from reports.result_cache import bump_report_version
 from ..models import Student, STUDENT_GENDERS
-from faculties.models import Program, Department
+from ..services.student_services import StudentService
+from ..tasks import process_graduate_upload
 
 # We'll use the existing Student models and serializers but build custom logic for graduates.
 class GraduateViewSet(InstitutionalIsolationMixin, viewsets.ViewSet):
@@ -37,6 +38,11 @@ class GraduateViewSet(InstitutionalIsolationMixin, viewsets.ViewSet):
             
         return queryset.filter(institution=user.institution)
 
+    def _students_changed(self):
+        # Queryset update()/delete() skip Student.save(): invalidate cached reports here
+        user = self.request.user
+        bump_report_version(Student, None if user.is_superuser else user.institution_id)
+
     @action(detail=False, methods=['get'], url_path='template')
     def download_template(self, request):
         """
@@ -116,6 +122,7 @@ class GraduateViewSet(InstitutionalIsolationMixin, viewsets.ViewSet):
                 graduation_year=grad_year, 
                 final_grade=final_grade
             )
+            self._students_changed()
             return Response({"message": f"Successfully graduated {count} students."})
         
         elif action_type == 'revert':
@@ -125,11 +132,13 @@ class GraduateViewSet(InstitutionalIsolationMixin, viewsets.ViewSet):
                 graduation_year=None, 
                 final_grade=None
             )
+            self._students_changed()
             return Response({"message": f"Successfully reverted {count} students back to Active status."})
         
         elif action_type == 'delete':
             # Keep delete but maybe restrict it?
             count, _ = queryset.delete()
+            self._students_changed()
             return Response({"message": f"Successfully deleted {count} records."})
         
         else:
@@ -149,117 +158,21 @@ class GraduateViewSet(InstitutionalIsolationMixin, viewsets.ViewSet):
         if not institution:
             return Response({"detail": "User is not associated with an institution."}, status=status.HTTP_403_FORBIDDEN)
 
-        try:
-            if file_obj.name.endswith('.csv'):
-                df = pd.read_csv(file_obj)
-            else:
-                df = pd.read_excel(file_obj)
-
-            # Standardize headers
-            df.columns = [str(c).strip().lower().replace(' ', '_') for c in df.columns]
-
-            # 1. Strict Column Validation
-            required_columns = [
-                'student_id', 'first_name', 'last_name', 
-                'gender', 'program_code', 'graduation_year', 'final_grade'
-            ]
-            
-            missing_cols = [col for col in required_columns if col not in df.columns]
-            if missing_cols:
-                return Response({
-                    "detail": "Invalid file format.", 
-                    "errors": [f"Missing required columns: {', '.join(missing_cols)}"]
-                }, status=status.HTTP_400_BAD_REQUEST)
-
-            # Cache programs by code
-            prog_cache = {
-                p.code.lower(): p 
-                for p in Program.objects.filter(department__faculty__institution=institution)
-            }
-
-            errors = []
-            updated_count = 0
-            created_count = 0
-
-            # 2. Row-by-Row Processing with Error Aggregation
-            with transaction.atomic():
-                for index, row in df.iterrows():
-                    row_num = index + 2  # Excel rows usually start at 1, +1 for header
-                    try:
-                        student_id = str(row.get('student_id', '')).strip()
-                        if not student_id or pd.isna(row.get('student_id')):
-                            errors.append(f"Row {row_num}: Student ID is empty.")
-                            continue
-
-                        grad_year = row.get('graduation_year')
-                        final_grade = str(row.get('final_grade', '')).strip()
-
-                        if pd.isna(grad_year) or not final_grade or final_grade.lower() == 'nan':
-                            errors.append(f"Row {row_num} (Student {student_id}): Graduation Year and Final Grade are required.")
-                            continue
-
-                        # Check if student exists in this institution
-                        student = self.get_queryset().filter(student_id=student_id).first()
-
-                        if student:
-                            # Update existing student
-                            student.status = 'Graduated'
-                            student.graduation_year = int(grad_year)
-                            student.final_grade = final_grade
-                            student.save()
-                            updated_count += 1
-                        else:
-                            # Create historical record
-                            prog_code = str(row.get('program_code', '')).strip().lower()
-                            program = prog_cache.get(prog_code)
-                            
-                            if not program:
-                                errors.append(f"Row {row_num} (Student {student_id}): Program code '{prog_code}' not found in your institution.")
-                                continue
-                                
-                            first_name = str(row.get('first_name', '')).strip()
-                            last_name = str(row.get('last_name', '')).strip()
-                            
-                            if not first_name or not last_name or first_name.lower() == 'nan' or last_name.lower() == 'nan':
-                                errors.append(f"Row {row_num} (Student {student_id}): First Name and Last Name are required for new records.")
-                                continue
-
-                            enrollment_year = row.get('enrollment_year')
-                            if pd.isna(enrollment_year):
-                                enrollment_year = int(grad_year) - program.duration
-
-                            Student.objects.create(
-                                institution=institution,
-                                student_id=student_id,
-                                national_id=row.get('national_id', ''),
-                                first_name=first_name,
-                                last_name=last_name,
-                                gender=row.get('gender', 'Other'),
-                                enrollment_year=enrollment_year,
-                                program=program,
-                                status='Graduated',
-                                graduation_year=int(grad_year),
-                                final_grade=final_grade
-                            )
-                            created_count += 1
-
-                    except Exception as e:
-                        errors.append(f"Row {row_num}: {str(e)}")
-
-                # 3. Fail the entire transaction if there are any errors
-                if errors:
-                    # Rollback the transaction intentionally
-                    raise ValidationError({"detail": "Bulk upload failed due to data errors.", "errors": errors})
+        if wants_async(request):
+            task = process_graduate_upload.delay(save_upload(file_obj, 'graduates'), institution.id)
+            return Response({"task_id": task.id}, status=status.HTTP_202_ACCEPTED)
 
+        try:
+            result = StudentService.bulk_graduate_from_file(file_obj, institution.id)
             return Response({
                 "message": f"Successfully processed graduates.",
-                "updated": updated_count,
-                "created": created_count
+                "updated": result["updated"],
+                "created": result["created"]
             }, status=status.HTTP_201_CREATED)
 
-        except ValidationError as e:
+        except DjangoValidationError as e:
             # Catch our intentional rollback
-            return Response(e.detail, status=status.HTTP_400_BAD_REQUEST)
+            return Response(upload_error_payload(e), status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
             return Response({"detail": "An unexpected error occurred reading the file.", "errors": [str(e)]}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
@@ -338,5 +251,6 @@ class GraduateViewSet(InstitutionalIsolationMixin, viewsets.ViewSet):
             graduation_year=expected_year,
             final_grade=default_grade
         )
+        self._students_changed()
 
         return Response({"message": f"Successfully graduated {count} students."})
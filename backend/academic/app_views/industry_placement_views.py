@@ -4,13 +4,15 @@ from ..models import IndustryPlacement
 from ..serializers.industry_placement_serializers import IndustryPlacementSerializer
 from rest_framework import filters
 from django_filters.rest_framework import DjangoFilterBackend
+from core.filters import BlindIndexSearchFilter
 
 class IndustryPlacementViewSet(viewsets.ModelViewSet):
     serializer_class = IndustryPlacementSerializer
     permission_classes = [IsAuthenticated]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, BlindIndexSearchFilter, filters.OrderingFilter]
     filterset_fields = ['placement_type', 'student', 'student__institution']
-    search_fields = ['company_name', 'student__first_name', 'student__last_name', 'student__student_id']
+    search_fields = ['company_name', 'student__student_id']
+    ngram_search_fields = ['student__name_tokens']
     ordering_fields = ['start_date', 'created_at']
     ordering = ['-start_date']
 
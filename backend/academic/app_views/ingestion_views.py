@@ -1,10 +1,32 @@
 import io
+from rest_framework import viewsets
+from rest_framework.decorators import action
+from rest_framework.pagination import Cursor
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.parsers import MultiPartParser
+from django.core.exceptions import ValidationError as DjangoValidationError
 from django.http import HttpResponse
+from django.urls import reverse
+
+from core.mixins import InstitutionalIsolationMixin
+from core.pagination import CreatedAtCursorPagination, KeysetCursorPagination
+from ..models import StagedUpload
+from ..serializers.ingestion_serializers import StagedUploadRowSerializer, StagedUploadSerializer
 from ..services.ingestion_service import IngestionService
 
+
+class StagedRowPagination(KeysetCursorPagination):
+    """Staged rows in sheet order (the row number is unique within an upload)."""
+    page_size = 100
+    ordering = 'row_number'
+
+    def link_after(self, url, row_number):
+        """Cursor link to the rows after `row_number`, for responses built outside the rows endpoint."""
+        self.base_url = url
+        return self.encode_cursor(Cursor(offset=0, reverse=False, position=str(row_number)))
+
+
 class TemplateDownloadView(APIView):
     def get(self, request, module_type):
         try:
@@ -43,8 +65,30 @@ class ValidateUploadView(APIView):
         file_path = default_storage.save(f'temp_{file.name}', file)
         
         try:
-            results = IngestionService.validate_upload(module_type, default_storage.path(file_path), institution_id)
-            return Response(results)
+            upload = IngestionService.stage_upload(
+                module_type,
+                default_storage.path(file_path),
+                institution_id,
+                uploaded_by=request.user if request.user.is_authenticated else None,
+                file_name=file.name,
+            )
+            if isinstance(upload, dict):
+                return Response(upload)
+
+            # Rows stay on the server: the first page here, the rest from ingestion/uploads/<id>/rows/
+            paginator = StagedRowPagination()
+            rows = list(upload.rows.all()[:paginator.page_size])
+            next_link = None
+            if upload.row_count > len(rows):
+                url = request.build_absolute_uri(reverse('staged-upload-rows', args=[upload.pk]))
+                next_link = paginator.link_after(url, rows[-1].row_number)
+            return Response({
+                "status": "success",
+                "message": f"Successfully processed {upload.row_count} rows.",
+                **StagedUploadSerializer(upload).data,
+                "processed_data": StagedUploadRowSerializer(rows, many=True).data,
+                "next": next_link,
+            })
         finally:
             os.remove(default_storage.path(file_path))
 
@@ -60,5 +104,59 @@ class CommitUploadView(APIView):
         if not institution_id:
             return Response({'error': 'Institution ID is required'}, status=400)
             
-        success_count = IngestionService.commit_upload(module_type, data, institution_id)
-        return Response({'success': True, 'imported': success_count})
\ No newline at end of file
+        result = IngestionService.commit_upload(module_type, data, institution_id)
+        return Response({'success': True, **result})
+
+
+class StagedUploadViewSet(InstitutionalIsolationMixin, viewsets.ReadOnlyModelViewSet):
+    """
+    Validated uploads staged by ValidateUploadView.
+
+    GET   uploads/<id>/         summary (row/error counts, status)
+    GET   uploads/<id>/rows/    rows in sheet order, paged; ?status=Error, ?outcome=Skipped
+    PATCH uploads/<id>/rows/    {"corrections": [{"row_number": 7, "data": {...}}]}: changed fields only
+    POST  uploads/<id>/commit/  import the valid rows; outcomes are then on the rows
+    """
+    queryset = StagedUpload.objects.all()
+    serializer_class = StagedUploadSerializer
+    institution_lookup_path = 'institution'
+    pagination_class = CreatedAtCursorPagination
+
+    @action(detail=True, methods=['get', 'patch'], url_path='rows')
+    def rows(self, request, pk=None):
+        upload = self.get_object()
+
+        if request.method == 'PATCH':
+            try:
+                rows = IngestionService.correct_staged_rows(upload, request.data.get('corrections'))
+            except DjangoValidationError as e:
+                return Response({"detail": " ".join(e.messages)}, status=400)
+            return Response({
+                **StagedUploadSerializer(upload).data,
+                "results": StagedUploadRowSerializer(rows, many=True).data,
+            })
+
+        rows = upload.rows.all()
+        for field in ('status', 'outcome'):
+            value = request.query_params.get(field)
+            if value:
+                rows = rows.filter(**{field: value})
+        paginator = StagedRowPagination()
+        page = paginator.paginate_queryset(rows, request, view=self)
+        return paginator.get_paginated_response({
+            **StagedUploadSerializer(upload).data,
+            "results": StagedUploadRowSerializer(page, many=True).data,
+        })
+
+    @action(detail=True, methods=['post'], url_path='commit')
+    def commit(self, request, pk=None):
+        upload = self.get_object()
+        try:
+            upload = IngestionService.commit_staged(upload.pk)
+        except DjangoValidationError as e:
+            return Response({"detail": " ".join(e.messages)}, status=400)
+        return Response({
+            'success': True,
+            'imported': upload.imported_count,
+            **StagedUploadSerializer(upload).data,
+        })
\ No newline at end of file
@@ -4,13 +4,15 @@ from ..models import InternationalMobility
 from ..serializers.mobility_serializers import InternationalMobilitySerializer
 from rest_framework import filters
 from django_filters.rest_framework import DjangoFilterBackend
+from core.filters import BlindIndexSearchFilter
 
 class InternationalMobilityViewSet(viewsets.ModelViewSet):
     serializer_class = InternationalMobilitySerializer
     permission_classes = [IsAuthenticated]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, BlindIndexSearchFilter, filters.OrderingFilter]
     filterset_fields = ['direction', 'country', 'student', 'student__institution']
-    search_fields = ['country', 'foreign_institution', 'student__first_name', 'student__last_name', 'student__student_id']
+    search_fields = ['country', 'foreign_institution', 'student__student_id']
+    ngram_search_fields = ['student__name_tokens']
     ordering_fields = ['country', 'created_at']
     ordering = ['-created_at']
 
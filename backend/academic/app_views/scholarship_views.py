@@ -4,13 +4,15 @@ from ..models import StudentScholarship
 from ..serializers.scholarship_serializers import StudentScholarshipSerializer
 from rest_framework import filters
 from django_filters.rest_framework import DjangoFilterBackend
+from core.filters import BlindIndexSearchFilter
 
 class StudentScholarshipViewSet(viewsets.ModelViewSet):
     serializer_class = StudentScholarshipSerializer
     permission_classes = [IsAuthenticated]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, BlindIndexSearchFilter, filters.OrderingFilter]
     filterset_fields = ['year_awarded', 'student', 'student__institution']
-    search_fields = ['provider_name', 'student__first_name', 'student__last_name', 'student__student_id']
+    search_fields = ['provider_name', 'student__student_id']
+    ngram_search_fields = ['student__name_tokens']
     ordering_fields = ['year_awarded', 'amount', 'created_at']
     ordering = ['-year_awarded', 'provider_name']
 
@@ -1,19 +1,24 @@
 from jsonschema import ValidationError
 from rest_framework import viewsets, status, filters, serializers
-from core.mixins import InstitutionalIsolationMixin
+from core.mixins import InstitutionalIsolationMixin, SparseQuerysetMixin
+from core.filters import BlindIndexSearchFilter, build_search_q
+from core.pagination import KeysetCursorPagination
+from core.utils.metrics import summarize
+from core.utils.upload_jobs import save_upload, wants_async
 from rest_framework.response import Response
 from rest_framework.decorators import action
 from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
 from django.core.exceptions import ValidationError as DjangoValidationError
-from django.db.models import Count, Q, Sum, F, DecimalField, ExpressionWrapper, BooleanField
+from django.db.models import Count, Q, F, DecimalField, ExpressionWrapper, BooleanField
 from django.db.models.functions import Coalesce
 from collections import OrderedDict
 from datetime import date
 
-from ..models import Student
+from ..models import Student, program_fee
 from ..serializers.student_serializers import StudentSerializer
 from ..services.student_services import StudentService
 from ..services.analysis_services import AnalysisService
+from ..tasks import process_student_upload
 from faculties.models import Program, PROGRAM_CATEGORIES # Import Program and its choices
 
 COLOR_MAP = {
@@ -28,22 +33,29 @@ COLOR_MAP = {
 # Define STEM categories from PROGRAM_CATEGORIES
 STEM_CATEGORIES = [choice[0] for choice in PROGRAM_CATEGORIES if choice[0] in ['STEM']] # Add more STEM categories as needed
 
-class StudentViewSet(InstitutionalIsolationMixin, viewsets.ModelViewSet):
+class StudentViewSet(SparseQuerysetMixin, InstitutionalIsolationMixin, viewsets.ModelViewSet):
     """
     ViewSet for managing Students.
+    List endpoints accept ?fields=a,b or ?omit=c,d to return (and fetch) fewer columns,
+    and ?ordering=-balance to rank by outstanding fees.
     """
     queryset = Student.objects.all()
     serializer_class = StudentSerializer
     institution_lookup_path = 'institution'
-    filter_backends = [filters.SearchFilter]
-    search_fields = ['first_name', 'last_name', 'student_id', 'national_id']
+    filter_backends = [BlindIndexSearchFilter, filters.OrderingFilter]
+    search_fields = ['student_id']
+    ordering_fields = ['id', 'balance']
+    blind_index_search_fields = ['national_id']
+    ngram_search_fields = ['name_tokens']
+    pagination_class = KeysetCursorPagination
     parser_classes = (MultiPartParser, FormParser, JSONParser)
 
     def get_queryset(self):
         """
         Optimize queries and calculate financial balances in one database call.
+        Joins and annotations are skipped when a sparse fieldset doesn't need them.
         """
-        queryset = super().get_queryset().select_related('institution', 'program')
+        queryset = super().get_queryset().select_related('institution')
 
         program_id = self.request.query_params.get('program_id') or self.request.query_params.get('program')
         if program_id:
@@ -84,18 +96,28 @@ class StudentViewSet(InstitutionalIsolationMixin, viewsets.ModelViewSet):
         if inclusivity:
             queryset = queryset.exclude(inclusivity_category__in=['None', '', None])
 
-        return queryset.annotate(
-            semester_fee=Coalesce(
-                F('program__semester_fee'),
-                0,
-                output_field=DecimalField()
-            ),
-            total_paid=Coalesce(
-                Sum('payments__amount'),
-                0,
-                output_field=DecimalField()
+        if self.wants_field('semester_fee'):
+            # Same price as the balance ledger
+            queryset = queryset.annotate(semester_fee=program_fee())
+        # Payment totals come from the one-to-one StudentBalance ledger, not a
+        # SUM over payments, so there is no GROUP BY on the student row.
+        if self.wants_field('total_paid'):
+            queryset = queryset.annotate(
+                total_paid=Coalesce(
+                    F('balance_ledger__total_paid'),
+                    0,
+                    output_field=DecimalField()
+                )
             )
-        )
+        if self.wants_field('balance') or 'balance' in self.request.query_params.get('ordering', ''):
+            # Never NULL, so the cursor can position on it (?ordering=-balance)
+            queryset = queryset.annotate(
+                balance=Coalesce(F('balance_ledger__balance'), 0, output_field=DecimalField())
+            )
+        if self.wants_field('last_payment_date'):
+            queryset = queryset.annotate(last_payment_date=F('balance_ledger__last_payment_date'))
+
+        return self.apply_sparse_fieldset(queryset)
 
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
@@ -139,6 +161,12 @@ class StudentViewSet(InstitutionalIsolationMixin, viewsets.ModelViewSet):
         if not institution_id and hasattr(request.user, 'institution'):
             institution_id = request.user.institution.id
 
+        if wants_async(request):
+            task = process_student_upload.delay(
+                save_upload(file_obj, 'students'), institution_id, confirm_creation=confirm_creation
+            )
+            return Response({"task_id": task.id}, status=status.HTTP_202_ACCEPTED)
+
         try:
             result = StudentService.bulk_create_from_file(file_obj, institution_id, confirm_creation=confirm_creation)
             if isinstance(result, dict) and result.get("requires_approval"):
@@ -232,191 +260,79 @@ class StudentViewSet(InstitutionalIsolationMixin, viewsets.ModelViewSet):
         wb.save(response)
         return response
 
-    @action(detail=False, methods=['get'], url_path='stem-students')
-    def stem_students(self, request):
+    def _category_list(self, request, queryset, search_fields=('student_id', 'program__name')):
+        """
+        Paged list of a student subset with its total/male/female headcounts.
+        Accepts ?institution_id= and ?search= like the main list. The three
+        counts come from one conditional-aggregation query (core.utils.metrics).
+        """
         institution_id = request.query_params.get('institution_id')
         search_query = request.query_params.get('search')
 
-        queryset = self.get_queryset().filter(
-            Q(program__categories__contains='STEM') |
-            Q(program__categories__contains=['STEM']) |
-            Q(program__category='STEM') |
-            Q(selected_category='STEM')
-        )
-
         if institution_id:
             queryset = queryset.filter(institution_id=institution_id)
         if search_query:
-            queryset = queryset.filter(
-                Q(first_name__icontains=search_query) |
-                Q(last_name__icontains=search_query) |
-                Q(student_id__icontains=search_query) |
-                Q(program__name__icontains=search_query)
-            )
-
-        total_students = queryset.count()
-        male_students = queryset.filter(gender='Male').count()
-        female_students = queryset.filter(gender='Female').count()
+            queryset = queryset.filter(build_search_q(
+                search_query,
+                blind_fields=self.blind_index_search_fields,
+                ngram_fields=self.ngram_search_fields,
+                plain_fields=list(search_fields),
+                queryset=queryset,
+            ))
+
+        summary = summarize(queryset)
+        totals = {
+            "total_students": summary['total'],
+            "male_students": summary['male'],
+            "female_students": summary['female'],
+        }
 
         page = self.paginate_queryset(queryset)
         if page is not None:
             serializer = self.get_serializer(page, many=True)
-            return self.get_paginated_response({
-                "total_students": total_students,
-                "male_students": male_students,
-                "female_students": female_students,
-                "results": serializer.data
-            })
+            return self.get_paginated_response({**totals, "results": serializer.data})
 
         serializer = self.get_serializer(queryset, many=True)
-        return Response({
-            "total_students": total_students,
-            "male_students": male_students,
-            "female_students": female_students,
-            "results": serializer.data
-        })
+        return Response({**totals, "results": serializer.data})
+
+    @action(detail=False, methods=['get'], url_path='stem-students')
+    def stem_students(self, request):
+        queryset = self.get_queryset().filter(
+            Q(program__categories__contains='STEM') |
+            Q(program__categories__contains=['STEM']) |
+            Q(program__category='STEM') |
+            Q(selected_category='STEM')
+        )
+        return self._category_list(request, queryset)
 
     @action(detail=False, methods=['get'], url_path='specialized-students')
     def specialized_students(self, request):
-        institution_id = request.query_params.get('institution_id')
-        search_query = request.query_params.get('search')
-
         queryset = self.get_queryset().filter(
             Q(program__is_specialized_skill=True) |
             Q(selected_category='SPECIALIZED')
         )
-
-        if institution_id:
-            queryset = queryset.filter(institution_id=institution_id)
-        if search_query:
-            queryset = queryset.filter(
-                Q(first_name__icontains=search_query) |
-                Q(last_name__icontains=search_query) |
-                Q(student_id__icontains=search_query) |
-                Q(program__name__icontains=search_query)
-            )
-
-        total_students = queryset.count()
-        male_students = queryset.filter(gender='Male').count()
-        female_students = queryset.filter(gender='Female').count()
-
-        page = self.paginate_queryset(queryset)
-        if page is not None:
-            serializer = self.get_serializer(page, many=True)
-            return self.get_paginated_response({
-                "total_students": total_students,
-                "male_students": male_students,
-                "female_students": female_students,
-                "results": serializer.data
-            })
-
-        serializer = self.get_serializer(queryset, many=True)
-        return Response({
-            "total_students": total_students,
-            "male_students": male_students,
-            "female_students": female_students,
-            "results": serializer.data
-        })
+        return self._category_list(request, queryset)
 
     @action(detail=False, methods=['get'], url_path='critical-students')
     def critical_students(self, request):
-        institution_id = request.query_params.get('institution_id')
-        search_query = request.query_params.get('search')
-
         queryset = self.get_queryset().filter(
             Q(program__is_critical_skill=True) |
             Q(selected_category='CRITICAL')
         )
-
-        if institution_id:
-            queryset = queryset.filter(institution_id=institution_id)
-        if search_query:
-            queryset = queryset.filter(
-                Q(first_name__icontains=search_query) |
-                Q(last_name__icontains=search_query) |
-                Q(student_id__icontains=search_query) |
-                Q(program__name__icontains=search_query)
-            )
-
-        total_students = queryset.count()
-        male_students = queryset.filter(gender='Male').count()
-        female_students = queryset.filter(gender='Female').count()
-
-        page = self.paginate_queryset(queryset)
-        if page is not None:
-            serializer = self.get_serializer(page, many=True)
-            return self.get_paginated_response({
-                "total_students": total_students,
-                "male_students": male_students,
-                "female_students": female_students,
-                "results": serializer.data
-            })
-
-        serializer = self.get_serializer(queryset, many=True)
-        return Response({
-            "total_students": total_students,
-            "male_students": male_students,
-            "female_students": female_students,
-            "results": serializer.data
-        })
+        return self._category_list(request, queryset)
 
     @action(detail=False, methods=['get'], url_path='inclusivity-report')
     def inclusivity_report(self, request):
-        institution_id = request.query_params.get('institution_id')
-        search_query = request.query_params.get('search')
         queryset = self.get_queryset().exclude(inclusivity_category__in=['None', '', None])
-
-        if institution_id:
-            queryset = queryset.filter(institution_id=institution_id)
-        if search_query:
-            queryset = queryset.filter(
-                Q(first_name__icontains=search_query) |
-                Q(last_name__icontains=search_query) |
-                Q(student_id__icontains=search_query) |
-                Q(program__name__icontains=search_query) |
-                Q(inclusivity_category__icontains=search_query)
-            )
-
-        total_students = queryset.count()
-        male_students = queryset.filter(gender='Male').count()
-        female_students = queryset.filter(gender='Female').count()
-
-        serializer = self.get_serializer(queryset, many=True)
-        return Response({
-            "total_students": total_students,
-            "male_students": male_students,
-            "female_students": female_students,
-            "results": serializer.data
-        })
+        return self._category_list(
+            request, queryset, search_fields=('student_id', 'program__name', 'inclusivity_category')
+        )
 
     @action(detail=False, methods=['get'], url_path='possible-graduates')
     def possible_graduates(self, request):
-        institution_id = request.query_params.get('institution_id')
-        search_query = request.query_params.get('search')
         # Logic for eligible but not graduated students
         queryset = self.get_queryset().filter(status='Active').exclude(graduation_year__isnull=False)
-
-        if institution_id:
-            queryset = queryset.filter(institution_id=institution_id)
-        if search_query:
-            queryset = queryset.filter(
-                Q(first_name__icontains=search_query) |
-                Q(last_name__icontains=search_query) |
-                Q(student_id__icontains=search_query) |
-                Q(program__name__icontains=search_query)
-            )
-
-        total_students = queryset.count()
-        male_students = queryset.filter(gender='Male').count()
-        female_students = queryset.filter(gender='Female').count()
-
-        serializer = self.get_serializer(queryset, many=True)
-        return Response({
-            "total_students": total_students,
-            "male_students": male_students,
-            "female_students": female_students,
-            "results": serializer.data
-        })
+        return self._category_list(request, queryset)
 
     @action(detail=False, methods=['get'], url_path='completion-stats')
     def completion_stats(self, request):
@@ -490,8 +406,6 @@ class StudentViewSet(InstitutionalIsolationMixin, viewsets.ModelViewSet):
         ).order_by('-graduation_year', 'program__name')
 
         # 2. FIX: Map the raw code to the human-readable label
-        # We need to import Program to get the choices
-        from faculties.models import Program
         category_map = dict(Program._meta.get_field('category').choices)
 
         for item in stats:
@@ -552,13 +466,18 @@ class StudentViewSet(InstitutionalIsolationMixin, viewsets.ModelViewSet):
             queryset = queryset.filter(student__institution_id=institution_id)
             
         if search_query:
-            queryset = queryset.filter(
-                Q(student__first_name__icontains=search_query) |
-                Q(student__last_name__icontains=search_query) |
-                Q(student__student_id__icontains=search_query) |
-                Q(from_institution__icontains=search_query) |
-                Q(to_institution__icontains=search_query)
-            )
+            queryset = queryset.filter(build_search_q(
+                search_query,
+                blind_fields=['student__national_id'],
+                ngram_fields=['student__name_tokens'],
+                plain_fields=['student__student_id', 'from_institution', 'to_institution'],
+                queryset=queryset,
+            ))
+
+        page = self.paginate_queryset(queryset.select_related('student'))
+        if page is not None:
+            serializer = InCountryTransferSerializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
 
         serializer = InCountryTransferSerializer(queryset, many=True)
         return Response({"results": serializer.data})
\ No newline at end of file
@@ -1,15 +1,17 @@
 from rest_framework import viewsets, filters
 from rest_framework.permissions import IsAuthenticated
 from django_filters.rest_framework import DjangoFilterBackend
+from core.filters import BlindIndexSearchFilter
 from ..models import InCountryTransfer
 from ..serializers.in_country_transfer_serializers import InCountryTransferSerializer
 
 class InCountryTransferViewSet(viewsets.ModelViewSet):
     serializer_class = InCountryTransferSerializer
     permission_classes = [IsAuthenticated]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, BlindIndexSearchFilter, filters.OrderingFilter]
     filterset_fields = ['student', 'student__institution']
-    search_fields = ['from_institution', 'to_institution', 'student__first_name', 'student__last_name', 'student__student_id']
+    search_fields = ['from_institution', 'to_institution', 'student__student_id']
+    ngram_search_fields = ['student__name_tokens']
     ordering_fields = ['transfer_date', 'id']
     ordering = ['-transfer_date']
 
@@ -0,0 +1,120 @@
+"""
+Management command to benchmark the bulk student upload (StudentService.bulk_create_from_file).
+
+Generates synthetic CSV files of the requested sizes, uploads each into a
+throwaway institution and reports rows/sec and the process's peak RSS.
+Every run is rolled back, so nothing is left in the database. Sizes run in
+ascending order: peak RSS is a high-water mark, so a flat figure across
+sizes means memory does not grow with the file.
+
+--loader compares the COPY loader (core.utils.copy_loader) with plain
+bulk_create() by toggling settings.BULK_UPLOAD_COPY.
+
+Usage:
+    python manage.py benchmark_student_upload
+    python manage.py benchmark_student_upload --rows 10000,100000,500000 --chunk-size 5000
+    python manage.py benchmark_student_upload --rows 100000 --loader both
+"""
+
+import csv
+import os
+import resource
+import tempfile
+import time
+
+from django.core.files import File
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test.utils import override_settings
+
+from academic.models import Institution
+from academic.services.student_services import StudentService
+from faculties.models import Department, Faculty, Program
+
+COLUMNS = [
+    'Student ID', 'First Name', 'Last Name', 'National ID', 'Gender', 'Date of Birth',
+    'Enrollment Year', 'Program Code', 'Status', 'Inclusivity Category',
+]
+
+
+class Command(BaseCommand):
+    help = 'Benchmark bulk student uploads: rows/sec and peak RSS for several file sizes'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rows',
+            type=str,
+            default='10000,100000,500000',
+            help='Comma-separated file sizes to test (default: 10000,100000,500000)',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=StudentService.UPLOAD_CHUNK_SIZE,
+            help=f'Rows read per chunk (default: {StudentService.UPLOAD_CHUNK_SIZE})',
+        )
+        parser.add_argument(
+            '--loader',
+            choices=['copy', 'orm', 'both'],
+            default='copy',
+            help='Insert path: COPY, bulk_create, or both for a comparison (default: copy)',
+        )
+
+    def handle(self, *args, **options):
+        sizes = sorted(int(n) for n in options['rows'].split(',') if n.strip())
+        chunk_size = options['chunk_size']
+        loaders = ['copy', 'orm'] if options['loader'] == 'both' else [options['loader']]
+
+        self.stdout.write(f"\n{'='*60}")
+        self.stdout.write(f"Bulk student upload, chunk size {chunk_size}")
+        self.stdout.write(f"Baseline RSS: {self._peak_rss_mb():,.0f} MB")
+        self.stdout.write(f"{'='*60}")
+        self.stdout.write(f"{'Rows':>10}{'Loader':>8}{'Seconds':>12}{'Rows/sec':>12}{'Peak RSS':>14}")
+
+        for size in sizes:
+            path = self._write_csv(size)
+            try:
+                for loader in loaders:
+                    with override_settings(BULK_UPLOAD_COPY=(loader == 'copy')):
+                        elapsed = self._run(path, chunk_size)
+                    self.stdout.write(
+                        f"{size:>10,}{loader:>8}{elapsed:>12.1f}{size / elapsed:>12,.0f}"
+                        f"{self._peak_rss_mb():>11,.0f} MB"
+                    )
+            finally:
+                os.unlink(path)
+
+    def _peak_rss_mb(self):
+        # ru_maxrss is in kilobytes on Linux
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+    def _write_csv(self, size):
+        handle, path = tempfile.mkstemp(suffix='.csv')
+        with os.fdopen(handle, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(COLUMNS)
+            for i in range(size):
+                writer.writerow([
+                    f"BENCH{i:07d}", f"FIRST{i % 997}", f"LAST{i % 991}", f"BN{i:08d}X",
+                    'Female' if i % 2 else 'Male', '2001-01-01', 2020 + i % 5, 'BENCH',
+                    'Active', 'None',
+                ])
+        return path
+
+    def _run(self, path, chunk_size):
+        with transaction.atomic():
+            institution = Institution.objects.create(
+                name='Upload Benchmark', type='Other', location='-', established=2000
+            )
+            faculty = Faculty.objects.create(institution=institution, name='BENCH FACULTY')
+            department = Department.objects.create(faculty=faculty, name='BENCH DEPARTMENT')
+            Program.objects.create(department=department, name='BENCH PROGRAM', code='BENCH')
+
+            with open(path, 'rb') as f:
+                started = time.perf_counter()
+                StudentService.bulk_create_from_file(
+                    File(f, name='benchmark.csv'), institution.id, chunk_size=chunk_size
+                )
+                elapsed = time.perf_counter() - started
+            transaction.set_rollback(True)
+        return elapsed
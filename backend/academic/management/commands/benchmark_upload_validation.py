@@ -0,0 +1,130 @@
+"""
+Management command to benchmark the validation stage of the bulk upload paths.
+
+Generates a synthetic sheet of the requested size and times:
+  * StudentService.bulk_create_from_file, pass 1 only: every row names a
+    program the institution does not have yet, so the call returns the
+    "requires approval" summary after validating and writes nothing.
+  * IngestionService.validate_upload for stem_students (Excel file).
+
+Both run inside a rolled-back transaction, so nothing is left in the database.
+
+Usage:
+    python manage.py benchmark_upload_validation
+    python manage.py benchmark_upload_validation --rows 100000
+"""
+
+import csv
+import os
+import tempfile
+import time
+
+from django.core.files import File
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from openpyxl import Workbook
+
+from academic.models import Institution
+from academic.services.ingestion_service import TEMPLATE_SCHEMAS, IngestionService
+from academic.services.student_services import StudentService
+
+STUDENT_COLUMNS = [
+    'Student ID', 'First Name', 'Last Name', 'National ID', 'Gender', 'Date of Birth',
+    'Enrollment Year', 'Program Code', 'Status', 'Inclusivity Category',
+]
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the validation stage of the bulk student upload and ingestion paths'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rows',
+            type=int,
+            default=100000,
+            help='Number of rows in the generated sheets (default: 100000)',
+        )
+
+    def handle(self, *args, **options):
+        size = options['rows']
+
+        self.stdout.write(f"\n{'='*60}")
+        self.stdout.write(f"Upload validation, {size:,} rows")
+        self.stdout.write(f"{'='*60}")
+        self.stdout.write(f"{'Path':<36}{'Seconds':>10}{'Rows/sec':>14}")
+
+        # ----- STUDENT UPLOAD (PASS 1) -----
+        path = self._write_student_csv(size)
+        try:
+            elapsed = self._run(self._validate_students, path)
+        finally:
+            os.unlink(path)
+        self._report('StudentService (CSV, pass 1)', size, elapsed)
+
+        # ----- INGESTION VALIDATE -----
+        path = self._write_ingestion_xlsx(size)
+        try:
+            elapsed = self._run(self._validate_ingestion, path)
+        finally:
+            os.unlink(path)
+        self._report('IngestionService.validate_upload', size, elapsed)
+
+    def _report(self, label, size, elapsed):
+        self.stdout.write(f"{label:<36}{elapsed:>10.1f}{size / elapsed:>14,.0f}")
+
+    def _run(self, validate, path):
+        with transaction.atomic():
+            institution = Institution.objects.create(
+                name='Validation Benchmark', type='Other', location='-', established=2000
+            )
+            started = time.perf_counter()
+            validate(path, institution.id)
+            elapsed = time.perf_counter() - started
+            transaction.set_rollback(True)
+        return elapsed
+
+    def _validate_students(self, path, institution_id):
+        with open(path, 'rb') as f:
+            result = StudentService.bulk_create_from_file(File(f, name='benchmark.csv'), institution_id)
+        assert result.get('requires_approval'), 'expected the validation pass to stop for approval'
+
+    def _validate_ingestion(self, path, institution_id):
+        result = IngestionService.validate_upload('stem_students', path, institution_id)
+        assert result['status'] == 'success', result.get('message')
+
+    def _write_student_csv(self, size):
+        handle, path = tempfile.mkstemp(suffix='.csv')
+        with os.fdopen(handle, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(STUDENT_COLUMNS)
+            for i in range(size):
+                writer.writerow([
+                    f"VBENCH{i:07d}", f"FIRST{i % 997}", f"LAST{i % 991}", f"VB{i:08d}X",
+                    'Female' if i % 2 else 'Male', '2001-01-01', 2020 + i % 5, f"VB{i % 20}",
+                    'Active', 'None',
+                ])
+        return path
+
+    def _write_ingestion_xlsx(self, size):
+        handle, path = tempfile.mkstemp(suffix='.xlsx')
+        os.close(handle)
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet()
+        schema = TEMPLATE_SCHEMAS['stem_students']
+        sheet.append([header for header, _ in schema.values()])
+        for i in range(size):
+            values = {
+                'student_id': f"VBENCH{i:07d}",
+                'national_id': f"VB{i:08d}X",
+                'first_name': f"First{i % 997}",
+                'last_name': f"Last{i % 991}",
+                'gender': 'Female' if i % 2 else 'Male',
+                'date_of_birth': '2001-01-01',
+                'enrollment_year': 2020 + i % 5,
+                'status': 'Active',
+                'program_code': f"VB{i % 20}",
+                'selected_level': 'Degree',
+            }
+            sheet.append([values.get(field) for field in schema])
+        workbook.save(path)
+        return path
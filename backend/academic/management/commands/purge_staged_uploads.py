@@ -0,0 +1,52 @@
+"""
+Management command to delete old staged ingestion uploads.
+
+ValidateUploadView keeps every validated sheet in StagedUpload /
+StagedUploadRow until it is committed, and keeps the row outcomes after
+that. Uploads that are never committed would stay forever, with the
+(encrypted) row data of the sheet, so run this periodically, e.g. daily
+from cron.
+
+Usage:
+    python manage.py purge_staged_uploads
+    python manage.py purge_staged_uploads --hours 72
+    python manage.py purge_staged_uploads --dry-run
+"""
+
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from academic.models import StagedUpload
+
+
+class Command(BaseCommand):
+    help = 'Delete staged ingestion uploads (and their rows) older than a cut-off'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--hours',
+            type=int,
+            default=24,
+            help='Delete uploads created more than this many hours ago (default: 24)',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only report how many uploads would be deleted',
+        )
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(hours=options['hours'])
+        uploads = StagedUpload.objects.filter(created_at__lt=cutoff)
+        count = uploads.count()
+
+        if options['dry_run']:
+            self.stdout.write(f"{count} staged uploads older than {options['hours']}h would be deleted.")
+            self.stdout.write(self.style.WARNING('\nThis was a dry run. Run without --dry-run to apply changes.'))
+            return
+
+        deleted, by_model = uploads.delete()
+        rows = by_model.get('academic.StagedUploadRow', 0)
+        self.stdout.write(self.style.SUCCESS(f"Deleted {count} staged uploads ({rows} rows)."))
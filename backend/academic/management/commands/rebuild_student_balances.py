@@ -0,0 +1,94 @@
+"""
+Management command to rebuild the StudentBalance fee ledger from Payment rows.
+
+Payment.save()/delete() keep the ledger current, but queryset-level writes
+(Payment.objects.filter(...).update/delete, bulk_create, raw SQL, restores)
+bypass them. This recomputes every ledger row, batch by batch in student
+primary key order, one transaction per batch.
+
+Usage:
+    python manage.py rebuild_student_balances
+    python manage.py rebuild_student_balances --dry-run
+    python manage.py rebuild_student_balances --institution 3
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import DecimalField, F, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+from academic.models import Payment, Student, StudentBalance, program_fee
+
+
+class Command(BaseCommand):
+    help = 'Recompute the per-student balance ledger (total paid, expected fee, balance) from payments'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only report how many ledger rows are missing or out of date',
+        )
+        parser.add_argument(
+            '--institution',
+            type=int,
+            help='Only rebuild students of one institution (ID)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Number of students per batch (default: 1000)',
+        )
+
+    def handle(self, *args, **options):
+        students = Student.objects.all()
+        if options.get('institution'):
+            students = students.filter(institution_id=options['institution'])
+
+        drifted = self._drifted(students).count()
+        self.stdout.write(f"\n{'='*50}")
+        self.stdout.write(f"Students: {students.count()}")
+        self.stdout.write(f"Ledger rows missing or out of date: {drifted}")
+        self.stdout.write(f"{'='*50}")
+
+        if options['dry_run']:
+            self.stdout.write(self.style.WARNING('\nThis was a dry run. Run without --dry-run to apply changes.'))
+            return
+
+        batch_size = options['batch_size']
+        last_pk = 0
+        rebuilt = 0
+        started = time.perf_counter()
+        while True:
+            ids = list(
+                students.filter(pk__gt=last_pk).order_by('pk').values_list('pk', flat=True)[:batch_size]
+            )
+            if not ids:
+                break
+            with transaction.atomic():
+                rebuilt += StudentBalance.objects.refresh(ids)
+            last_pk = ids[-1]
+            self.stdout.write(f"  Rebuilt {rebuilt} ledger rows...")
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"\nRebuilt {rebuilt} ledger rows in {elapsed:.1f}s ({drifted} were missing or out of date)"
+        ))
+
+    def _drifted(self, students):
+        """Students whose ledger row is missing or disagrees with their payments/program fee."""
+        paid = (
+            Payment.objects.filter(student=OuterRef('pk'))
+            .values('student').annotate(total=Sum('amount')).values('total')
+        )
+        return students.annotate(
+            paid=Coalesce(Subquery(paid), Value(0), output_field=DecimalField()),
+            fee=program_fee(),
+        ).filter(
+            Q(balance_ledger__isnull=True)
+            | ~Q(balance_ledger__total_paid=F('paid'))
+            | ~Q(balance_ledger__expected_fee=F('fee'))
+        )
@@ -1,6 +1,15 @@
-from django.db import models
+import uuid
+from decimal import Decimal
+
+from django.contrib.postgres.indexes import GinIndex
+from django.db import models, transaction
+from django.db.models import DecimalField, F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, Greatest
 from django.conf import settings
-from core.fields import EncryptedTextField   # 🔐 Custom AES-256 encrypted field
+from django.utils import timezone
+from core.fields import EncryptedTextField, BlindIndexField, NgramIndexField   # 🔐 Custom AES-256 encrypted field
+from core.managers import EncryptedManager
+from reports.result_cache import bump_report_version
 
 
 # --- CHOICES ---
@@ -138,11 +147,20 @@ class Student(models.Model):
     student_id = models.CharField(max_length=50, unique=True)
 
     # 🔐 ENCRYPTED FIELDS
-    national_id = EncryptedTextField(unique=True, null=True, blank=True)
+    # Uniqueness is enforced on national_id_bidx: random-IV ciphertexts are never equal
+    national_id = EncryptedTextField(null=True, blank=True)
     first_name = EncryptedTextField()
     last_name = EncryptedTextField()
     date_of_birth = EncryptedTextField(null=True, blank=True)
 
+    # 🔎 BLIND INDEXES (keyed digests used for search / exact lookups)
+    national_id_bidx = BlindIndexField(source_field='national_id', unique=True)
+    first_name_bidx = BlindIndexField(source_field='first_name')
+    last_name_bidx = BlindIndexField(source_field='last_name')
+    date_of_birth_bidx = BlindIndexField(source_field='date_of_birth')
+    # Partial-name search (prefixes / fragments of first or last name)
+    name_tokens = NgramIndexField(source_fields=['first_name', 'last_name'])
+
     gender = models.CharField(max_length=10, choices=STUDENT_GENDERS)
     enrollment_year = models.PositiveIntegerField()
     enrollment_semester = models.CharField(max_length=20, choices=STUDENT_SEMESTERS, default='Semester 1')
@@ -296,6 +314,15 @@ class Student(models.Model):
         blank=True
     )
 
+    # Encrypted fields are decrypted on first access, not on load
+    objects = EncryptedManager()
+
+    class Meta:
+        base_manager_name = 'objects'
+        indexes = [
+            GinIndex(fields=['name_tokens'], name='student_name_tokens_gin'),
+        ]
+
     @property
     def full_name(self):
         return f"{self.first_name} {self.last_name}"
@@ -309,12 +336,40 @@ class Student(models.Model):
             self.first_name = self.first_name.upper()
         if self.last_name:
             self.last_name = self.last_name.upper()
+        adding = self._state.adding
         super().save(*args, **kwargs)
 
+        update_fields = kwargs.get('update_fields')
+        if adding:
+            StudentBalance.objects.refresh([self.pk])
+        elif update_fields is None or 'program' in update_fields:
+            StudentBalance.objects.sync_expected_fee(student_id=self.pk)
+        bump_report_version(self, self.institution_id)
+
+    def delete(self, *args, **kwargs):
+        institution_id = self.institution_id
+        result = super().delete(*args, **kwargs)
+        bump_report_version(self, institution_id)
+        return result
+
     def __str__(self):
         return f"{self.full_name} ({self.student_id})"
 
 
+def program_fee(prefix='program__'):
+    """
+    Semester fee of a program as a query expression: its FeeStructure (set by
+    the update-program-fees endpoint) when it has one, else Program.semester_fee.
+    `prefix` is the lookup path to the program, e.g. 'student__program__'.
+    """
+    return Coalesce(
+        F(f'{prefix}fees__semester_fee'),
+        F(f'{prefix}semester_fee'),
+        Value(Decimal('0')),
+        output_field=DecimalField(),
+    )
+
+
 class FeeStructure(models.Model):
     program = models.OneToOneField('faculties.Program', on_delete=models.CASCADE, related_name='fees')
     semester_fee = models.DecimalField(max_digits=12, decimal_places=2, default=0.00)
@@ -322,6 +377,18 @@ class FeeStructure(models.Model):
     def __str__(self):
         return f"{self.program.name} - {self.semester_fee}"
 
+    def save(self, *args, **kwargs):
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            # Re-price the balance ledgers of the program's students
+            StudentBalance.objects.sync_expected_fee(student__program_id=self.program_id)
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            result = super().delete(*args, **kwargs)
+            StudentBalance.objects.sync_expected_fee(student__program_id=self.program_id)
+        return result
+
 
 class Payment(models.Model):
     student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name='payments')
@@ -333,6 +400,137 @@ class Payment(models.Model):
     def __str__(self):
         return f"{self.student.student_id} - {self.amount}"
 
+    def save(self, *args, **kwargs):
+        # The student's ledger row is adjusted in the same transaction
+        with transaction.atomic():
+            previous = None
+            if not self._state.adding and self.pk:
+                previous = (
+                    Payment.objects.select_for_update()
+                    .filter(pk=self.pk)
+                    .values_list('student_id', 'amount')
+                    .first()
+                )
+            super().save(*args, **kwargs)
+
+            amount = Decimal(str(self.amount))
+            if previous is None:
+                StudentBalance.objects.apply_payment(self.student_id, amount, self.date_paid)
+            elif previous[0] == self.student_id:
+                StudentBalance.objects.apply_payment(self.student_id, amount - previous[1])
+            else:
+                StudentBalance.objects.apply_payment(previous[0], -previous[1])
+                StudentBalance.objects.apply_payment(self.student_id, amount)
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            result = super().delete(*args, **kwargs)
+            StudentBalance.objects.apply_payment(self.student_id, -Decimal(str(self.amount)))
+        return result
+
+
+class StudentBalanceManager(models.Manager):
+
+    def _expected_fee(self):
+        fee = Student.objects.filter(pk=OuterRef('student_id')).values(fee=program_fee())[:1]
+        return Coalesce(Subquery(fee), Value(Decimal('0')), output_field=DecimalField())
+
+    def refresh(self, student_ids):
+        """Recompute the ledger rows of the given students from their payments (upsert)."""
+        student_ids = list(student_ids)
+        if not student_ids:
+            return 0
+        payments = Payment.objects.filter(student=OuterRef('pk'))
+        rows = Student.objects.filter(pk__in=student_ids).annotate(
+            fee=program_fee(),
+            paid=Coalesce(
+                Subquery(payments.values('student').annotate(total=Sum('amount')).values('total')),
+                Value(Decimal('0')),
+                output_field=DecimalField(),
+            ),
+            last_paid=Subquery(payments.order_by('-date_paid').values('date_paid')[:1]),
+        ).values_list('pk', 'fee', 'paid', 'last_paid')
+
+        ledgers = [
+            StudentBalance(
+                student_id=pk,
+                total_paid=paid,
+                expected_fee=fee,
+                balance=fee - paid,
+                last_payment_date=last_paid,
+            )
+            for pk, fee, paid, last_paid in rows
+        ]
+        self.bulk_create(
+            ledgers,
+            update_conflicts=True,
+            unique_fields=['student'],
+            update_fields=['total_paid', 'expected_fee', 'balance', 'last_payment_date', 'updated_at'],
+        )
+        return len(ledgers)
+
+    def apply_payment(self, student_id, amount, date_paid=None):
+        """
+        Add `amount` (negative for a removal) to a student's ledger.
+
+        total_paid/balance are adjusted with F() expressions, so concurrent
+        payments for the same student never overwrite each other. Without a
+        date_paid (updates, deletes) the last payment date is re-read.
+        """
+        if date_paid is None:
+            last_paid = Subquery(
+                Payment.objects.filter(student_id=OuterRef('student_id'))
+                .order_by('-date_paid').values('date_paid')[:1]
+            )
+        else:
+            paid_on = Value(date_paid, output_field=models.DateField())
+            last_paid = Greatest(Coalesce(F('last_payment_date'), paid_on), paid_on)
+
+        updated = self.filter(student_id=student_id).update(
+            total_paid=F('total_paid') + amount,
+            balance=F('balance') - amount,
+            last_payment_date=last_paid,
+            updated_at=timezone.now(),
+        )
+        if not updated:
+            self.refresh([student_id])
+
+    def sync_expected_fee(self, **filters):
+        """Re-read the program fee for matching ledgers (program changed or re-priced)."""
+        fee = self._expected_fee()
+        updated = self.filter(**filters).update(
+            expected_fee=fee,
+            balance=fee - F('total_paid'),
+            updated_at=timezone.now(),
+        )
+        if not updated and 'student_id' in filters:
+            self.refresh([filters['student_id']])
+        return updated
+
+
+class StudentBalance(models.Model):
+    """
+    Denormalized fee ledger, one row per student.
+
+    Kept in step by Payment.save()/delete(), Student.save(), Program.save() and
+    FeeStructure.save()/delete() (fees are priced by program_fee()), so student lists and arrears rankings read a single indexed column instead
+    of summing payments per request. Queryset-level bulk writes bypass those
+    hooks; `manage.py rebuild_student_balances` recomputes every row.
+    """
+    student = models.OneToOneField(
+        Student, on_delete=models.CASCADE, primary_key=True, related_name='balance_ledger'
+    )
+    total_paid = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    expected_fee = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    balance = models.DecimalField(max_digits=12, decimal_places=2, default=0, db_index=True)
+    last_payment_date = models.DateField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = StudentBalanceManager()
+
+    def __str__(self):
+        return f"{self.student_id}: {self.balance}"
+
 # --- PHASE 2 SATELLITE MODULES ---
 
 PLACEMENT_TYPES = [
@@ -349,6 +547,17 @@ class IndustryPlacement(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # Cached dynamic reports (reports.result_cache) read these
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        bump_report_version(self, self.student.institution_id)
+
+    def delete(self, *args, **kwargs):
+        institution_id = self.student.institution_id
+        result = super().delete(*args, **kwargs)
+        bump_report_version(self, institution_id)
+        return result
+
     def __str__(self):
         return f"{self.student.student_id} - {self.placement_type} at {self.company_name}"
 
@@ -364,6 +573,17 @@ class StudentScholarship(models.Model):
     class Meta:
         ordering = ['-year_awarded', 'provider_name']
 
+    # Cached dynamic reports (reports.result_cache) read these
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        bump_report_version(self, self.student.institution_id)
+
+    def delete(self, *args, **kwargs):
+        institution_id = self.student.institution_id
+        result = super().delete(*args, **kwargs)
+        bump_report_version(self, institution_id)
+        return result
+
     def __str__(self):
         return f"{self.student.student_id} - {self.provider_name} ({self.year_awarded})"
 
@@ -380,6 +600,17 @@ class InternationalMobility(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # Cached dynamic reports (reports.result_cache) read these
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        bump_report_version(self, self.student.institution_id)
+
+    def delete(self, *args, **kwargs):
+        institution_id = self.student.institution_id
+        result = super().delete(*args, **kwargs)
+        bump_report_version(self, institution_id)
+        return result
+
     def __str__(self):
         return f"{self.student.student_id} - {self.direction} ({self.country})"
 
@@ -395,3 +626,59 @@ class InCountryTransfer(models.Model):
     def __str__(self):
         return f"{self.student.student_id}: {self.from_institution} -> {self.to_institution} ({self.transfer_date})"
 
+
+
+class StagedUpload(models.Model):
+    """
+    A validated ingestion sheet waiting to be committed.
+
+    ValidateUploadView parses the file once and stores every row here, so the
+    client pages through the results, sends corrections for individual rows
+    and commits by id instead of posting the whole sheet back (see
+    IngestionService.stage_upload / correct_staged_rows / commit_staged).
+    """
+    STATUSES = [
+        ('Validated', 'Validated'),
+        ('Committed', 'Committed'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    module_type = models.CharField(max_length=50)
+    institution = models.ForeignKey(
+        Institution, on_delete=models.CASCADE, null=True, blank=True, related_name='staged_uploads'
+    )
+    uploaded_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name='staged_uploads'
+    )
+    file_name = models.CharField(max_length=255, blank=True)
+    status = models.CharField(max_length=20, choices=STATUSES, default='Validated')
+    row_count = models.PositiveIntegerField(default=0)
+    error_count = models.PositiveIntegerField(default=0)
+    imported_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    committed_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.module_type} upload {self.id} ({self.status})"
+
+
+class StagedUploadRow(models.Model):
+    upload = models.ForeignKey(StagedUpload, on_delete=models.CASCADE, related_name='rows')
+    row_number = models.PositiveIntegerField()
+    status = models.CharField(max_length=10)  # Success / Error, as returned by validate_upload
+    messages = models.JSONField(default=list)
+    # JSON of the validated values; student sheets carry names and national IDs
+    data = EncryptedTextField()
+    # Created / Updated / Skipped once the upload is committed
+    outcome = models.CharField(max_length=10, blank=True)
+    outcome_message = models.TextField(blank=True)
+
+    class Meta:
+        ordering = ['row_number']
+        unique_together = ('upload', 'row_number')
+        indexes = [
+            models.Index(fields=['upload', 'status'], name='staged_row_upload_status'),
+        ]
+
+    def __str__(self):
+        return f"Row {self.row_number} of {self.upload_id}"
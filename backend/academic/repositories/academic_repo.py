@@ -3,6 +3,7 @@
 from ..models import Student, Institution,  Facility
 from django.db import transaction
 from faculties.models import Program
+from core.filters import blind_index_q
 
 class BaseRepository:
     """
@@ -40,7 +41,7 @@ class StudentRepository(BaseRepository):
         super().__init__(Student)
     
     def get_by_national_id(self, national_id):
-        return self.model.objects.filter(national_id=national_id).first()
+        return self.model.objects.filter(blind_index_q('national_id', national_id)).first()
     
     def check_student_id_exists(self, student_id):
         return self.model.objects.filter(student_id=student_id).exists()
@@ -0,0 +1,36 @@
+import json
+
+from rest_framework import serializers
+from ..models import StagedUpload, StagedUploadRow
+
+
+class StagedUploadSerializer(serializers.ModelSerializer):
+    upload_id = serializers.UUIDField(source='id', read_only=True)
+
+    class Meta:
+        model = StagedUpload
+        fields = [
+            'upload_id',
+            'module_type',
+            'institution',
+            'file_name',
+            'status',
+            'row_count',
+            'error_count',
+            'imported_count',
+            'created_at',
+            'committed_at'
+        ]
+        read_only_fields = fields
+
+
+class StagedUploadRowSerializer(serializers.ModelSerializer):
+    data = serializers.SerializerMethodField()
+
+    class Meta:
+        model = StagedUploadRow
+        fields = ['row_number', 'status', 'messages', 'data', 'outcome', 'outcome_message']
+        read_only_fields = fields
+
+    def get_data(self, obj):
+        return json.loads(obj.data)
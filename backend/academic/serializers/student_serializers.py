@@ -1,22 +1,27 @@
 from rest_framework import serializers
+from core.serializers import SparseFieldsetMixin
+from faculties.hierarchy import get_hierarchy
 from ..models import Student
 
 
-class StudentSerializer(serializers.ModelSerializer):
+class StudentSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     # =====================
     # Read-only display fields
     # =====================
     institution_name = serializers.CharField(source='institution.name', read_only=True)
     type = serializers.CharField(source='institution.type', read_only=True)
-    faculty_name = serializers.CharField(source='faculty.name', read_only=True)
-    department_name = serializers.CharField(source='department.name', read_only=True)
-    program_name = serializers.CharField(source='program.name', read_only=True)
-    program_categories = serializers.JSONField(source='program.categories', read_only=True)
+    # Resolved from the institution's cached hierarchy (faculties.hierarchy)
+    faculty_name = serializers.SerializerMethodField()
+    department_name = serializers.SerializerMethodField()
+    program_name = serializers.SerializerMethodField()
+    program_categories = serializers.SerializerMethodField()
     full_name = serializers.CharField(read_only=True)
     student_id_number = serializers.CharField(source='student_id', read_only=True)
 
     semester_fee = serializers.DecimalField(max_digits=12, decimal_places=2, read_only=True)
     total_paid = serializers.DecimalField(max_digits=12, decimal_places=2, read_only=True)
+    balance = serializers.DecimalField(max_digits=12, decimal_places=2, read_only=True)
+    last_payment_date = serializers.DateField(read_only=True)
 
     # Custom Program Auto-creation Fields
     new_program_code = serializers.CharField(required=False, write_only=True, allow_null=True, allow_blank=True)
@@ -83,6 +88,8 @@ class StudentSerializer(serializers.ModelSerializer):
             'inclusivity_category',
             'semester_fee',
             'total_paid',
+            'balance',
+            'last_payment_date',
             'is_iseop',
             'new_program_code',
             'new_program_name',
@@ -91,6 +98,48 @@ class StudentSerializer(serializers.ModelSerializer):
             'student_id_number',
         ]
         read_only_fields = ['created_at', 'updated_at', 'full_name']
+        # Model columns read by computed fields, for ?fields= / ?omit= querysets
+        sparse_field_dependencies = {
+            'full_name': ['first_name', 'last_name'],
+            'faculty_name': ['faculty_id', 'institution_id'],
+            'department_name': ['department_id', 'institution_id'],
+            'program_name': ['program_id', 'institution_id'],
+            'program_categories': ['program_id', 'institution_id'],
+        }
+
+    # =====================
+    # Hierarchy names
+    # =====================
+    def _hierarchy(self, obj):
+        # One snapshot per institution for the whole (list) serialization
+        hierarchies = self.context.setdefault('_hierarchies', {})
+        if obj.institution_id not in hierarchies:
+            hierarchies[obj.institution_id] = get_hierarchy(obj.institution_id)
+        return hierarchies[obj.institution_id]
+
+    def get_faculty_name(self, obj):
+        if obj.faculty_id is None:
+            return None
+        node = self._hierarchy(obj).faculties.get(obj.faculty_id)
+        return node.name if node else obj.faculty.name
+
+    def get_department_name(self, obj):
+        if obj.department_id is None:
+            return None
+        node = self._hierarchy(obj).departments.get(obj.department_id)
+        return node.name if node else obj.department.name
+
+    def get_program_name(self, obj):
+        if obj.program_id is None:
+            return None
+        node = self._hierarchy(obj).programs.get(obj.program_id)
+        return node.name if node else obj.program.name
+
+    def get_program_categories(self, obj):
+        if obj.program_id is None:
+            return None
+        node = self._hierarchy(obj).programs.get(obj.program_id)
+        return list(node.categories) if node else obj.program.categories
 
     # =====================
     # Conditional validation
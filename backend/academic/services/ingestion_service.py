@@ -1,8 +1,16 @@
+import json
+
 import pandas as pd
 from openpyxl import Workbook
 from openpyxl.worksheet.datavalidation import DataValidation
-from django.db import models
+from django.core.exceptions import ValidationError
+from django.db import models, transaction
+from django.utils import timezone
 from academic.models import Student
+from core.fields import BlindIndexField, NgramIndexField
+from core.utils.upload_validation import RowErrors, clean_text, to_date, to_float, to_int
+from faculties.hierarchy import bump_hierarchy_version, get_hierarchy
+from reports.result_cache import bump_report_version
 from faculties.models import Faculty, FACULTY_STATUSES, Department, PROGRAM_LEVELS, PROGRAM_CATEGORIES, PROGRAM_TYPES, Program # Import Department, Program, and Program choices
 
 # Define templates for each module
@@ -116,7 +124,55 @@ TEMPLATE_SCHEMAS = {
     }
 }
 
+class InstitutionLookups:
+    """
+    An institution's program codes, student IDs and faculty/department names
+    as in-memory sets for validating one upload, so checking a 20k-row sheet
+    costs a few queries and an O(1) membership test per row. Codes and names
+    come from the shared hierarchy cache (faculties.hierarchy); student IDs
+    are loaded with one query; both only when first needed.
+    """
+
+    def __init__(self, institution_id):
+        self.institution_id = institution_id
+        self._hierarchy = None
+        self._student_ids = None
+
+    @property
+    def hierarchy(self):
+        if self._hierarchy is None:
+            self._hierarchy = get_hierarchy(self.institution_id)
+        return self._hierarchy
+
+    def program_codes(self):
+        """Lower-cased program codes."""
+        return set(self.hierarchy.program_by_code)
+
+    def student_ids(self, student_ids):
+        """IDs among `student_ids` (upper-cased, as stored) registered at the institution."""
+        if self._student_ids is None:
+            self._student_ids = set(Student.objects.filter(
+                student_id__in=set(student_ids) - {''}, institution_id=self.institution_id
+            ).values_list('student_id', flat=True))
+        return self._student_ids
+
+    def faculty_names(self):
+        """Lower-cased faculty names (matched case-insensitively, like commit_upload)."""
+        return set(self.hierarchy.faculty_by_name)
+
+    def department_names(self):
+        """Lower-cased (faculty name, department name) pairs."""
+        faculties = self.hierarchy.faculties
+        return {
+            (faculties[faculty_id].name.strip().lower(), name)
+            for faculty_id, name in self.hierarchy.department_by_name
+        }
+
+
 class IngestionService:
+    STUDENT_RECORD_MODULES = ['placements', 'scholarships', 'mobility', 'inclusivity', 'possible_graduates', 'in_country_transfers']
+    STUDENT_MODULES = ['stem_students', 'specialized_students', 'critical_students']
+
     @staticmethod
     def generate_template(module_type: str):
         """Generates an Excel template with dropdown validation."""
@@ -200,93 +256,11 @@ class IngestionService:
             raise ValueError(f"Unknown module type for validation: {module_type}")
 
         try:
-            df = pd.read_excel(file_path)
+            df = pd.read_excel(file_path, dtype=str)
         except Exception as e:
             return {"status": "error", "message": f"Failed to read Excel file: {e}"}
 
-        processed_data = []
-        # Map Excel headers to internal field names
-        header_map = {v[0]: k for k, v in schema.items()}
-
-        for index, row in df.iterrows():
-            row_data = {}
-            errors = []
-            status = "Success"
-
-            for excel_header, internal_field_name in header_map.items():
-                value = row.get(excel_header)
-                is_required = schema[internal_field_name][1]
-
-                if pd.isna(value) or value == '':
-                    if is_required:
-                        errors.append(f"Missing required field: {excel_header}")
-                        status = "Error"
-                    row_data[internal_field_name] = None
-                else:
-                    # Basic type conversion/validation
-                    if internal_field_name in ['start_date', 'end_date', 'year_awarded']:
-                        try:
-                            # Attempt to convert to date string or year int
-                            if internal_field_name == 'year_awarded':
-                                row_data[internal_field_name] = int(value)
-                            else:
-                                row_data[internal_field_name] = pd.to_datetime(value).strftime('%Y-%m-%d')
-                        except ValueError:
-                            errors.append(f"Invalid date format for {excel_header}. Use YYYY-MM-DD.")
-                            status = "Error"
-                    elif internal_field_name == 'amount':
-                        try:
-                            row_data[internal_field_name] = float(value)
-                        except ValueError:
-                            errors.append(f"Invalid amount for {excel_header}. Must be a number.")
-                            status = "Error"
-                    else:
-                        row_data[internal_field_name] = str(value).strip()
-            
-            # Additional validation specific to module types
-            if module_type == 'faculties':
-                # Validate status choices
-                if 'status' in row_data and row_data['status']:
-                    valid_statuses = [choice[0] for choice in FACULTY_STATUSES]
-                    if row_data['status'] not in valid_statuses:
-                        errors.append(f"Invalid status: {row_data['status']}. Must be one of {', '.join(valid_statuses)}.")
-                        status = "Error"
-            elif module_type == 'facilities':
-                if 'status' in row_data and row_data['status']:
-                    valid_statuses = ["Active", "Maintenance", "Closed"]
-                    if row_data['status'] not in valid_statuses:
-                        errors.append(f"Invalid status: {row_data['status']}. Must be one of {', '.join(valid_statuses)}.")
-                        status = "Error"
-                if 'capacity' in row_data and row_data['capacity']:
-                    try:
-                        row_data['capacity'] = int(row_data['capacity'])
-                    except ValueError:
-                        errors.append(f"Invalid capacity. Must be an integer.")
-                        status = "Error"
-                if 'current_usage' in row_data and row_data['current_usage']:
-                    try:
-                        row_data['current_usage'] = int(row_data['current_usage'])
-                    except ValueError:
-                        errors.append(f"Invalid current usage. Must be an integer.")
-                        status = "Error"
-            elif module_type in ['stem_students', 'specialized_students', 'critical_students']:
-                program_code = row_data.get('program_code')
-                if program_code:
-                    program_exists = Program.objects.filter(code=program_code, department__faculty__institution_id=institution_id).exists()
-                    if not program_exists:
-                        errors.append(f"Program with code '{program_code}' not found in this institution.")
-                        status = "Error"
-                
-            processed_data.append({
-                "row_number": index + 2, # Excel rows are 1-based, and +1 for header
-                "status": status,
-                "messages": errors,
-                "data": row_data
-            })
-        
-        # In a real scenario, you'd check for student existence here
-        # For now, we'll assume student_id only needs basic presence check.
-        # Student linking is done in commit_upload.
+        processed_data = IngestionService.validate_frame(module_type, df, institution_id)
 
         return {
             "status": "success",
@@ -294,161 +268,576 @@ class IngestionService:
             "processed_data": processed_data
         }
 
+    @staticmethod
+    def validate_frame(module_type: str, df, institution_id: int = None):
+        """
+        Validates a DataFrame of sheet text (template headers as columns).
+        Row numbers are the index + 2, i.e. spreadsheet rows under the header.
+        """
+        schema = TEMPLATE_SCHEMAS[module_type]
+        lookups = InstitutionLookups(institution_id)
+
+        # Column-wise: one pass per schema field, one boolean error column per check
+        columns = {}
+        row_errors = RowErrors(df.index)
+        for internal_field_name, (excel_header, is_required) in schema.items():
+            text = clean_text(df, excel_header)
+            missing = text == ''
+            if is_required:
+                row_errors.add(missing, f"Missing required field: {excel_header}")
+
+            # Basic type conversion/validation
+            if internal_field_name == 'year_awarded':
+                values, invalid = to_int(text)
+                row_errors.add(invalid, f"Invalid date format for {excel_header}. Use YYYY-MM-DD.")
+            elif internal_field_name in ['start_date', 'end_date']:
+                values, invalid = to_date(text)
+                row_errors.add(invalid, f"Invalid date format for {excel_header}. Use YYYY-MM-DD.")
+            elif internal_field_name == 'amount':
+                values, invalid = to_float(text)
+                row_errors.add(invalid, f"Invalid amount for {excel_header}. Must be a number.")
+            else:
+                values = text.where(~missing, None)
+            columns[internal_field_name] = values
+
+        data = pd.DataFrame(columns, index=df.index)
+
+        # Additional validation specific to module types
+        if module_type in ['faculties', 'facilities']:
+            if module_type == 'faculties':
+                valid_statuses = [choice[0] for choice in FACULTY_STATUSES]
+            else:
+                valid_statuses = ["Active", "Maintenance", "Closed"]
+            row_errors.add(
+                data['status'].notna() & ~data['status'].isin(valid_statuses),
+                "Invalid status: " + data['status'].fillna('') + f". Must be one of {', '.join(valid_statuses)}.",
+            )
+        if module_type == 'facilities':
+            for field, label in [('capacity', 'capacity'), ('current_usage', 'current usage')]:
+                text = data[field].fillna('')
+                data[field], invalid = to_int(text)
+                data[field] = data[field].where(text != '', None)
+                row_errors.add(invalid, f"Invalid {label}. Must be an integer.")
+        elif module_type in ['stem_students', 'specialized_students', 'critical_students']:
+            row_errors.add(
+                data['program_code'].notna() & ~data['program_code'].str.lower().isin(lookups.program_codes()),
+                "Program with code '" + data['program_code'].fillna('') + "' not found in this institution.",
+            )
+        elif module_type == 'programs':
+            faculty = data['faculty_name'].fillna('').str.lower()
+            department = data['department_name'].fillna('').str.lower()
+            no_faculty = row_errors.add(
+                data['faculty_name'].notna() & ~faculty.isin(lookups.faculty_names()),
+                "Faculty '" + data['faculty_name'].fillna('') + "' not found in this institution.",
+            )
+            row_errors.add(
+                ~no_faculty & data['department_name'].notna()
+                & ~pd.Series(list(zip(faculty, department)), index=data.index).isin(lookups.department_names()),
+                "Department '" + data['department_name'].fillna('') + "' not found in faculty '"
+                + data['faculty_name'].fillna('') + "'.",
+            )
+        elif module_type in IngestionService.STUDENT_RECORD_MODULES:
+            # Flagged here rather than silently skipped at commit
+            student_ids = data['student_id'].fillna('').str.upper()
+            row_errors.add(
+                data['student_id'].notna() & ~student_ids.isin(lookups.student_ids(student_ids)),
+                "Student '" + data['student_id'].fillna('') + "' not found in this institution.",
+            )
+
+        data = data.astype(object).where(data.notna(), None)
+        messages = row_errors.messages()
+        processed_data = [
+            {
+                "row_number": index + 2, # Excel rows are 1-based, and +1 for header
+                "status": "Error" if index in messages else "Success",
+                "messages": messages.get(index, []),
+                "data": row_data
+            }
+            for index, row_data in zip(df.index, data.to_dict('records'))
+        ]
+        return processed_data
+
+
+    # Rows written per bulk_create()/bulk_update() statement in commit_upload
+    COMMIT_BATCH_SIZE = 1000
+
     @staticmethod
     def commit_upload(module_type: str, validated_data: list, institution_id: int = None):
-        """Commits validated/corrected data to the database."""
-        from academic.models import Student, Institution, IndustryPlacement, StudentScholarship, InternationalMobility, InCountryTransfer, Facility
-        from faculties.models import Program, Faculty, Department
+        """
+        Commits validated/corrected data to the database.
+
+        Everything the rows refer to (students, programs, faculties,
+        departments) is fetched up front with one query per model, and the
+        rows are written with one bulk_create()/bulk_update() per model, all
+        in a single transaction. The number of queries therefore does not
+        depend on the number of rows (up to COMMIT_BATCH_SIZE per statement).
+
+        Returns {"imported": <rows created or updated>, "rows": [...]} with one
+        {"row_number", "status" (Created/Updated/Skipped), "message"} outcome
+        per submitted row, in order.
+        """
+        if module_type in IngestionService.STUDENT_RECORD_MODULES:
+            commit = IngestionService._commit_student_records
+        elif module_type in IngestionService.STUDENT_MODULES:
+            commit = IngestionService._commit_students
+        elif module_type == 'facilities':
+            commit = IngestionService._commit_facilities
+        elif module_type == 'faculties':
+            commit = IngestionService._commit_faculties
+        elif module_type == 'programs':
+            commit = IngestionService._commit_programs
+        else:
+            raise ValueError(f"Unknown module type for commit: {module_type}")
+
+        institution_id = int(institution_id) if institution_id else None
+
+        outcomes = {}
+        pending = []
+        for index, item in enumerate(validated_data):
+            if item.get('status', 'Success') == 'Error': # Skip items that were already marked as Error during validation
+                outcomes[index] = ('Skipped', "Row has validation errors.")
+            else:
+                pending.append((index, item['data']))
+
+        with transaction.atomic():
+            outcomes.update(commit(module_type, pending, institution_id))
+
+        rows = [
+            {"row_number": item.get('row_number'), "status": outcomes[index][0], "message": outcomes[index][1]}
+            for index, item in enumerate(validated_data)
+        ]
+        return {
+            "imported": sum(1 for row in rows if row['status'] != 'Skipped'),
+            "rows": rows
+        }
 
-        success_count = 0
-        for item in validated_data:
-            # Re-initialize status and errors from item if they exist, or set defaults
-            status = item.get('status', 'Success')
-            errors = item.get('messages', [])
+    @staticmethod
+    def _student_key(data):
+        # Student.save() stores IDs upper-cased
+        return str(data.get('student_id') or '').strip().upper()
+
+    @staticmethod
+    def _commit_student_records(module_type, pending, institution_id):
+        """Placements, scholarships, mobility, transfers, inclusivity and graduation years."""
+        from academic.models import IndustryPlacement, StudentScholarship, InternationalMobility, InCountryTransfer
+
+        keys = {IngestionService._student_key(data) for _, data in pending}
+        students = {
+            s.student_id: s
+            for s in Student.objects.filter(student_id__in=keys, institution_id=institution_id).only('id', 'student_id')
+        }
 
-            if status == 'Error': # Skip items that were already marked as Error during validation
+        outcomes = {}
+        records = []
+        updated = {}
+        for index, data in pending:
+            student = students.get(IngestionService._student_key(data))
+            if not student:
+                outcomes[index] = ('Skipped', f"Student '{data.get('student_id')}' not found in this institution.")
                 continue
-            
-            data = item['data']
-
-            # Student lookup is relevant for most modules tied to students
-            student = None
-            if module_type in ['placements', 'scholarships', 'mobility', 'inclusivity', 'possible_graduates', 'in_country_transfers']:
-                student_id = str(data.get('student_id', ''))
-                student = Student.objects.filter(student_id=student_id, institution_id=institution_id).first() # Filter by institution_id
-                
-                if not student:
-                    continue
 
-            # Create module record based on type
             if module_type == 'placements':
-                IndustryPlacement.objects.create(
+                records.append(IndustryPlacement(
                     student=student,
                     placement_type=data['placement_type'],
                     company_name=data['company_name'],
                     start_date=data['start_date']
-                )
+                ))
             elif module_type == 'scholarships':
-                StudentScholarship.objects.create(
+                records.append(StudentScholarship(
                     student=student,
                     provider_name=data['provider_name'],
                     amount=data.get('amount'),
                     year_awarded=data['year_awarded']
-                )
-            elif module_type == 'facilities':
-                if institution_id:
-                    Facility.objects.create(
-                        institution_id=institution_id,
-                        name=data['name'],
-                        facility_type=data['facility_type'],
-                        building=data.get('building', 'Main Building'),
-                        capacity=data.get('capacity', 0) or 0,
-                        current_usage=data.get('current_usage', 0) or 0,
-                        status=data.get('status', 'Active'),
-                        description=data.get('description', ''),
-                        equipment=data.get('equipment', ''),
-                        manager=data.get('manager', 'Pending'),
-                        contact_number=data.get('contact_number', 'N/A')
-                    )
+                ))
             elif module_type == 'mobility':
-                InternationalMobility.objects.create(
+                records.append(InternationalMobility(
                     student=student,
                     direction=data['direction'],
                     country=data['country'],
                     foreign_institution=data.get('foreign_institution')
-                )
+                ))
             elif module_type == 'in_country_transfers':
-                InCountryTransfer.objects.create(
+                records.append(InCountryTransfer(
                     student=student,
                     from_institution=data['from_institution'],
                     to_institution=data['to_institution'],
                     transfer_date=data['transfer_date']
-                )
-            elif module_type == 'faculties':
-                institution = Institution.objects.get(id=institution_id)
-                Faculty.objects.get_or_create(
-                    institution=institution,
-                    name=data['name'],
-                    defaults={
-                        'dean': data.get('dean', ''),
-                        'location': data.get('location', ''),
-                        'email': data.get('email', ''),
-                        'description': data.get('description', ''),
-                        'status': data.get('status', 'Active')
-                    }
-                )
-            elif module_type == 'programs':
-                institution = Institution.objects.get(id=institution_id)
-                faculty_name = data.get('faculty_name')
-                department_name = data.get('department_name')
-
-                faculty = Faculty.objects.filter(institution=institution, name__iexact=faculty_name).first()
-                if not faculty: continue
-                
-                department = Department.objects.filter(faculty=faculty, name__iexact=department_name).first()
-                if not department: continue
-                
-                levels = [lvl.strip() for lvl in str(data.get('levels', '')).split(',') if lvl.strip()]
-                categories = [cat.strip() for cat in str(data.get('categories', '')).split(',') if cat.strip()]
-                is_critical_skill = str(data.get('is_critical_skill', 'FALSE')).upper() == 'TRUE'
-                
-                Program.objects.create(
-                    department=department,
-                    name=data['name'],
-                    code=data['code'],
-                    duration=int(data.get('duration') or 0),
-                    levels=levels,
-                    categories=categories,
-                    is_critical_skill=is_critical_skill,
-                    program_type=data.get('program_type'),
-                    description=data.get('description') or '',
-                    coordinator=data.get('coordinator') or '',
-                    student_capacity=int(data.get('student_capacity') or 0),
-                    semester_fee=float(data.get('semester_fee') or 0.00),
-                    modules=data.get('modules') or '',
-                    entry_requirements=data.get('entry_requirements') or ''
-                )
+                ))
             elif module_type == 'inclusivity':
                 student.inclusivity_category = data['inclusivity_category']
-                student.save()
+                updated[student.pk] = student
             elif module_type == 'possible_graduates':
                 student.graduation_year = int(data['graduation_year'])
-                student.save()
-            elif module_type in ['stem_students', 'specialized_students', 'critical_students']:
-                program_code = data.get('program_code')
-                program = None
-                faculty = None
-                department = None
-                if program_code:
-                    program = Program.objects.filter(code=program_code, department__faculty__institution_id=institution_id).first()
-                    if program:
-                        department = program.department
-                        faculty = department.faculty
-
-                cat = 'STEM'
-                if module_type == 'specialized_students':
-                    cat = 'SPECIALIZED'
-                elif module_type == 'critical_students':
-                    cat = 'CRITICAL'
-
-                Student.objects.update_or_create(
-                    student_id=data['student_id'],
-                    institution_id=institution_id,
-                    defaults={
-                        'national_id': data.get('national_id'),
-                        'first_name': data['first_name'],
-                        'last_name': data['last_name'],
-                        'gender': data['gender'],
-                        'date_of_birth': data.get('date_of_birth'),
-                        'enrollment_year': int(data['enrollment_year']),
-                        'status': data.get('status', 'Active'),
-                        'faculty': faculty,
-                        'department': department,
-                        'program': program,
-                        'selected_level': data.get('selected_level'),
-                        'selected_category': cat
-                    }
-                )
-            success_count += 1
-            
-        return success_count
+                updated[student.pk] = student
+
+            if module_type in ['inclusivity', 'possible_graduates']:
+                outcomes[index] = ('Updated', f"Student {student.student_id} updated.")
+            else:
+                outcomes[index] = ('Created', f"Record created for student {student.student_id}.")
+
+        if records:
+            type(records[0]).objects.bulk_create(records, batch_size=IngestionService.COMMIT_BATCH_SIZE)
+            bump_report_version(type(records[0]), institution_id)
+        if updated:
+            # bulk_update() skips auto_now; a repeated student is written once, with its last row
+            field = 'inclusivity_category' if module_type == 'inclusivity' else 'graduation_year'
+            now = timezone.now()
+            for student in updated.values():
+                student.updated_at = now
+            Student.objects.bulk_update(
+                list(updated.values()), [field, 'updated_at'], batch_size=IngestionService.COMMIT_BATCH_SIZE
+            )
+            bump_report_version(Student, institution_id)
+        return outcomes
+
+    @staticmethod
+    def _commit_students(module_type, pending, institution_id):
+        """Create or update STEM/specialized/critical skills students, keyed on Student ID."""
+        from academic.models import StudentBalance
+        from academic.services.student_services import StudentService
+
+        cat = 'STEM'
+        if module_type == 'specialized_students':
+            cat = 'SPECIALIZED'
+        elif module_type == 'critical_students':
+            cat = 'CRITICAL'
+
+        # National IDs are unique across the whole system: resolve every digest in one query
+        taken_national_ids = StudentService.existing_national_ids(
+            [StudentService.national_id_digest(data.get('national_id')) for _, data in pending]
+        )
+
+        hierarchy = get_hierarchy(institution_id)
+
+        # Student IDs are unique across institutions too
+        keys = {IngestionService._student_key(data) for _, data in pending}
+        existing = {s.student_id: s for s in Student.objects.filter(student_id__in=keys)}
+
+        outcomes = {}
+        to_create = {}
+        to_update = {}
+        for index, data in pending:
+            student_id = IngestionService._student_key(data)
+            student = to_create.get(student_id) or existing.get(student_id)
+            if student is not None and student.institution_id != institution_id:
+                outcomes[index] = ('Skipped', f"Student ID {student_id} is registered to another institution.")
+                continue
+
+            # Skip rows whose National ID belongs to another student (in the DB or earlier in this batch)
+            digest = StudentService.national_id_digest(data.get('national_id'))
+            if digest:
+                owner = taken_national_ids.get(digest)
+                if owner and owner.upper() != student_id:
+                    outcomes[index] = ('Skipped', "National ID is already registered to another student.")
+                    continue
+                taken_national_ids[digest] = student_id
+
+            program = hierarchy.program_coded(data.get('program_code')) if data.get('program_code') else None
+            # Upper-cased here because bulk_create/bulk_update skip Student.save()
+            values = {
+                'national_id': data.get('national_id').upper() if data.get('national_id') else data.get('national_id'),
+                'first_name': data['first_name'].upper() if data['first_name'] else data['first_name'],
+                'last_name': data['last_name'].upper() if data['last_name'] else data['last_name'],
+                'gender': data['gender'],
+                'date_of_birth': data.get('date_of_birth'),
+                'enrollment_year': int(data['enrollment_year']),
+                'status': data.get('status', 'Active'),
+                'faculty_id': program.faculty_id if program else None,
+                'department_id': program.department_id if program else None,
+                'program_id': program.id if program else None,
+                'selected_level': data.get('selected_level'),
+                'selected_category': cat
+            }
+
+            if student is None:
+                to_create[student_id] = Student(student_id=student_id, institution_id=institution_id, **values)
+                outcomes[index] = ('Created', f"Student {student_id} created.")
+                continue
+            for field, value in values.items():
+                setattr(student, field, value)
+            if student_id not in to_create:
+                to_update[student_id] = student
+            outcomes[index] = ('Updated', f"Student {student_id} updated.")
+
+        batch_size = IngestionService.COMMIT_BATCH_SIZE
+        created = list(to_create.values())
+        Student.objects.bulk_create(created, batch_size=batch_size)
+
+        updated = list(to_update.values())
+        if updated:
+            # bulk_update() doesn't run pre_save(): recompute the search indexes and updated_at here
+            index_fields = [
+                f for f in Student._meta.concrete_fields if isinstance(f, (BlindIndexField, NgramIndexField))
+            ]
+            now = timezone.now()
+            for student in updated:
+                student.updated_at = now
+                for field in index_fields:
+                    field.pre_save(student, False)
+            fields = ['national_id', 'first_name', 'last_name', 'gender', 'date_of_birth', 'enrollment_year',
+                      'status', 'faculty', 'department', 'program', 'selected_level', 'selected_category', 'updated_at']
+            Student.objects.bulk_update(updated, fields + [f.name for f in index_fields], batch_size=batch_size)
+
+        # Neither bulk path runs Student.save(): open or re-price the ledgers here
+        StudentBalance.objects.refresh([s.pk for s in created + updated])
+        if created or updated:
+            bump_report_version(Student, institution_id)
+        return outcomes
+
+    @staticmethod
+    def _commit_facilities(module_type, pending, institution_id):
+        from academic.models import Facility
+
+        if not institution_id:
+            return {index: ('Skipped', "Institution ID is required.") for index, _ in pending}
+
+        names = {data['name'] for _, data in pending}
+        existing = set(
+            Facility.objects.filter(institution_id=institution_id, name__in=names).values_list('name', flat=True)
+        )
+
+        facilities = []
+        outcomes = {}
+        for index, data in pending:
+            # Facility names are unique per institution
+            if data['name'] in existing:
+                outcomes[index] = ('Skipped', f"Facility '{data['name']}' already exists.")
+                continue
+            existing.add(data['name'])
+            facilities.append(Facility(
+                institution_id=institution_id,
+                name=data['name'],
+                facility_type=data['facility_type'],
+                building=data.get('building', 'Main Building'),
+                capacity=data.get('capacity', 0) or 0,
+                current_usage=data.get('current_usage', 0) or 0,
+                status=data.get('status', 'Active'),
+                description=data.get('description', ''),
+                equipment=data.get('equipment', ''),
+                manager=data.get('manager', 'Pending'),
+                contact_number=data.get('contact_number', 'N/A')
+            ))
+            outcomes[index] = ('Created', f"Facility '{data['name']}' created.")
+        Facility.objects.bulk_create(facilities, batch_size=IngestionService.COMMIT_BATCH_SIZE)
+        return outcomes
+
+    @staticmethod
+    def _commit_faculties(module_type, pending, institution_id):
+        names = {data['name'] for _, data in pending}
+        existing = set(
+            Faculty.objects.filter(institution_id=institution_id, name__in=names).values_list('name', flat=True)
+        )
+
+        faculties = []
+        outcomes = {}
+        for index, data in pending:
+            if data['name'] in existing:
+                outcomes[index] = ('Skipped', f"Faculty '{data['name']}' already exists.")
+                continue
+            existing.add(data['name'])
+            faculties.append(Faculty(
+                institution_id=institution_id,
+                name=data['name'],
+                dean=data.get('dean', ''),
+                location=data.get('location', ''),
+                email=data.get('email', ''),
+                description=data.get('description', ''),
+                status=data.get('status', 'Active')
+            ))
+            outcomes[index] = ('Created', f"Faculty '{data['name']}' created.")
+        Faculty.objects.bulk_create(faculties, batch_size=IngestionService.COMMIT_BATCH_SIZE)
+        if faculties:
+            bump_hierarchy_version(institution_id)
+        return outcomes
+
+    @staticmethod
+    def _commit_programs(module_type, pending, institution_id):
+        # Names match case-insensitively; the first by name wins, as with .filter(name__iexact=...).first()
+        hierarchy = get_hierarchy(institution_id)
+        taken_codes = {(p.department_id, p.code) for p in hierarchy.programs.values()}
+
+        programs = []
+        outcomes = {}
+        for index, data in pending:
+            faculty_name = data.get('faculty_name')
+            department_name = data.get('department_name')
+
+            faculty = hierarchy.faculty_named(faculty_name)
+            if not faculty:
+                outcomes[index] = ('Skipped', f"Faculty '{faculty_name}' not found.")
+                continue
+            department = hierarchy.department_named(faculty.id, department_name)
+            if not department:
+                outcomes[index] = ('Skipped', f"Department '{department_name}' not found in {faculty.name}.")
+                continue
+            if (department.id, data['code']) in taken_codes:
+                outcomes[index] = ('Skipped', f"Program code '{data['code']}' already exists in {department.name}.")
+                continue
+            taken_codes.add((department.id, data['code']))
+
+            levels = [lvl.strip() for lvl in str(data.get('levels', '')).split(',') if lvl.strip()]
+            categories = [cat.strip() for cat in str(data.get('categories', '')).split(',') if cat.strip()]
+            is_critical_skill = str(data.get('is_critical_skill', 'FALSE')).upper() == 'TRUE'
+
+            programs.append(Program(
+                department_id=department.id,
+                institution_id=institution_id, # Program.save() derives it from the department
+                name=data['name'],
+                code=data['code'],
+                duration=int(data.get('duration') or 0),
+                levels=levels,
+                categories=categories,
+                is_critical_skill=is_critical_skill,
+                program_type=data.get('program_type'),
+                description=data.get('description') or '',
+                coordinator=data.get('coordinator') or '',
+                student_capacity=int(data.get('student_capacity') or 0),
+                semester_fee=float(data.get('semester_fee') or 0.00),
+                modules=data.get('modules') or '',
+                entry_requirements=data.get('entry_requirements') or ''
+            ))
+            outcomes[index] = ('Created', f"Program {data['code']} created.")
+        Program.objects.bulk_create(programs, batch_size=IngestionService.COMMIT_BATCH_SIZE)
+        if programs:
+            bump_hierarchy_version(institution_id)
+        return outcomes
+
+    # ----- STAGED UPLOADS -----
+    # validate -> stage rows server-side -> page / correct rows -> commit by id
+
+    STAGE_BATCH_SIZE = 1000
+
+    @staticmethod
+    def stage_upload(module_type: str, file_path: str, institution_id: int = None, uploaded_by=None, file_name: str = ''):
+        """
+        Validates a sheet and stores every row result in StagedUploadRow.
+        Returns the StagedUpload, or validate_upload's error dict if the file can't be read.
+        """
+        from academic.models import StagedUpload, StagedUploadRow
+
+        result = IngestionService.validate_upload(module_type, file_path, institution_id)
+        if result.get("status") != "success":
+            return result
+
+        rows = result["processed_data"]
+        with transaction.atomic():
+            upload = StagedUpload.objects.create(
+                module_type=module_type,
+                institution_id=institution_id,
+                uploaded_by=uploaded_by,
+                file_name=file_name,
+                row_count=len(rows),
+                error_count=sum(1 for row in rows if row["status"] == "Error"),
+            )
+            StagedUploadRow.objects.bulk_create(
+                [
+                    StagedUploadRow(
+                        upload=upload,
+                        row_number=row["row_number"],
+                        status=row["status"],
+                        messages=row["messages"],
+                        data=json.dumps(row["data"]),
+                    )
+                    for row in rows
+                ],
+                batch_size=IngestionService.STAGE_BATCH_SIZE,
+            )
+        return upload
+
+    @staticmethod
+    def correct_staged_rows(upload, corrections: list):
+        """
+        Applies row-level corrections to a staged upload and re-validates only those rows.
+
+        `corrections` is [{"row_number": 7, "data": {"company_name": "..."}}, ...];
+        fields not in the module's template are ignored. Returns the corrected
+        StagedUploadRow instances.
+        """
+        from academic.models import StagedUploadRow
+
+        if upload.status != 'Validated':
+            raise ValidationError("This upload has already been committed.")
+
+        schema = TEMPLATE_SCHEMAS[upload.module_type]
+        changes = {}
+        for correction in corrections or []:
+            try:
+                row_number = int(correction["row_number"])
+            except (KeyError, TypeError, ValueError):
+                raise ValidationError("Each correction needs a row_number.")
+            fields = {k: v for k, v in (correction.get("data") or {}).items() if k in schema}
+            changes.setdefault(row_number, {}).update(fields)
+        if not changes:
+            return []
+
+        rows = list(StagedUploadRow.objects.filter(upload=upload, row_number__in=changes.keys()))
+        missing = set(changes) - {row.row_number for row in rows}
+        if missing:
+            raise ValidationError(f"Rows not found in this upload: {', '.join(map(str, sorted(missing)))}.")
+
+        # Merged values go back through the same column-wise checks as the file, as sheet text
+        merged = {row.row_number: {**json.loads(row.data), **changes[row.row_number]} for row in rows}
+        df = pd.DataFrame(
+            [
+                {header: None if values.get(field) is None else str(values[field]) for field, (header, _) in schema.items()}
+                for values in merged.values()
+            ],
+            index=[row_number - 2 for row_number in merged],
+            dtype=object,
+        )
+        results = {
+            result["row_number"]: result
+            for result in IngestionService.validate_frame(upload.module_type, df, upload.institution_id)
+        }
+
+        for row in rows:
+            result = results[row.row_number]
+            row.status = result["status"]
+            row.messages = result["messages"]
+            row.data = json.dumps(result["data"])
+
+        with transaction.atomic():
+            StagedUploadRow.objects.bulk_update(
+                rows, ['status', 'messages', 'data'], batch_size=IngestionService.STAGE_BATCH_SIZE
+            )
+            upload.error_count = upload.rows.filter(status='Error').count()
+            upload.save(update_fields=['error_count'])
+        return rows
+
+    @staticmethod
+    def commit_staged(upload_id):
+        """
+        Commits a staged upload: all its rows are read in one query and written
+        set-based by commit_upload. Per-row outcomes are stored on the staged rows.
+        """
+        from academic.models import StagedUpload, StagedUploadRow
+
+        with transaction.atomic():
+            # Locked so a double-submitted commit can't import the sheet twice
+            upload = StagedUpload.objects.select_for_update().get(pk=upload_id)
+            if upload.status != 'Validated':
+                raise ValidationError("This upload has already been committed.")
+
+            rows = list(StagedUploadRow.objects.filter(upload=upload).only('id', 'row_number', 'status', 'data'))
+            result = IngestionService.commit_upload(
+                upload.module_type,
+                [
+                    {"row_number": row.row_number, "status": row.status, "data": json.loads(row.data)}
+                    for row in rows
+                ],
+                upload.institution_id,
+            )
+
+            for row, outcome in zip(rows, result["rows"]):
+                row.outcome = outcome["status"]
+                row.outcome_message = outcome["message"]
+            StagedUploadRow.objects.bulk_update(
+                rows, ['outcome', 'outcome_message'], batch_size=IngestionService.STAGE_BATCH_SIZE
+            )
+
+            upload.status = 'Committed'
+            upload.imported_count = result["imported"]
+            upload.committed_at = timezone.now()
+            upload.save(update_fields=['status', 'imported_count', 'committed_at'])
+        return upload
@@ -1,12 +1,28 @@
 from django.db import transaction
 from django.core.exceptions import ValidationError
-from ..models import Student, STUDENT_STATUSES
+from ..models import Student, StudentBalance, STUDENT_STATUSES
+import numpy as np
 import pandas as pd
+from faculties.hierarchy import get_hierarchy, program_node
 from faculties.models import Department, Faculty, Program
 from django.forms.models import model_to_dict
+from core.utils.copy_loader import bulk_insert
+from reports.result_cache import bump_report_version
+from core.utils.crypto import blind_index
+from core.utils.encryption_pipeline import EncryptionPipeline
+from core.utils.spreadsheets import DEFAULT_CHUNK_SIZE, count_upload_rows, iter_upload_chunks
+from core.utils.upload_validation import (
+    GENDER_MAP, GRADE_MAP, SEMESTER_MAP, TRUE_VALUES, RowErrors,
+    choice_map, clean_text, normalize_choice, to_int,
+)
 
 
 class StudentService:
+    # Bulk uploads are read UPLOAD_CHUNK_SIZE rows at a time and inserted in
+    # INSERT statements of UPLOAD_BATCH_SIZE rows
+    UPLOAD_CHUNK_SIZE = DEFAULT_CHUNK_SIZE
+    UPLOAD_BATCH_SIZE = 1000
+
     @staticmethod
     def normalize_gender(gender_str):
         """Standardizes gender values into 'Male' or 'Female'."""
@@ -36,6 +52,31 @@ class StudentService:
             if data.get('hours_pledged', 0) <= 0:
                 raise ValidationError("Valid pledged hours are required if student is working for fees.")
 
+    @staticmethod
+    def national_id_digest(national_id):
+        """Keyed digest stored in the unique Student.national_id_bidx column."""
+        return blind_index(national_id, 'national_id')
+
+    @staticmethod
+    def existing_national_ids(digests, exclude_pk=None):
+        """
+        Map national ID digest -> student_id for digests that are already taken.
+        One indexed set-membership query, whatever the batch size.
+        """
+        digests = {d for d in digests if d}
+        if not digests:
+            return {}
+        queryset = Student.objects.filter(national_id_bidx__in=digests)
+        if exclude_pk:
+            queryset = queryset.exclude(pk=exclude_pk)
+        return dict(queryset.values_list('national_id_bidx', 'student_id'))
+
+    @staticmethod
+    def _check_national_id_available(national_id, exclude_pk=None):
+        digest = StudentService.national_id_digest(national_id)
+        if StudentService.existing_national_ids([digest], exclude_pk=exclude_pk):
+            raise ValidationError("A student with this National ID already exists.")
+
     @staticmethod
     def create_student(validated_data):
         """
@@ -53,6 +94,8 @@ class StudentService:
         if 'gender' in validated_data:
             validated_data['gender'] = StudentService.normalize_gender(validated_data['gender'])
 
+        StudentService._check_national_id_available(validated_data.get('national_id'))
+
         if validated_data.get('status') == 'Graduated':
             if not validated_data.get('graduation_year'):
                 raise ValidationError("Graduation year is required for graduated students.")
@@ -120,6 +163,9 @@ class StudentService:
         if 'gender' in validated_data:
             validated_data['gender'] = StudentService.normalize_gender(validated_data['gender'])
 
+        if 'national_id' in validated_data:
+            StudentService._check_national_id_available(validated_data['national_id'], exclude_pk=instance.pk)
+
         if new_program_code:
             institution = instance.institution
             department = validated_data.get('department', instance.department)
@@ -193,243 +239,199 @@ class StudentService:
             raise ValidationError(f"Error deleting student: {str(e)}")
 
     @staticmethod
-    def bulk_create_from_file(file, institution_id, confirm_creation=False):
+    def _normalize_upload_chunk(chunk):
         """
-        Parses an Excel/CSV file and enrolls students.
+        Column-wise normalization of one upload chunk into Student field
+        values (one DataFrame column per field). Raw text needed for error
+        messages is kept in the underscore-prefixed columns.
         """
-        try:
-            # ---------------- READ FILE ----------------
-            if file.name.endswith('.csv'):
-                df = pd.read_csv(file, dtype=str)
-            else:
-                df = pd.read_excel(file, dtype=str)
+        rows = pd.DataFrame(index=chunk.index)
+        rows['student_id'] = clean_text(chunk, 'student_id', upper=True)
+        rows['first_name'] = clean_text(chunk, 'first_name', upper=True)
+        rows['last_name'] = clean_text(chunk, 'last_name', upper=True)
+
+        rows['_gender'] = clean_text(chunk, 'gender')
+        rows['gender'] = normalize_choice(rows['_gender'], GENDER_MAP, keep_unknown=False)
+
+        # Program identification - we work with program code
+        rows['program_code'] = clean_text(chunk, 'program_code', 'program', upper=True)
+        rows['_program_name'] = clean_text(chunk, 'program_name', 'program', upper=True)
+        rows['_faculty'] = clean_text(chunk, 'faculty', upper=True, default='GENERAL FACULTY')
+        rows['_department'] = clean_text(chunk, 'department', upper=True, default='GENERAL DEPARTMENT')
+        rows['_level'] = clean_text(chunk, 'level', default='Degree').str.capitalize()
+        rows['_category'] = clean_text(chunk, 'category', upper=True, default='STEM')
+
+        # -------- Status / Dropout --------
+        rows['status'] = normalize_choice(
+            clean_text(chunk, 'status', default='Active'), choice_map(STUDENT_STATUSES)
+        )
+        dropout = clean_text(chunk, 'dropout_reason')
+        rows['dropout_reason'] = normalize_choice(dropout, choice_map(Student.DROPOUT_REASONS)).where(
+            (rows['status'] == 'Dropout') & (dropout != ''), None
+        )
+
+        # -------- Years / Hours --------
+        rows['_enrollment_year'] = clean_text(chunk, 'enrollment_year')
+        rows['enrollment_year'], rows['_enrollment_year_invalid'] = to_int(rows['_enrollment_year'], default=2025)
+        rows['graduation_year'], rows['_graduation_year_invalid'] = to_int(clean_text(chunk, 'graduation_year'))
+        rows['hours_pledged'], rows['_hours_pledged_invalid'] = to_int(clean_text(chunk, 'hours_pledged'), default=0)
+
+        # -------- Final Grade --------
+        rows['final_grade'] = normalize_choice(clean_text(chunk, 'final_grade'), GRADE_MAP, keep_unknown=False)
+
+        # -------- Work for Fees Fields --------
+        rows['is_work_for_fees'] = clean_text(chunk, 'is_work_for_fees').str.lower().isin(TRUE_VALUES)
+        work_area = clean_text(chunk, 'work_area')
+        rows['work_area'] = normalize_choice(work_area, choice_map(Student.WORK_AREAS)).where(work_area != '', None)
+
+        rows['inclusivity_category'] = normalize_choice(
+            clean_text(chunk, 'inclusivity_category', 'disability_type', default='None'),
+            choice_map(Student.INCLUSIVITY_CATEGORIES),
+        )
+        rows['enrollment_semester'] = normalize_choice(
+            clean_text(chunk, 'enrollment_semester', 'semester', default='Semester 1'), SEMESTER_MAP
+        )
+
+        national_id = clean_text(chunk, 'national_id', upper=True)
+        rows['national_id'] = national_id.where(national_id != '', None)
+        date_of_birth = clean_text(chunk, 'date_of_birth', upper=True)
+        rows['date_of_birth'] = date_of_birth.where(date_of_birth != '', None)
+        return rows.replace({np.nan: None})
 
-            df.columns = [c.strip().lower().replace(' ', '_') for c in df.columns]
+    @staticmethod
+    def _validate_upload_chunk(chunk, prog_cache, seen_in_file, digest_owners, new_programs):
+        """
+        First pass over one chunk. Returns the chunk's error messages.
+        Only student IDs and national ID digests are remembered between
+        chunks (for the in-file duplicate checks), never the rows themselves.
+        """
+        rows = StudentService._normalize_upload_chunk(chunk)
+        student_id = rows['student_id']
+        prefix = ("Student ID " + student_id).where(
+            student_id != '', "Row " + (rows.index + 2).astype(str) + " (No Student ID)"
+        )
+
+        # Student IDs are unique across all institutions: one indexed lookup per chunk
+        existing_ids = set(
+            Student.objects.filter(student_id__in=set(student_id) - {''})
+            .values_list('student_id', flat=True)
+        )
+
+        errors = RowErrors(rows.index)
+        missing_id = errors.add(student_id == '', "Student ID is required.")
+        duplicate = errors.add(
+            ~missing_id & (student_id.duplicated() | student_id.isin(seen_in_file)),
+            "Duplicate Student ID '" + student_id + "' in the uploaded file.",
+        )
+        exists = errors.add(
+            ~missing_id & ~duplicate & student_id.isin(existing_ids),
+            "Student ID '" + student_id + "' already exists in database.",
+        )
+        seen_in_file.update(student_id[~missing_id])
+        live = ~(missing_id | duplicate | exists)
+
+        # Validate basic fields to prevent GIGO
+        errors.add(live & (rows['first_name'] == ''), "First Name is required.")
+        errors.add(live & (rows['last_name'] == ''), "Last Name is required.")
+        errors.add(live & (rows['_gender'] == ''), "Gender is required.")
+        errors.add(
+            live & (rows['_gender'] != '') & rows['gender'].isna(),
+            "Invalid gender choice: " + rows['_gender'] + ". Gender must be 'Male' or 'Female'.",
+        )
+        missing_program = errors.add(live & (rows['program_code'] == ''), "Program Code is required.")
+        usable = live & ~missing_program
+
+        errors.add(usable & (rows['_enrollment_year'] == ''), "Enrollment Year is required.")
+        errors.add(usable & rows['_enrollment_year_invalid'], "Enrollment Year must be a number.")
+        errors.add(usable & rows['_graduation_year_invalid'], "Graduation Year must be a number.")
+        errors.add(usable & rows['_hours_pledged_invalid'], "Hours Pledged must be a number.")
+
+        # Same precedence as _validate_student_data + the graduation checks: first failure only
+        working = usable & rows['is_work_for_fees']
+        no_area = errors.add(working & rows['work_area'].isna(), "Work area is required if student is working for fees.")
+        no_hours = errors.add(
+            working & ~no_area & (pd.to_numeric(rows['hours_pledged']) <= 0),
+            "Valid pledged hours are required if student is working for fees.",
+        )
+        graduated = usable & ~no_area & ~no_hours & (rows['status'] == 'Graduated')
+        no_year = errors.add(graduated & rows['graduation_year'].isna(), "Graduation year is required for graduated students.")
+        errors.add(graduated & ~no_year & rows['final_grade'].isna(), "Final grade is required for graduated students.")
+
+        messages = errors.flat(prefix)
+
+        # Programs not yet in the institution (the last row for a code wins)
+        unknown = rows[usable & ~rows['program_code'].str.lower().isin(prog_cache.keys())]
+        for code, name, faculty, department, level, category in unknown[
+            ['program_code', '_program_name', '_faculty', '_department', '_level', '_category']
+        ].itertuples(index=False):
+            new_programs[code.lower()] = {
+                "code": code,
+                "name": name or f"{code} PROGRAM",
+                "department": department,
+                "faculty": faculty,
+                "level": level,
+                "category": category
+            }
 
-            # ---------------- CACHES ----------------
-            fac_cache = {f.name.lower(): f for f in Faculty.objects.filter(institution_id=institution_id)}
-            dept_cache = {(d.faculty_id, d.name.lower()): d for d in Department.objects.filter(
-                faculty__institution_id=institution_id
-            )}
-            prog_cache = {p.code.lower(): p for p in Program.objects.filter(
-                department__faculty__institution_id=institution_id
-            )}
-
-            existing_ids = set(
-                Student.objects.filter(institution_id=institution_id)
-                .values_list('student_id', flat=True)
+        # -------- National ID uniqueness (in file + database) --------
+        chunk_digests = {}
+        candidates = rows[usable & rows['national_id'].notna()]
+        for sid, national_id in zip(candidates['student_id'], candidates['national_id']):
+            digest = StudentService.national_id_digest(national_id)
+            if digest in digest_owners:
+                messages.append(
+                    f"Student ID {sid}: Duplicate National ID in the uploaded file "
+                    f"(also used by Student ID {digest_owners[digest]})."
+                )
+                continue
+            digest_owners[digest] = sid
+            chunk_digests[digest] = sid
+
+        for digest in StudentService.existing_national_ids(chunk_digests.keys()):
+            messages.append(
+                f"Student ID {chunk_digests[digest]}: A student with this National ID already exists."
             )
+        return messages
+
+    @staticmethod
+    def bulk_create_from_file(file, institution_id, confirm_creation=False, chunk_size=UPLOAD_CHUNK_SIZE,
+                              progress=None):
+        """
+        Parses an Excel/CSV file and enrolls students.
+
+        The file is streamed twice, `chunk_size` rows at a time: the first
+        pass validates everything, the second encrypts each chunk in
+        settings.ENCRYPTION_WORKERS processes (core.utils.encryption_pipeline)
+        and inserts it, with COPY on PostgreSQL (core.utils.copy_loader) and
+        bulk_create(batch_size=UPLOAD_BATCH_SIZE) elsewhere. Memory follows
+        the chunk size rather than the file size. Nothing is written unless the
+        whole file is valid.
 
+        `progress(stage, rows_done, rows_total, error_count)` is called after
+        every chunk (see core.utils.upload_jobs.UploadProgress).
+        """
+        try:
+            # ---------------- CACHES ----------------
+            # Copies of the cached hierarchy (faculties.hierarchy), extended as rows create entries
+            hierarchy = get_hierarchy(institution_id)
+            fac_cache = dict(hierarchy.faculty_by_name)
+            dept_cache = dict(hierarchy.department_by_name)
+            prog_cache = dict(hierarchy.program_by_code)
+
+            total = count_upload_rows(file) if progress else None
+
+            # ---------------- PASS 1: VALIDATE ----------------
             seen_in_file = set()
-            students_to_create = []
+            digest_owners = {}
             errors = []
             new_programs_to_create = {}
-
-            GRADE_MAP = {
-                'distinction': 'Distinction',
-                'credit': 'Credit',
-                'pass': 'Pass',
-                'fail': 'Fail',
-            }
-
-            label_to_code = {label.lower(): code for code, label in Student.DROPOUT_REASONS}
-            for code, label in Student.DROPOUT_REASONS:
-                label_to_code[code.lower()] = code
-            
-            valid_statuses = {}
-            for s in STUDENT_STATUSES:
-                valid_statuses[s[0].lower()] = s[0]
-                valid_statuses[s[1].lower()] = s[0]
-                
-            valid_work_areas = {}
-            for code, label in Student.WORK_AREAS:
-                valid_work_areas[code.lower()] = code
-                valid_work_areas[label.lower()] = code
-                
-            valid_inclusivity = {}
-            for code, label in Student.INCLUSIVITY_CATEGORIES:
-                valid_inclusivity[code.lower()] = code
-                valid_inclusivity[label.lower()] = code
-                
-            valid_semesters = {'semester 1': 'Semester 1', 'semester 2': 'Semester 2', '1': 'Semester 1', '2': 'Semester 2'}
-
-            # ---------------- PROCESS ROWS ----------------
-            rows_to_process = []
-            for index, row in df.iterrows():
-                row_num = index + 2
-                error_prefix = f"Row {row_num}"
-                try:
-                    student_id_raw = row.get('student_id')
-                    student_id = str(student_id_raw).strip().upper() if pd.notna(student_id_raw) else ""
-                    
-                    error_prefix = f"Student ID {student_id}" if student_id else f"Row {row_num} (No Student ID)"
-                    
-                    if not student_id:
-                        errors.append(f"{error_prefix}: Student ID is required.")
-                        continue
-
-                    if student_id in seen_in_file:
-                        errors.append(f"{error_prefix}: Duplicate Student ID '{student_id}' in the uploaded file.")
-                        continue
-                    seen_in_file.add(student_id)
-
-                    if student_id in existing_ids:
-                        errors.append(f"{error_prefix}: Student ID '{student_id}' already exists in database.")
-                        continue
-
-                    # Validate basic fields to prevent GIGO
-                    first_name_raw = row.get('first_name')
-                    last_name_raw = row.get('last_name')
-                    first_name = str(first_name_raw).strip().upper() if pd.notna(first_name_raw) else ""
-                    last_name = str(last_name_raw).strip().upper() if pd.notna(last_name_raw) else ""
-                    
-                    gender_raw = str(row.get('gender', '')).strip() if pd.notna(row.get('gender')) else ""
-
-                    if not first_name:
-                        errors.append(f"{error_prefix}: First Name is required.")
-                    if not last_name:
-                        errors.append(f"{error_prefix}: Last Name is required.")
-                    
-                    try:
-                        gender = StudentService.normalize_gender(gender_raw)
-                    except ValidationError as ge:
-                        errors.append(f"{error_prefix}: {str(ge)}")
-                        gender = "Male"  # Placeholder for temporary object
-
-                    # Program identification - we work with program code
-                    prog_raw = row.get('program_code', row.get('program'))
-                    program_code = str(prog_raw).strip().upper() if pd.notna(prog_raw) else ""
-                    if not program_code:
-                        errors.append(f"{error_prefix}: Program Code is required.")
-                        continue
-
-                    # Check if program exists by code in the institution
-                    program_obj = prog_cache.get(program_code.lower())
-                    if not program_obj:
-                        prog_name = str(row.get('program_name', row.get('program', ''))).strip().upper() or f"{program_code} PROGRAM"
-                        raw_fac = str(row.get('faculty', 'GENERAL FACULTY')).strip().upper()
-                        raw_dept = str(row.get('department', 'GENERAL DEPARTMENT')).strip().upper()
-                        
-                        level = str(row.get('level', 'Degree')).strip().capitalize()
-                        category = str(row.get('category', 'STEM')).strip().upper()
-                        
-                        new_programs_to_create[program_code.lower()] = {
-                            "code": program_code,
-                            "name": prog_name,
-                            "department": raw_dept,
-                            "faculty": raw_fac,
-                            "level": level,
-                            "category": category
-                        }
-
-                    # -------- Status / Dropout --------
-                    status_raw = str(row.get('status', 'Active')).strip() if pd.notna(row.get('status')) else 'Active'
-                    status = valid_statuses.get(status_raw.lower(), status_raw)
-                    if not status:
-                        status = 'Active'
-                        
-                    dropout_raw = str(row.get('dropout_reason', '')).strip() if pd.notna(row.get('dropout_reason')) else ""
-                    dropout_reason = None
-                    if status == 'Dropout' and dropout_raw:
-                        dropout_reason = label_to_code.get(dropout_raw.lower(), dropout_raw)
-
-                    # -------- Enrollment Year --------
-                    enrollment_year_raw = row.get('enrollment_year')
-                    enrollment_year = 2025
-                    if pd.notna(enrollment_year_raw):
-                        try:
-                            enrollment_year = int(float(enrollment_year_raw))
-                        except ValueError:
-                            errors.append(f"{error_prefix}: Enrollment Year must be a number.")
-                    else:
-                        errors.append(f"{error_prefix}: Enrollment Year is required.")
-
-                    # -------- Graduation Year --------
-                    grad_year = None
-                    if pd.notna(row.get('graduation_year')):
-                        try:
-                            grad_year = int(float(row.get('graduation_year')))
-                        except ValueError:
-                            errors.append(f"{error_prefix}: Graduation Year must be a number.")
-
-                    # -------- Final Grade --------
-                    raw_grade = str(row.get('final_grade', '')).strip().lower()
-                    final_grade = GRADE_MAP.get(raw_grade) if raw_grade else None
-
-                    # -------- Work for Fees Fields --------
-                    work_fees_raw = str(row.get('is_work_for_fees', '')).strip().lower() if pd.notna(row.get('is_work_for_fees')) else ""
-                    is_work_for_fees = work_fees_raw in ['true', 'yes', '1', 'y', 't']
-                    
-                    work_area_raw = str(row.get('work_area', '')).strip() if pd.notna(row.get('work_area')) else ""
-                    work_area = None
-                    if work_area_raw:
-                        work_area = valid_work_areas.get(work_area_raw.lower(), work_area_raw)
-                            
-                    hours_pledged = 0
-                    if pd.notna(row.get('hours_pledged')):
-                        try:
-                            hours_pledged = int(float(row.get('hours_pledged')))
-                        except ValueError:
-                            errors.append(f"{error_prefix}: Hours Pledged must be a number.")
-
-                    inclusivity_raw = str(row.get('inclusivity_category', row.get('disability_type', ''))).strip() if pd.notna(row.get('inclusivity_category')) or pd.notna(row.get('disability_type')) else ""
-                    inclusivity_category = 'None'
-                    if inclusivity_raw:
-                        inclusivity_category = valid_inclusivity.get(inclusivity_raw.lower(), inclusivity_raw)
-
-                    sem_raw = str(row.get('enrollment_semester', row.get('semester', 'Semester 1'))).strip() if pd.notna(row.get('enrollment_semester')) or pd.notna(row.get('semester')) else 'Semester 1'
-                    enrollment_semester = valid_semesters.get(sem_raw.lower(), sem_raw)
-                    if not enrollment_semester:
-                        enrollment_semester = 'Semester 1'
-
-                    student_data = {
-                        "is_work_for_fees": is_work_for_fees,
-                        "work_area": work_area,
-                        "hours_pledged": hours_pledged,
-                        "status": status,
-                        "graduation_year": grad_year,
-                        "final_grade": final_grade,
-                        "gender": gender,
-                    }
-                    
-                    try:
-                        StudentService._validate_student_data(student_data)
-                        if status == 'Graduated':
-                            if not grad_year:
-                                raise ValidationError("Graduation year is required for graduated students.")
-                            if not final_grade:
-                                raise ValidationError("Final grade is required for graduated students.")
-                    except ValidationError as ve:
-                        # Extract error message string
-                        err_msg = ve.message if hasattr(ve, 'message') else str(ve)
-                        # Also handle dictionary or list of errors if wrapped
-                        if hasattr(ve, 'message_dict') and ve.message_dict:
-                            err_msg = str(ve.message_dict)
-                        errors.append(f"{error_prefix}: {err_msg}")
-
-                    rows_to_process.append({
-                        "row_num": row_num,
-                        "student_id": student_id,
-                        "first_name": first_name,
-                        "last_name": last_name,
-                        "gender": gender,
-                        "enrollment_year": enrollment_year,
-                        "enrollment_semester": enrollment_semester,
-                        "program_code": program_code,
-                        "national_id": str(row.get('national_id', '')).strip().upper() if pd.notna(row.get('national_id')) else None,
-                        "date_of_birth": str(row.get('date_of_birth', '')).strip().upper() if pd.notna(row.get('date_of_birth')) else None,
-                        "status": status,
-                        "dropout_reason": dropout_reason,
-                        "graduation_year": grad_year,
-                        "final_grade": final_grade,
-                        "is_work_for_fees": is_work_for_fees,
-                        "work_area": work_area,
-                        "hours_pledged": hours_pledged,
-                        "inclusivity_category": inclusivity_category,
-                    })
-
-                except Exception as e:
-                    errors.append(f"{error_prefix}: {str(e)}")
+            for chunk in iter_upload_chunks(file, chunk_size):
+                errors.extend(StudentService._validate_upload_chunk(
+                    chunk, prog_cache, seen_in_file, digest_owners, new_programs_to_create
+                ))
+                if progress:
+                    progress('validating', chunk.index[-1] + 1, total, len(errors))
+            del seen_in_file, digest_owners
 
             if errors:
                 raise ValidationError({"detail": "Bulk upload validation failed.", "errors": errors})
@@ -442,6 +444,7 @@ class StudentService:
                 }
 
             # Write transaction
+            created = 0
             with transaction.atomic():
                 # Process creation of programs, departments, and faculties if needed
                 for code_l, info in new_programs_to_create.items():
@@ -462,7 +465,7 @@ class StudentService:
                     department_obj = dept_cache.get(dept_key)
                     if not department_obj:
                         department_obj = Department.objects.create(
-                            faculty=faculty_obj,
+                            faculty_id=faculty_obj.id,
                             name=dept_name,
                             code=dept_name[:3].upper().replace(' ', ''),
                             description="Auto-created via Student Upload"
@@ -471,7 +474,8 @@ class StudentService:
 
                     # Create Program
                     program_obj = Program.objects.create(
-                        department=department_obj,
+                        department_id=department_obj.id,
+                        institution_id=institution_id,
                         name=info['name'],
                         code=info['code'],
                         duration=4,
@@ -481,47 +485,212 @@ class StudentService:
                         categories=[info['category']],
                         description="Auto-created via Student Upload"
                     )
-                    prog_cache[code_l] = program_obj
-
-                # Create Students
-                for r in rows_to_process:
-                    program_obj = prog_cache.get(r['program_code'].lower())
-                    
-                    student = Student(
-                        institution_id=institution_id,
-                        student_id=r['student_id'],
-                        first_name=r['first_name'],
-                        last_name=r['last_name'],
-                        national_id=r['national_id'],
-                        gender=r['gender'],
-                        date_of_birth=r['date_of_birth'],
-                        enrollment_year=r['enrollment_year'],
-                        enrollment_semester=r['enrollment_semester'],
-                        program=program_obj,
-                        faculty=program_obj.department.faculty if program_obj else None,
-                        department=program_obj.department if program_obj else None,
-                        status=r['status'],
-                        dropout_reason=r['dropout_reason'],
-                        graduation_year=r['graduation_year'],
-                        final_grade=r['final_grade'],
-                        is_work_for_fees=r['is_work_for_fees'],
-                        work_area=r['work_area'],
-                        hours_pledged=r['hours_pledged'],
-                        inclusivity_category=r['inclusivity_category']
-                    )
-                    
-                    # Call save-related validations
-                    # (Already validated in the first loop)
-                    students_to_create.append(student)
-
-                Student.objects.bulk_create(students_to_create)
+                    prog_cache[code_l] = program_node(program_obj, faculty_obj.id)
+
+                # ---------------- PASS 2: CREATE STUDENTS ----------------
+                # Fernet/HMAC work for each chunk runs in settings.ENCRYPTION_WORKERS processes
+                with EncryptionPipeline(Student) as pipeline:
+                    for chunk in iter_upload_chunks(file, chunk_size):
+                        students_to_create = []
+                        for r in StudentService._normalize_upload_chunk(chunk).to_dict('records'):
+                            program_obj = prog_cache.get(r['program_code'].lower())
+
+                            students_to_create.append(Student(
+                                institution_id=institution_id,
+                                student_id=r['student_id'],
+                                first_name=r['first_name'],
+                                last_name=r['last_name'],
+                                national_id=r['national_id'],
+                                gender=r['gender'],
+                                date_of_birth=r['date_of_birth'],
+                                enrollment_year=r['enrollment_year'],
+                                enrollment_semester=r['enrollment_semester'],
+                                program_id=program_obj.id if program_obj else None,
+                                faculty_id=program_obj.faculty_id if program_obj else None,
+                                department_id=program_obj.department_id if program_obj else None,
+                                status=r['status'],
+                                dropout_reason=r['dropout_reason'],
+                                graduation_year=r['graduation_year'],
+                                final_grade=r['final_grade'],
+                                is_work_for_fees=r['is_work_for_fees'],
+                                work_area=r['work_area'],
+                                hours_pledged=r['hours_pledged'],
+                                inclusivity_category=r['inclusivity_category']
+                            ))
+
+                        pipeline.prepare(students_to_create)
+                        # COPY on PostgreSQL; a student_id taken since validation is skipped,
+                        # a National ID taken since validation rejects the file like pass 1 does
+                        clashes = {}
+                        inserted = bulk_insert(
+                            Student, students_to_create, 'student_id', batch_size=StudentService.UPLOAD_BATCH_SIZE,
+                            clashes=clashes
+                        )
+                        if clashes:
+                            raise ValidationError({
+                                "detail": "Bulk upload validation failed.",
+                                "errors": [
+                                    f"Student ID {sid}: A student with this National ID already exists."
+                                    for sid in clashes['national_id_bidx']
+                                ],
+                            })
+                        # Neither path runs Student.save(), so open the ledgers and
+                        # invalidate cached reports here
+                        StudentBalance.objects.refresh([s.pk for s in inserted])
+                        bump_report_version(Student, institution_id)
+                        created += len(inserted)
+                        if progress:
+                            progress('saving', created, total, 0)
 
             return {
                 "requires_approval": False,
-                "count": len(students_to_create)
+                "count": created
             }
 
         except ValidationError:
             raise
         except Exception as e:
-            raise ValidationError(f"Processing error: {str(e)}")
\ No newline at end of file
+            raise ValidationError(f"Processing error: {str(e)}")
+
+
+    @staticmethod
+    def bulk_graduate_from_file(file, institution_id, progress=None):
+        """
+        Graduate upload: marks existing students of the institution as
+        'Graduated' or creates historical records for new ones. Rejects the
+        whole file if any row is invalid.
+        """
+        if file.name.endswith('.csv'):
+            df = pd.read_csv(file, dtype=str)
+        else:
+            df = pd.read_excel(file, dtype=str)
+
+        # Standardize headers
+        df.columns = [str(c).strip().lower().replace(' ', '_') for c in df.columns]
+
+        # 1. Strict Column Validation
+        required_columns = [
+            'student_id', 'first_name', 'last_name',
+            'gender', 'program_code', 'graduation_year', 'final_grade'
+        ]
+
+        missing_cols = [col for col in required_columns if col not in df.columns]
+        if missing_cols:
+            raise ValidationError({
+                "detail": "Invalid file format.",
+                "errors": [f"Missing required columns: {', '.join(missing_cols)}"]
+            })
+
+        # Cache programs by code
+        prog_cache = get_hierarchy(institution_id).program_by_code
+
+        # 2. Column-wise validation (core.utils.upload_validation)
+        student_id = clean_text(df, 'student_id', upper=True)
+        grad_year, grad_year_invalid = to_int(clean_text(df, 'graduation_year'))
+        final_grade = normalize_choice(clean_text(df, 'final_grade'), GRADE_MAP)
+        # Upper-cased here because bulk_create skips Student.save()
+        first_name = clean_text(df, 'first_name', upper=True)
+        last_name = clean_text(df, 'last_name', upper=True)
+        prog_code = clean_text(df, 'program_code').str.lower()
+        enrollment_year, enrollment_year_invalid = to_int(clean_text(df, 'enrollment_year'))
+        gender = normalize_choice(clean_text(df, 'gender', default='Other'), GENDER_MAP)
+        national_id = clean_text(df, 'national_id', upper=True)
+
+        # Existing students of this institution: one query for the whole file
+        existing = {
+            s.student_id: s
+            for s in Student.objects.filter(
+                institution_id=institution_id, student_id__in=set(student_id) - {''}
+            )
+        }
+        program = prog_code.map(prog_cache)
+
+        row_num = (df.index + 2).astype(str)
+        prefix = "Row " + row_num + " (Student " + student_id + ")"
+        errors = RowErrors(df.index)
+        missing_id = errors.add(student_id == '', "Student ID is empty.")
+        incomplete = errors.add(
+            ~missing_id & (grad_year.isna() | (final_grade == '')) & ~grad_year_invalid,
+            "Graduation Year and Final Grade are required.",
+        )
+        bad_year = errors.add(~missing_id & grad_year_invalid, "Graduation Year must be a number.")
+        new = ~missing_id & ~incomplete & ~bad_year & ~student_id.isin(existing.keys())
+        no_program = errors.add(
+            new & program.isna(),
+            "Program code '" + prog_code + "' not found in your institution.",
+        )
+        errors.add(
+            new & ~no_program & ((first_name == '') | (last_name == '')),
+            "First Name and Last Name are required for new records.",
+        )
+        errors.add(new & ~no_program & enrollment_year_invalid, "Enrollment Year must be a number.")
+        error_list = errors.flat(prefix.where(~missing_id, "Row " + row_num))
+
+        # National ID uniqueness of new records (in file + database), as in bulk_create_from_file
+        digest_owners = {}
+        candidates = new & (national_id != '')
+        for row, national in zip(prefix[candidates], national_id[candidates]):
+            digest = StudentService.national_id_digest(national)
+            if digest in digest_owners:
+                error_list.append(f"{row}: Duplicate National ID in the uploaded file (also used by {digest_owners[digest]}).")
+                continue
+            digest_owners[digest] = row
+        for digest in StudentService.existing_national_ids(digest_owners.keys()):
+            error_list.append(f"{digest_owners[digest]}: A student with this National ID already exists.")
+
+        # 3. Fail the entire upload if there are any errors
+        if progress:
+            progress('validating', len(df), len(df), len(error_list))
+        if error_list:
+            raise ValidationError({"detail": "Bulk upload failed due to data errors.", "errors": error_list})
+
+        to_update = []
+        to_create = []
+        for i, sid in enumerate(student_id):
+            if sid in existing:
+                # Update existing student
+                student = existing[sid]
+                student.status = 'Graduated'
+                student.graduation_year = grad_year.iat[i]
+                student.final_grade = final_grade.iat[i]
+                to_update.append(student)
+                continue
+
+            # Create historical record
+            prog = program.iat[i]
+            year = enrollment_year.iat[i]
+            if year is None:
+                year = grad_year.iat[i] - prog.duration
+            to_create.append(Student(
+                institution_id=institution_id,
+                student_id=sid,
+                national_id=national_id.iat[i] or None,
+                first_name=first_name.iat[i],
+                last_name=last_name.iat[i],
+                gender=gender.iat[i],
+                enrollment_year=year,
+                program_id=prog.id,
+                status='Graduated',
+                graduation_year=grad_year.iat[i],
+                final_grade=final_grade.iat[i]
+            ))
+
+        batch_size = StudentService.UPLOAD_BATCH_SIZE
+        with transaction.atomic():
+            for start in range(0, len(to_update), batch_size):
+                batch = to_update[start:start + batch_size]
+                Student.objects.bulk_update(batch, ['status', 'graduation_year', 'final_grade'])
+                if progress:
+                    progress('saving', start + len(batch), len(df), 0)
+            for start in range(0, len(to_create), batch_size):
+                batch = to_create[start:start + batch_size]
+                Student.objects.bulk_create(batch)
+                # bulk_create skips Student.save(), so open the ledgers here
+                StudentBalance.objects.refresh([s.pk for s in batch])
+                if progress:
+                    progress('saving', len(to_update) + start + len(batch), len(df), 0)
+            if to_update or to_create:
+                # Neither bulk path runs Student.save(): invalidate cached reports here
+                bump_report_version(Student, institution_id)
+
+        return {"updated": len(to_update), "created": len(to_create)}
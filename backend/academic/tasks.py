@@ -1,46 +1,51 @@
-import base64
-import pandas as pd
-import io
 from celery import shared_task
-from django.core.files.base import ContentFile
-from .services.student_services import StudentIngestionService
-from instauth.models import Institution
+from django.core.exceptions import ValidationError
+from core.utils.upload_jobs import UploadProgress, open_upload, upload_error_payload
+from .services.student_services import StudentService
 import logging
 
 logger = logging.getLogger(__name__)
 
 @shared_task(bind=True)
-def process_student_csv_upload(self, base64_csv_data, institution_id, user_email):
+def process_student_upload(self, file_path, institution_id, confirm_creation=False):
     """
-    Celery task to asynchronously process massive CSV files.
-    Notice how we pass base64 data, because Celery cannot serialize raw Python File objects over Redis!
+    Celery task for large student uploads.
+    The web request saves the file to storage and passes only its path (see
+    core.utils.upload_jobs); progress is published as PROGRESS task state for
+    core.views.check_task_status.
     """
+    logger.info(f"Starting async student upload for institution {institution_id}")
     try:
-        logger.info(f"Starting async CSV processing for institution {institution_id}")
-        
-        # Decode the file
-        csv_bytes = base64.b64decode(base64_csv_data)
-        file_obj = io.BytesIO(csv_bytes)
-        file_obj.name = "upload.csv"
-        
-        # In a real heavy task, you could update the state so the frontend can poll it:
-        # self.update_state(state='PROGRESS', meta={'current': 0, 'total': 10000})
-        
-        institution = Institution.objects.get(id=institution_id)
-        
-        # Run the heavy ingestion
-        result = StudentIngestionService.process_student_upload(file_obj, institution)
-        
-        # When done, you could send an email to user_email:
-        # send_mail("Upload Complete", f"Successfully imported {result['imported']} students.", "system@tesc.com", [user_email])
-        
-        return {
-            "status": "success",
-            "imported": result.get("imported", 0),
-            "errors": result.get("errors", [])
-        }
-        
-    except Exception as e:
-        logger.exception("Failed to process async CSV upload")
+        with open_upload(file_path) as file_obj:
+            result = StudentService.bulk_create_from_file(
+                file_obj, institution_id, confirm_creation=confirm_creation, progress=UploadProgress(self)
+            )
+    except ValidationError as e:
+        return {"status": "error", **upload_error_payload(e)}
+    except Exception:
+        logger.exception("Failed to process async student upload")
         # Sentry will automatically catch this exception!
         raise
+
+    if result.get("requires_approval"):
+        # Nothing was written; the client re-submits with confirm_creation once approved
+        return {"status": "requires_approval", "new_programs": result["new_programs"]}
+    return {"status": "success", "imported": result["count"]}
+
+
+@shared_task(bind=True)
+def process_graduate_upload(self, file_path, institution_id):
+    """Celery task for large graduate uploads (see process_student_upload)."""
+    logger.info(f"Starting async graduate upload for institution {institution_id}")
+    try:
+        with open_upload(file_path) as file_obj:
+            result = StudentService.bulk_graduate_from_file(
+                file_obj, institution_id, progress=UploadProgress(self)
+            )
+    except ValidationError as e:
+        return {"status": "error", **upload_error_payload(e)}
+    except Exception:
+        logger.exception("Failed to process async graduate upload")
+        raise
+
+    return {"status": "success", **result}
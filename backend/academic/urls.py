@@ -16,7 +16,7 @@ from .app_views.industry_placement_views import IndustryPlacementViewSet
 from .app_views.scholarship_views import StudentScholarshipViewSet
 from .app_views.mobility_views import InternationalMobilityViewSet
 from .app_views.transfer_views import InCountryTransferViewSet
-from .app_views.ingestion_views import TemplateDownloadView, ValidateUploadView, CommitUploadView
+from .app_views.ingestion_views import TemplateDownloadView, ValidateUploadView, CommitUploadView, StagedUploadViewSet
 from faculties.views import FacultyViewSet # Import FacultyViewSet
 
 router = DefaultRouter()
@@ -31,6 +31,7 @@ router.register(r'placements', IndustryPlacementViewSet, basename='placement')
 router.register(r'scholarships', StudentScholarshipViewSet, basename='scholarship')
 router.register(r'mobility', InternationalMobilityViewSet, basename='mobility')
 router.register(r'transfers', InCountryTransferViewSet, basename='transfer')
+router.register(r'ingestion/uploads', StagedUploadViewSet, basename='staged-upload')
 
 urlpatterns = [
     path('students/bulk-delete/', BulkDeleteView.as_view(), name='student-bulk-delete'),
@@ -1,8 +1,8 @@
 from rest_framework import viewsets, status
 from rest_framework.response import Response
-from django.db.models import Sum, F, Q, DecimalField, ExpressionWrapper
+from django.db.models import Sum, Q, DecimalField
 from django.db.models.functions import TruncMonth, Coalesce
-from academic.models import Student, Payment, FeeStructure
+from academic.models import Student, Payment, FeeStructure, StudentBalance, program_fee
 from faculties.models import Program
 from datetime import datetime
 from rest_framework.decorators import action
@@ -19,9 +19,9 @@ class FinancialAnalysisViewSet(viewsets.ViewSet):
         # Targets: Only Active students
         active_students = Student.objects.filter(status='Active')
         
-        # Explicitly cast to Decimal to avoid Float errors
+        # Priced like the StudentBalance ledger (program_fee)
         total_expected = active_students.aggregate(
-            total=Coalesce(Sum('program__fees__semester_fee'), 0, output_field=DecimalField())
+            total=Coalesce(Sum(program_fee()), 0, output_field=DecimalField())
         )['total']
         
         total_collected = Payment.objects.filter(date_paid__year=current_year).aggregate(
@@ -64,9 +64,9 @@ class FinancialAnalysisViewSet(viewsets.ViewSet):
         # Base filter for active students
         active_students = Student.objects.filter(institution_id=inst_id, status='Active')
         
-        # 1. Stats Calculations
+        # 1. Stats Calculations (priced like the StudentBalance ledger read below)
         total_expected = active_students.aggregate(
-            total=Coalesce(Sum('program__fees__semester_fee'), 0, output_field=DecimalField())
+            total=Coalesce(Sum(program_fee()), 0, output_field=DecimalField())
         )['total']
         
         total_collected = Payment.objects.filter(
@@ -75,20 +75,18 @@ class FinancialAnalysisViewSet(viewsets.ViewSet):
             total=Coalesce(Sum('amount'), 0, output_field=DecimalField())
         )['total']
 
-        # 2. Arrears Calculation
-        top_pending_raw = active_students.annotate(
-            paid=Coalesce(Sum('payments__amount'), 0, output_field=DecimalField()),
-            fee=Coalesce(F('program__fees__semester_fee'), 0, output_field=DecimalField())
-        ).annotate(
-            balance=ExpressionWrapper(
-                F('fee') - F('paid'),
-                output_field=DecimalField(max_digits=12, decimal_places=2)
-            )
-        ).filter(balance__gt=0).order_by('-balance')[:5]
+        # 2. Arrears Calculation (walks the StudentBalance.balance index)
+        top_pending_raw = StudentBalance.objects.filter(
+            student__institution_id=inst_id,
+            student__status='Active',
+            balance__gt=0,
+        ).select_related('student').order_by('-balance')[:5]
         
+        # Programs keep their institution when their department is deleted
+        # (SET_NULL); their students still count in total_expected above
         programs_list = Program.objects.filter(
-            department__faculty__institution_id=inst_id
-        ).values('id', 'name', 'semester_fee')
+            Q(institution_id=inst_id) | Q(department__faculty__institution_id=inst_id)
+        ).values('id', 'name', fee=program_fee(''))
 
         # 3. Fee Structure - Robust lookup
         # This assumes: FeeStructure -> Program -> Department -> Faculty -> Institution
@@ -97,7 +95,7 @@ class FinancialAnalysisViewSet(viewsets.ViewSet):
     {
         "program_id": p['id'],
         "program__name": p['name'],
-        "semester_fee": float(p['semester_fee'])
+        "semester_fee": float(p['fee'])
     } for p in programs_list
 ]
 
@@ -109,7 +107,7 @@ class FinancialAnalysisViewSet(viewsets.ViewSet):
                 "studentsWithPending": active_students.count()
             },
             "top_pending": [
-                {"student_id": s.student_id, "full_name": s.full_name, "balance": float(s.balance)} 
+                {"student_id": s.student.student_id, "full_name": s.student.full_name, "balance": float(s.balance)} 
                 for s in top_pending_raw
             ],
             "fee_structure": list(fee_structure)
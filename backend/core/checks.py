@@ -0,0 +1,38 @@
+"""
+System checks for the field-encryption settings.
+
+Student and Staff saves need CRYPTOGRAPHY_KEYS (to encrypt) and
+BLIND_INDEX_KEY (to compute the blind indexes), so a missing key is
+reported by `manage.py check`, `migrate` and `runserver` at startup rather
+than by the first write.
+"""
+
+from django.conf import settings
+from django.core.checks import Error, Warning, register
+
+
+@register()
+def check_encryption_keys(app_configs, **kwargs):
+    messages = []
+    fernet_keys = getattr(settings, 'FERNET_KEYS', [])
+    blind_index_key = getattr(settings, 'BLIND_INDEX_KEY', '')
+
+    if not fernet_keys:
+        messages.append(Warning(
+            "CRYPTOGRAPHY_KEYS is not set; encrypted fields can't be read or written.",
+            hint="Generate a key with: python manage.py generate_key",
+            id='core.W001',
+        ))
+    if not blind_index_key:
+        messages.append(Warning(
+            "BLIND_INDEX_KEY is not set; saving students and staff will fail.",
+            hint="Generate a key with: python manage.py generate_key (use a different key than CRYPTOGRAPHY_KEYS)",
+            id='core.W002',
+        ))
+    elif blind_index_key in fernet_keys:
+        messages.append(Error(
+            "BLIND_INDEX_KEY must be different from the CRYPTOGRAPHY_KEYS.",
+            hint="Rotating an encryption key would otherwise invalidate every blind index.",
+            id='core.E001',
+        ))
+    return messages
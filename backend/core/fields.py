@@ -1,21 +1,51 @@
 import logging
 import datetime
+from django.contrib.postgres.fields import ArrayField
 from django.db import models
+from django.db.models.query_utils import DeferredAttribute
 from cryptography.fernet import InvalidToken
+from core.managers import lazy_decryption_active
 # Import encryption utilities
-from core.utils.crypto import get_fernet, get_multi_fernet
+from core.utils.crypto import (
+    encrypt_token, decrypt_token, is_encrypted, blind_index, ngram_tokens, ngram_match, NGRAM_TOKEN_LENGTH,
+)
 
 logger = logging.getLogger(__name__)
 
+
+class EncryptedAttribute(DeferredAttribute):
+    """
+    Model attribute for an EncryptedTextField that decrypts on first access.
+
+    Rows loaded through EncryptedQuerySet keep the ciphertext in
+    instance.__dict__; the first read decrypts it and memoizes the plaintext
+    there, so each value is decrypted at most once and never if unread.
+    """
+
+    def __get__(self, instance, cls=None):
+        if instance is None:
+            return self
+        value = super().__get__(instance, cls)
+        if is_encrypted(value):
+            try:
+                value = decrypt_token(value)
+            except InvalidToken:
+                return value
+            instance.__dict__[self.field.attname] = value
+        return value
+
+    def __set__(self, instance, value):
+        instance.__dict__[self.field.attname] = value
+
+
 class EncryptedTextField(models.TextField):
     description = "An encrypted text field"
+    descriptor_class = EncryptedAttribute
 
     @staticmethod
     def is_fernet_token(value):
-        """Check if a string looks like a Fernet token."""
-        if not isinstance(value, str):
-            return False
-        return value.startswith('gAAAAA')
+        """Check if a string looks like an encrypted value (key-id envelope or legacy Fernet token)."""
+        return is_encrypted(value)
 
     def get_prep_value(self, value):
         """Encrypt value before saving to database."""
@@ -34,19 +64,26 @@ class EncryptedTextField(models.TextField):
             return value
 
         try:
-            # Use the imported get_fernet
-            f = get_fernet()
-            return f.encrypt(value.encode()).decode()
+            # Tagged with the key id so reads skip MultiFernet's trial decryption
+            return encrypt_token(value)
         except Exception as e:
             logger.error(f"Encryption failed: {e}")
             return value
 
+    def pre_save(self, model_instance, add):
+        # A value that was never read is still ciphertext: write it back as is
+        if self.attname in model_instance.__dict__:
+            return model_instance.__dict__[self.attname]
+        return super().pre_save(model_instance, add)
+
     def from_db_value(self, value, expression, connection):
         if value is None:
             return value
+        if lazy_decryption_active():
+            # Decrypted by EncryptedAttribute when (if) the value is read
+            return value
         try:
-            f = get_multi_fernet()
-            return f.decrypt(value.encode()).decode()
+            return decrypt_token(value)
         except (InvalidToken, Exception):
             return value
 
@@ -54,10 +91,131 @@ class EncryptedTextField(models.TextField):
         if value is None:
             return value
         try:
-            f = get_multi_fernet()
             # If it's already a token, decrypt it
             if self.is_fernet_token(value):
-                return f.decrypt(value.encode()).decode()
+                return decrypt_token(value)
             return value
         except Exception:
-            return value
\ No newline at end of file
+            return value
+
+
+def _prepared_index(model_instance, field):
+    """
+    Index value computed ahead of time by core.utils.encryption_pipeline,
+    or _NOT_PREPARED if there is none or a source field changed since.
+    """
+    prepared = model_instance.__dict__.get('_prepared_indexes')
+    if not prepared or field.attname not in prepared:
+        return _NOT_PREPARED
+    sources, value = prepared[field.attname]
+    for name, token in zip(field.source_fields, sources):
+        if model_instance.__dict__.get(name) != token:
+            return _NOT_PREPARED
+    return value
+
+
+_NOT_PREPARED = object()
+
+
+def _index_plaintext(value, field_name):
+    """Plaintext of a source value that may still be a Fernet token."""
+    if EncryptedTextField.is_fernet_token(value):
+        try:
+            return decrypt_token(value)
+        except InvalidToken:
+            logger.warning(f"Cannot build search index for undecryptable {field_name}")
+            return None
+    return value
+
+
+class BlindIndexField(models.CharField):
+    """
+    Keyed HMAC digest of an encrypted field on the same model.
+
+    Fernet tokens use a random IV, so equal plaintexts never produce equal
+    ciphertexts and the encrypted column can't be filtered or indexed.
+    This companion column stores blind_index(plaintext), which is
+    deterministic and btree-indexed, so exact-match lookups become one
+    indexed query. It is recomputed on every save() and bulk_create().
+    """
+    description = "A blind index for an encrypted field"
+
+    def __init__(self, *args, source_field=None, **kwargs):
+        self.source_field = source_field
+        kwargs.setdefault('max_length', 64)
+        kwargs.setdefault('null', True)
+        kwargs.setdefault('blank', True)
+        kwargs.setdefault('editable', False)
+        kwargs.setdefault('db_index', True)
+        super().__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        kwargs['source_field'] = self.source_field
+        return name, path, args, kwargs
+
+    @property
+    def source_fields(self):
+        return [self.source_field]
+
+    def compute(self, value):
+        """Digest for a plaintext (or still-encrypted) source value."""
+        value = _index_plaintext(value, self.source_field)
+        if value is None:
+            return None
+        return blind_index(value, self.source_field)
+
+    def pre_save(self, model_instance, add):
+        digest = _prepared_index(model_instance, self)
+        if digest is _NOT_PREPARED:
+            digest = self.compute(getattr(model_instance, self.source_field))
+        setattr(model_instance, self.attname, digest)
+        return digest
+
+
+class NgramIndexField(ArrayField):
+    """
+    Keyed n-gram tokens of one or more encrypted fields, for partial matches.
+
+    Each word of the source values is split into 2- and 3-grams, and every
+    gram is stored as a truncated HMAC keyed with the column name (see
+    core.utils.crypto.ngram_tokens).
+    A substring search becomes `tokens @> query_tokens`, served by a GIN
+    index, so names can be searched by prefix or fragment without decrypting
+    rows. Like BlindIndexField it is recomputed on save() and bulk_create().
+    """
+    description = "Keyed n-gram tokens for an encrypted field"
+
+    def __init__(self, *args, source_fields=(), **kwargs):
+        self.source_fields = list(source_fields)
+        kwargs.setdefault('base_field', models.CharField(max_length=NGRAM_TOKEN_LENGTH))
+        kwargs.setdefault('default', list)
+        kwargs.setdefault('blank', True)
+        kwargs.setdefault('editable', False)
+        super().__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        kwargs['source_fields'] = self.source_fields
+        return name, path, args, kwargs
+
+    def compute_tokens(self, model_instance):
+        tokens = set()
+        for field_name in self.source_fields:
+            value = _index_plaintext(getattr(model_instance, field_name), field_name)
+            tokens.update(ngram_tokens(value, self.name))
+        return sorted(tokens)
+
+    def matches(self, term, values):
+        """Whether the source `values` (plaintext or tokens, in source_fields order) really contain `term`."""
+        plaintexts = [
+            _index_plaintext(value, field_name) for field_name, value in zip(self.source_fields, values)
+        ]
+        return ngram_match(term, plaintexts)
+
+    def pre_save(self, model_instance, add):
+        tokens = _prepared_index(model_instance, self)
+        if tokens is _NOT_PREPARED:
+            tokens = self.compute_tokens(model_instance)
+        setattr(model_instance, self.attname, tokens)
+        return tokens
@@ -0,0 +1,111 @@
+from django.db.models import Q
+from django.db.models.constants import LOOKUP_SEP
+from rest_framework import filters
+
+from core.utils.crypto import blind_index, ngram_query_is_exact, ngram_query_tokens
+
+BLIND_INDEX_SUFFIX = '_bidx'
+
+
+def blind_index_q(field_path, value):
+    """
+    Exact-match Q object for an encrypted field, resolved through its blind index.
+    e.g. blind_index_q('student__national_id', '63-123456A12') filters on
+    student__national_id_bidx with the keyed digest of the value.
+    """
+    context = field_path.split(LOOKUP_SEP)[-1]
+    return Q(**{f"{field_path}{BLIND_INDEX_SUFFIX}": blind_index(value, context)})
+
+
+def _resolve_field(model, field_path):
+    *relations, name = field_path.split(LOOKUP_SEP)
+    for relation in relations:
+        model = model._meta.get_field(relation).related_model
+    return model._meta.get_field(name)
+
+
+def ngram_q(field_path, value, queryset=None):
+    """
+    Substring-match Q object over an NgramIndexField, e.g.
+    ngram_q('student__name_tokens', 'tin') matches any student whose first
+    or last name contains TIN. Returns None when the value is too short to
+    produce tokens (single letters are not indexed).
+
+    Tokens of a word longer than three letters can all be present without
+    the word (see core.utils.crypto.ngram_query_is_exact). Given the
+    queryset being searched, such a term's candidates are decrypted and
+    re-checked, and the Q matches the primary keys of the real matches.
+    """
+    context = field_path.split(LOOKUP_SEP)[-1]
+    tokens = ngram_query_tokens(value, context)
+    if not tokens:
+        return None
+    token_q = Q(**{f"{field_path}__contains": tokens})
+    if queryset is None or ngram_query_is_exact(value):
+        return token_q
+
+    field = _resolve_field(queryset.model, field_path)
+    prefix = field_path[:-len(context)]
+    source_paths = [prefix + source for source in field.source_fields]
+    candidates = queryset.filter(token_q).values_list('pk', *source_paths)
+    return Q(pk__in=[pk for pk, *values in candidates if field.matches(value, values)])
+
+
+def split_search_terms(search):
+    """Split a search string into terms the same way DRF's SearchFilter does."""
+    if not search:
+        return []
+    return search.replace('\x00', '').replace(',', ' ').split()
+
+
+def build_search_q(search, blind_fields=(), plain_fields=(), ngram_fields=(), queryset=None):
+    """
+    Build a search Q object over encrypted and plaintext columns.
+
+    Every term must match at least one field (AND across terms, OR across
+    fields). Encrypted fields are matched exactly through their blind index
+    or by substring through their n-gram tokens, plaintext fields with
+    icontains. Pass the queryset being searched to have n-gram matches of
+    longer terms re-checked (see ngram_q); without it they may include
+    false positives.
+    """
+    query = Q()
+    for term in split_search_terms(search):
+        term_q = Q()
+        for field_path in blind_fields:
+            term_q |= blind_index_q(field_path, term)
+        for field_path in ngram_fields:
+            token_q = ngram_q(field_path, term, queryset)
+            if token_q is not None:
+                term_q |= token_q
+        for field_path in plain_fields:
+            term_q |= Q(**{f"{field_path}__icontains": term})
+        if not term_q:
+            # Nothing can match a term that produced no lookups
+            term_q = Q(pk__in=[])
+        query &= term_q
+    return query
+
+
+class BlindIndexSearchFilter(filters.SearchFilter):
+    """
+    SearchFilter that understands encrypted columns.
+
+    Views keep plaintext columns in `search_fields`, list encrypted ones in
+    `blind_index_search_fields` and NgramIndexFields in `ngram_search_fields`.
+    Encrypted columns are searched by exact (normalized) value through an
+    indexed digest, or by fragment through GIN-indexed n-gram tokens. Only
+    the rows the tokens select for a term longer than three letters are
+    decrypted, to drop false positives (see ngram_q).
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        blind_fields = getattr(view, 'blind_index_search_fields', None) or ()
+        ngram_fields = getattr(view, 'ngram_search_fields', None) or ()
+        plain_fields = self.get_search_fields(view, request) or ()
+        search = request.query_params.get(self.search_param, '')
+
+        if not split_search_terms(search) or not (blind_fields or plain_fields or ngram_fields):
+            return queryset
+
+        return queryset.filter(build_search_q(search, blind_fields, plain_fields, ngram_fields, queryset))
@@ -0,0 +1,80 @@
+"""
+Management command to benchmark field decryption with 1, 2 and 3 configured keys.
+
+Compares the legacy read path (bare Fernet token, MultiFernet tries every key
+in turn) with the key-id envelope (decrypted directly by the key that wrote
+it). Values are encrypted with the OLDEST key, the worst case during a
+rotation window. Uses throwaway keys; nothing touches the database.
+
+Usage:
+    python manage.py benchmark_decryption
+    python manage.py benchmark_decryption --values 50000
+"""
+
+import time
+
+from cryptography.fernet import Fernet
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+
+from core.utils import crypto
+
+
+class Command(BaseCommand):
+    help = 'Benchmark decrypt throughput: MultiFernet trial decryption vs key-id envelopes'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--values',
+            type=int,
+            default=20000,
+            help='Number of values to decrypt per run (default: 20000)',
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=5,
+            help='Runs per measurement; the best one is reported (default: 5)',
+        )
+
+    def handle(self, *args, **options):
+        count = options['values']
+        self.repeat = options['repeat']
+
+        self.stdout.write(f"\n{'='*60}")
+        self.stdout.write(f"Decrypt throughput, {count} values encrypted with the oldest key")
+        self.stdout.write(f"{'='*60}")
+        self.stdout.write(f"{'Keys':<6}{'Legacy (MultiFernet)':>24}{'Envelope':>16}{'Speed-up':>12}")
+
+        try:
+            for key_count in (1, 2, 3):
+                keys = [Fernet.generate_key().decode() for _ in range(key_count)]
+                plaintexts = [f"VALUE-{i:08d}" for i in range(count)]
+                oldest = Fernet(keys[-1].encode())
+                legacy = [oldest.encrypt(p.encode()).decode() for p in plaintexts]
+                enveloped = [
+                    f"{crypto.ENVELOPE_PREFIX}{crypto.key_id(keys[-1])}:{token}" for token in legacy
+                ]
+
+                with override_settings(FERNET_KEYS=keys):
+                    crypto.clear_cache()
+                    multi = crypto.get_multi_fernet()
+                    legacy_rate = self._rate(lambda v: multi.decrypt(v.encode()).decode(), legacy)
+                    envelope_rate = self._rate(crypto.decrypt_token, enveloped)
+
+                self.stdout.write(
+                    f"{key_count:<6}{legacy_rate:>20,.0f}/s{envelope_rate:>12,.0f}/s"
+                    f"{envelope_rate / legacy_rate:>11.2f}x"
+                )
+        finally:
+            crypto.clear_cache()
+
+    def _rate(self, decrypt, values):
+        """Best-of-N values/second, to keep scheduler noise out of the comparison."""
+        best = float('inf')
+        for _ in range(self.repeat):
+            start = time.perf_counter()
+            for value in values:
+                decrypt(value)
+            best = min(best, time.perf_counter() - start)
+        return len(values) / best
@@ -0,0 +1,89 @@
+"""
+Management command to benchmark the bulk upload encryption stage with 1, 2, 4 and 8 processes.
+
+Builds unsaved Student instances with plaintext names, national IDs and
+dates of birth, and times EncryptionPipeline.prepare() (Fernet encryption,
+blind indexes and name n-gram tokens) for each worker count. The baseline
+is the work the insert used to do row by row: pre_save() and
+get_db_prep_save() of every field, in-process. Nothing touches the database.
+
+Usage:
+    python manage.py benchmark_encryption_pipeline
+    python manage.py benchmark_encryption_pipeline --rows 100000 --workers 1,2,4,8
+"""
+
+import os
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from academic.models import Student
+from core.utils.encryption_pipeline import EncryptionPipeline
+
+
+class Command(BaseCommand):
+    help = 'Benchmark pre-encryption of bulk upload rows across worker process counts'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rows',
+            type=int,
+            default=50000,
+            help='Number of students to encrypt per run (default: 50000)',
+        )
+        parser.add_argument(
+            '--workers',
+            type=str,
+            default='1,2,4,8',
+            help='Comma-separated worker counts to test (default: 1,2,4,8)',
+        )
+
+    def handle(self, *args, **options):
+        count = options['rows']
+        worker_counts = [int(n) for n in options['workers'].split(',') if n.strip()]
+
+        self.stdout.write(f"\n{'='*60}")
+        self.stdout.write(f"Encryption stage, {count:,} students, {os.cpu_count()} CPUs")
+        self.stdout.write(f"{'='*60}")
+        self.stdout.write(f"{'Workers':<12}{'Seconds':>10}{'Rows/sec':>14}{'Speed-up':>12}")
+
+        # ----- BASELINE: PER-ROW PRE_SAVE IN THE INSERTING PROCESS -----
+        students = self._students(count)
+        fields = [f for f in Student._meta.concrete_fields if not f.primary_key]
+        started = time.perf_counter()
+        for student in students:
+            for field in fields:
+                field.get_db_prep_save(field.pre_save(student, True), connection)
+        baseline = time.perf_counter() - started
+        self.stdout.write(f"{'inline':<12}{baseline:>10.1f}{count / baseline:>14,.0f}{1:>11.2f}x")
+
+        # ----- PIPELINE -----
+        for workers in worker_counts:
+            students = self._students(count)
+            with EncryptionPipeline(Student, workers=workers) as pipeline:
+                started = time.perf_counter()
+                pipeline.prepare(students)
+                # What the insert still does per row once the stage has run
+                for student in students:
+                    for field in fields:
+                        field.get_db_prep_save(field.pre_save(student, True), connection)
+                elapsed = time.perf_counter() - started
+            self.stdout.write(
+                f"{workers:<12}{elapsed:>10.1f}{count / elapsed:>14,.0f}{baseline / elapsed:>11.2f}x"
+            )
+
+    def _students(self, count):
+        return [
+            Student(
+                student_id=f"ENC{i:07d}",
+                first_name=f"FIRST{i % 997}",
+                last_name=f"LAST{i % 991}",
+                national_id=f"EN{i:08d}X",
+                date_of_birth='2001-01-01',
+                gender='Male',
+                enrollment_year=2024,
+                institution_id=1,
+            )
+            for i in range(count)
+        ]
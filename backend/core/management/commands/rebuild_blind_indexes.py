@@ -0,0 +1,157 @@
+"""
+Management command to (re)build blind index and n-gram token columns for
+encrypted fields.
+
+Run it once after deploying the blind index columns, and again whenever
+BLIND_INDEX_KEY changes. Unique digests (e.g. Student.national_id_bidx) are
+checked per batch with one set-membership query; rows that would collide with
+an existing value are left empty and reported so they can be fixed by hand.
+
+Usage:
+    python manage.py rebuild_blind_indexes
+    python manage.py rebuild_blind_indexes --model Student
+    python manage.py rebuild_blind_indexes --missing-only
+"""
+
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+
+from core.fields import BlindIndexField, NgramIndexField
+
+
+class Command(BaseCommand):
+    help = 'Recompute blind index digests and n-gram tokens for all models with encrypted, searchable fields'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--model',
+            type=str,
+            help='Only rebuild a specific model (e.g. Student, Staff)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Number of records to process at a time (default: 500)',
+        )
+        parser.add_argument(
+            '--missing-only',
+            action='store_true',
+            help='Only fill rows whose blind indexes or tokens are still empty',
+        )
+
+    def handle(self, *args, **options):
+        target_model = options.get('model')
+        batch_size = options['batch_size']
+        missing_only = options['missing_only']
+
+        indexed_models = self._get_indexed_models()
+        if target_model:
+            indexed_models = {
+                model: fields for model, fields in indexed_models.items()
+                if model.__name__.lower() == target_model.lower()
+            }
+            if not indexed_models:
+                self.stdout.write(self.style.ERROR(f"Model '{target_model}' not found or has no blind indexes."))
+                return
+
+        for model_class, index_fields in indexed_models.items():
+            self.stdout.write(f"\n{'='*50}")
+            self.stdout.write(f"Processing: {model_class.__name__}")
+            self.stdout.write(f"Blind indexes: {', '.join(f.name for f in index_fields)}")
+            self.stdout.write(f"{'='*50}")
+
+            updated, conflicts = self._process_model(model_class, index_fields, batch_size, missing_only)
+            self.stdout.write(self.style.SUCCESS(f"  Updated: {updated}"))
+            if conflicts:
+                self.stdout.write(self.style.ERROR(f"  Duplicate values left unindexed: {len(conflicts)}"))
+                for pk, field_name in conflicts:
+                    self.stdout.write(self.style.WARNING(f"    {model_class.__name__} ID={pk} field={field_name}"))
+
+    def _get_indexed_models(self):
+        """Return {model: [BlindIndexField | NgramIndexField, ...]} for every installed model."""
+        indexed = {}
+        for model in apps.get_models():
+            fields = [
+                f for f in model._meta.concrete_fields
+                if isinstance(f, (BlindIndexField, NgramIndexField))
+            ]
+            if fields:
+                indexed[model] = fields
+        return indexed
+
+    def _process_model(self, model_class, index_fields, batch_size, missing_only):
+        """Walk the table by primary key and bulk-update the digests."""
+        queryset = model_class.objects.all()
+        if missing_only:
+            missing = Q()
+            for field in index_fields:
+                empty = Q(**{field.name: []}) if isinstance(field, NgramIndexField) else Q(**{f"{field.name}__isnull": True})
+                has_source = Q()
+                for source in field.source_fields:
+                    has_source |= Q(**{f"{source}__isnull": False})
+                missing |= empty & has_source
+            queryset = queryset.filter(missing)
+
+        source_fields = {source for f in index_fields for source in f.source_fields}
+        queryset = queryset.only('pk', *source_fields).order_by('pk')
+
+        total = queryset.count()
+        self.stdout.write(f"Total records: {total}")
+
+        updated = 0
+        conflicts = []
+        last_pk = None
+        while True:
+            batch_qs = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+            records = list(batch_qs[:batch_size])
+            if not records:
+                break
+
+            for record in records:
+                for field in index_fields:
+                    field.pre_save(record, add=False)
+
+            for field in index_fields:
+                if field.unique:
+                    conflicts.extend(self._drop_duplicates(model_class, field, records))
+
+            with transaction.atomic():
+                model_class.objects.bulk_update(records, [f.name for f in index_fields])
+
+            updated += len(records)
+            last_pk = records[-1].pk
+            self.stdout.write(f"  Processed {updated}/{total} records...")
+
+        return updated, conflicts
+
+    def _drop_duplicates(self, model_class, field, records):
+        """
+        Clear digests of a unique blind index that already exist in the table
+        or earlier in the batch, so bulk_update never trips the unique index.
+        """
+        by_digest = {}
+        conflicts = []
+        for record in records:
+            digest = getattr(record, field.attname)
+            if not digest:
+                continue
+            if digest in by_digest:
+                setattr(record, field.attname, None)
+                conflicts.append((record.pk, field.source_field))
+            else:
+                by_digest[digest] = record
+
+        taken = (
+            model_class.objects
+            .filter(**{f"{field.name}__in": list(by_digest)})
+            .exclude(pk__in=[r.pk for r in records])
+            .values_list(field.name, flat=True)
+        )
+        for digest in taken:
+            record = by_digest[digest]
+            setattr(record, field.attname, None)
+            conflicts.append((record.pk, field.source_field))
+        return conflicts
@@ -0,0 +1,52 @@
+import contextvars
+
+from django.conf import settings
+from django.db import models
+from django.db.models.query import ModelIterable
+
+# True while EncryptedQuerySet is turning rows into model instances
+_lazy_decryption = contextvars.ContextVar('lazy_decryption', default=False)
+
+
+def lazy_decryption_active():
+    return _lazy_decryption.get()
+
+
+class LazyDecryptModelIterable(ModelIterable):
+    """
+    ModelIterable that leaves encrypted columns as ciphertext on the instance.
+
+    EncryptedTextField.from_db_value skips decryption while the flag is set;
+    the field's descriptor (EncryptedAttribute) decrypts on first access
+    instead. The flag is only set while a row is being built, never while
+    the caller's loop body runs.
+    """
+
+    def __iter__(self):
+        rows = super().__iter__()
+        while True:
+            token = _lazy_decryption.set(getattr(settings, 'LAZY_DECRYPTION', True))
+            try:
+                obj = next(rows)
+            except StopIteration:
+                return
+            finally:
+                _lazy_decryption.reset(token)
+            yield obj
+
+
+class EncryptedQuerySet(models.QuerySet):
+    """
+    QuerySet for models with EncryptedTextFields.
+
+    Model instances decrypt their encrypted fields lazily, so listing
+    student_id/status or counting pays no crypto cost. values() and
+    values_list() still return plaintext, decrypted eagerly.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._iterable_class = LazyDecryptModelIterable
+
+
+EncryptedManager = models.Manager.from_queryset(EncryptedQuerySet)
@@ -1,7 +1,11 @@
 import jwt
+import logging
 from django.db import connection
 from django.conf import settings
 from django.contrib.auth import get_user_model
+from core.utils.crypto import track_decryptions, decryption_count, stop_tracking_decryptions
+
+logger = logging.getLogger(__name__)
 
 class RLSMiddleware:
     def __init__(self, get_response):
@@ -31,3 +35,24 @@ class RLSMiddleware:
                 
         response = self.get_response(request)
         return response
+
+
+class DecryptionCounterMiddleware:
+    """
+    Counts field decryptions per request and reports them in the
+    X-Decrypt-Count response header (and the debug log).
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = track_decryptions()
+        try:
+            response = self.get_response(request)
+            count = decryption_count()
+        finally:
+            stop_tracking_decryptions(token)
+
+        response['X-Decrypt-Count'] = str(count)
+        logger.debug(f"{request.method} {request.path}: {count} decrypts")
+        return response
@@ -1,5 +1,9 @@
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models.constants import LOOKUP_SEP
 from rest_framework import permissions
 
+from core.serializers import requested_fields
+
 class InstitutionalIsolationMixin:
     """
     Mixin to enforce institutional data isolation at the database level.
@@ -75,3 +79,68 @@ class InstitutionalIsolationMixin:
                             # Graceful fallback if lookup paths don't match
                             pass
         return serializer
+
+
+class SparseQuerysetMixin:
+    """
+    Narrows a ViewSet's queryset to what a ?fields= / ?omit= request returns.
+
+    Works with serializers using core.serializers.SparseFieldsetMixin: the
+    selected serializer fields are mapped back to model columns (only()) and
+    relations (select_related), so narrow reads don't fetch, join or decrypt
+    data they won't return. Views call apply_sparse_fieldset() at the end of
+    get_queryset() and can use wants_field() to skip optional annotations.
+    """
+
+    def sparse_fields(self):
+        """Requested serializer field names, or None for the full representation."""
+        if not hasattr(self, '_sparse_fields'):
+            serializer = self.get_serializer_class()()
+            self._sparse_fields = requested_fields(self.request, list(serializer.fields))
+        return self._sparse_fields
+
+    def wants_field(self, name):
+        fields = self.sparse_fields()
+        return fields is None or name in fields
+
+    def apply_sparse_fieldset(self, queryset):
+        names = self.sparse_fields()
+        if names is None:
+            return queryset
+
+        serializer = self.get_serializer_class()()
+        dependencies = getattr(serializer.Meta, 'sparse_field_dependencies', {})
+        opts = queryset.model._meta
+        columns = {opts.pk.name}
+        relations = set()
+
+        for name in names:
+            field = serializer.fields[name]
+            if field.write_only:
+                continue
+            if name in dependencies:
+                paths = dependencies[name]
+            elif field.source == '*':
+                # Reads the whole object; nothing can be deferred safely
+                return queryset
+            else:
+                paths = [field.source.replace('.', LOOKUP_SEP)]
+
+            for path in paths:
+                if path in queryset.query.annotations:
+                    continue
+                parts = path.split(LOOKUP_SEP)
+                try:
+                    opts.get_field(parts[0])
+                except FieldDoesNotExist:
+                    # A property or method without declared dependencies
+                    return queryset
+                if len(parts) > 1:
+                    relations.add(LOOKUP_SEP.join(parts[:-1]))
+                columns.add(path)
+
+        queryset = queryset.select_related(None)
+        if relations:
+            # select_related() without arguments would follow every foreign key
+            queryset = queryset.select_related(*relations)
+        return queryset.only(*columns)
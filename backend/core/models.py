@@ -0,0 +1,26 @@
+from django.db import models
+
+
+class ReencryptionCheckpoint(models.Model):
+    """
+    Progress of `manage.py reencrypt_data` for one model under one primary key.
+
+    Each batch is written in the same transaction as its checkpoint, so a
+    killed run resumes after the last committed primary key. A new primary
+    key (a new rotation) starts a fresh checkpoint.
+    """
+    model_label = models.CharField(max_length=100)
+    key_id = models.CharField(max_length=16)
+    last_pk = models.BigIntegerField(default=0)
+    rows_updated = models.PositiveIntegerField(default=0)
+    rows_failed = models.PositiveIntegerField(default=0)
+    completed_at = models.DateTimeField(null=True, blank=True)
+    started_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('model_label', 'key_id')
+
+    def __str__(self):
+        state = "done" if self.completed_at else f"at pk {self.last_pk}"
+        return f"{self.model_label} [{self.key_id}] {state}"
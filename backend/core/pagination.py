@@ -0,0 +1,75 @@
+import hashlib
+
+from django.core.cache import cache
+from rest_framework.pagination import CursorPagination
+from rest_framework.response import Response
+
+# Seconds a ?include_count=true total is reused for the same query
+COUNT_CACHE_TIMEOUT = 60
+
+
+class KeysetCursorPagination(CursorPagination):
+    """
+    Project-wide keyset (cursor) pagination.
+
+    Each page is `WHERE id < <cursor> ORDER BY id DESC LIMIT n` on the primary
+    key index, so fetching page 1 or page 10,000 costs the same. No COUNT(*)
+    runs unless the client asks for it with ?include_count=true; the total is
+    then cached briefly per query (the SQL includes the institution filter,
+    so tenants never share a count).
+
+    Views that return summary figures alongside the rows can pass a dict with
+    a "results" key to get_paginated_response(); its keys are merged in.
+    """
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+    ordering = '-id'
+    count_query_param = 'include_count'
+
+    def get_ordering(self, request, queryset, view):
+        # Only the first key positions the cursor; ending on the primary key
+        # makes the order total, so rows sharing a value (e.g. ?ordering=-balance)
+        # are never skipped or repeated between pages
+        ordering = list(super().get_ordering(request, queryset, view))
+        if not any(field.lstrip('-') in ('id', 'pk') for field in ordering):
+            ordering.append('-id' if ordering[0].startswith('-') else 'id')
+        return tuple(ordering)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.count = None
+        if request.query_params.get(self.count_query_param, '').lower() in ('1', 'true', 'yes'):
+            self.count = self.get_cached_count(queryset)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_cached_count(self, queryset):
+        sql, params = queryset.query.sql_with_params()
+        key = 'page_count:' + hashlib.sha256(f"{sql}|{params}".encode()).hexdigest()
+        count = cache.get(key)
+        if count is None:
+            count = queryset.count()
+            cache.set(key, count, COUNT_CACHE_TIMEOUT)
+        return count
+
+    def get_paginated_response(self, data):
+        payload = {
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+        }
+        if self.count is not None:
+            payload['count'] = self.count
+        if isinstance(data, dict):
+            payload.update(data)
+        else:
+            payload['results'] = data
+        return Response(payload)
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema['properties']['count'] = {'type': 'integer', 'example': 123}
+        return response_schema
+
+
+class CreatedAtCursorPagination(KeysetCursorPagination):
+    """Newest-first keyset pagination on (created_at, id) for log-style tables."""
+    ordering = ('-created_at', '-id')
@@ -1,5 +1,5 @@
 import bleach
-from rest_framework import serializers
+from rest_framework import permissions, serializers
 
 class SanitizedModelSerializer(serializers.ModelSerializer):
     """
@@ -20,3 +20,49 @@ class SanitizedModelSerializer(serializers.ModelSerializer):
                 sanitized_data[key] = bleach.clean(value, tags=[], attributes={}, strip=True)
                 
         return super().to_internal_value(sanitized_data)
+
+
+FIELDS_PARAM = 'fields'
+OMIT_PARAM = 'omit'
+
+
+def _split_param(value):
+    return {name.strip() for name in (value or '').split(',') if name.strip()}
+
+
+def requested_fields(request, available):
+    """
+    Field names selected with ?fields=a,b and/or ?omit=c on a read request,
+    in serializer order. None means the full representation.
+    """
+    if request is None or request.method not in permissions.SAFE_METHODS:
+        return None
+    params = getattr(request, 'query_params', request.GET)
+    only = _split_param(params.get(FIELDS_PARAM))
+    omit = _split_param(params.get(OMIT_PARAM))
+    if not only and not omit:
+        return None
+    return [name for name in available if (not only or name in only) and name not in omit]
+
+
+class SparseFieldsetMixin:
+    """
+    Serializer mixin for ?fields= / ?omit= sparse fieldsets.
+
+    Only the top-level serializer of a read is narrowed; the same serializer
+    nested inside another one keeps all its fields. Declare
+    Meta.sparse_field_dependencies for computed fields (properties) so
+    SparseQuerysetMixin knows which model columns they read.
+    """
+
+    def get_fields(self):
+        fields = super().get_fields()
+        parent = self.parent
+        is_top_level = parent is None or (
+            isinstance(parent, serializers.ListSerializer) and parent.parent is None
+        )
+        if is_top_level:
+            names = requested_fields(self.context.get('request'), list(fields))
+            if names is not None:
+                fields = type(fields)((name, fields[name]) for name in names)
+        return fields
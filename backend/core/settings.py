@@ -38,6 +38,25 @@ SMOKE_TEST_KEY = os.environ.get('SMOKE_TEST_KEY', 'default-insecure-smoke-key')
 _crypto_keys = os.getenv("CRYPTOGRAPHY_KEYS") or os.getenv("CRYPTOGRAPHY_KEY") or ""
 FERNET_KEYS = [k.strip() for k in _crypto_keys.split(",") if k.strip()]
 
+# 🔎 Blind index HMAC key (must be different from the Fernet keys)
+# Used to build searchable digests of encrypted columns.
+BLIND_INDEX_KEY = os.getenv("BLIND_INDEX_KEY", "")
+
+# Decrypt encrypted model fields on first access instead of on load
+LAZY_DECRYPTION = os.getenv("LAZY_DECRYPTION", "True").lower() == "true"
+
+# Load bulk student/staff uploads with COPY on PostgreSQL (core.utils.copy_loader)
+BULK_UPLOAD_COPY = os.getenv("BULK_UPLOAD_COPY", "True").lower() == "true"
+
+# Processes used to encrypt bulk upload rows before insert (core.utils.encryption_pipeline); 1 = in-process
+ENCRYPTION_WORKERS = int(os.getenv("ENCRYPTION_WORKERS", "1"))
+
+# Seconds an institution's Faculty/Department/Program snapshot (faculties.hierarchy) stays in Redis
+HIERARCHY_CACHE_TIMEOUT = int(os.getenv("HIERARCHY_CACHE_TIMEOUT", "3600"))
+
+# Seconds a generated dynamic report (reports.result_cache) stays in Redis; writes invalidate it sooner
+REPORT_CACHE_TIMEOUT = int(os.getenv("REPORT_CACHE_TIMEOUT", "900"))
+
 print(FERNET_KEYS)
 
 # SECURITY WARNING: don't run with debug turned on in production!
@@ -70,6 +89,7 @@ INSTALLED_APPS = [
     'django_filters',
 
     # Local Apps
+    "core",
     "users",
     "academic",
     'instauth',
@@ -92,6 +112,7 @@ MIDDLEWARE = [
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
     "core.middleware.RLSMiddleware",
+    "core.middleware.DecryptionCounterMiddleware",
 ]
 
 
@@ -134,6 +155,14 @@ CACHES = {
     }
 }
 
+# --- CELERY ---
+# Redis is both broker and result backend; the result backend carries the
+# PROGRESS state that bulk upload tasks publish for /api/tasks/<id>/status/.
+CELERY_BROKER_URL = os.getenv("CELERY_BROKER_URL", os.getenv("REDIS_URL", "redis://localhost:6379/1"))
+CELERY_RESULT_BACKEND = os.getenv("CELERY_RESULT_BACKEND", CELERY_BROKER_URL)
+CELERY_TASK_TRACK_STARTED = True
+CELERY_RESULT_EXPIRES = 60 * 60 * 24
+
 
 
 AUTH_PASSWORD_VALIDATORS = [
@@ -200,6 +229,10 @@ USE_TZ = True
 STATIC_URL = "static/"
 STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 
+# Uploaded files handed to background tasks and generated reports
+MEDIA_URL = "media/"
+MEDIA_ROOT = os.getenv("MEDIA_ROOT", os.path.join(BASE_DIR, 'media'))
+
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
@@ -1,7 +1,7 @@
 from django.contrib import admin
 from django.urls import path, include
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView # Import JWT views
-from .views import check_task_status
+from .views import cache_stats, check_task_status
 
 urlpatterns = [
     path("admin/", admin.site.urls),
@@ -19,4 +19,5 @@ urlpatterns = [
     
     # --- Asynchronous Background Tasks ---
     path('api/tasks/<str:task_id>/status/', check_task_status, name='task_status'),
+    path('api/cache/stats/', cache_stats, name='cache_stats'),
 ]
@@ -0,0 +1,73 @@
+"""
+Hit counters of the application caches (faculties.hierarchy, reports.result_cache).
+
+Counting in Redis on every lookup would add a round trip to the very hits
+the caches exist to make cheap. Counts are kept per process and added to
+the shared Redis totals in batches: once FLUSH_EVERY counts are pending or
+FLUSH_INTERVAL seconds have passed since the last flush, whichever comes
+first (checked when counting), and before the totals are read.
+
+    stats = CacheStats('hierarchy:stats:{}', ('hits', 'misses'))
+    stats.count('hits')
+    stats.process()        # {'hits': ..., 'misses': ...} of this process
+    stats.all_processes()  # the same, summed over every process (from Redis)
+
+The shared totals of other processes lag by at most one batch.
+"""
+
+import threading
+import time
+
+from django.core.cache import cache
+
+# Pending counts that trigger a flush to Redis
+FLUSH_EVERY = 100
+# Seconds after which pending counts are flushed anyway
+FLUSH_INTERVAL = 10
+
+
+class CacheStats:
+    """Per-process hit counters, flushed to shared Redis totals in batches."""
+
+    def __init__(self, key_format, names):
+        self.key_format = key_format
+        self.names = tuple(names)
+        self._lock = threading.Lock()
+        self._counts = dict.fromkeys(self.names, 0)
+        self._pending = dict.fromkeys(self.names, 0)
+        self._flushed_at = time.monotonic()
+
+    def count(self, name):
+        with self._lock:
+            self._counts[name] += 1
+            self._pending[name] += 1
+            due = (
+                sum(self._pending.values()) >= FLUSH_EVERY
+                or time.monotonic() - self._flushed_at >= FLUSH_INTERVAL
+            )
+        if due:
+            self.flush()
+
+    def flush(self):
+        """Add this process' pending counts to the Redis totals."""
+        with self._lock:
+            pending = {name: n for name, n in self._pending.items() if n}
+            self._pending = dict.fromkeys(self.names, 0)
+            self._flushed_at = time.monotonic()
+        for name, n in pending.items():
+            key = self.key_format.format(name)
+            try:
+                cache.incr(key, n)
+            except ValueError:
+                if not cache.add(key, n, None):
+                    cache.incr(key, n)
+
+    def process(self):
+        with self._lock:
+            return dict(self._counts)
+
+    def all_processes(self):
+        self.flush()
+        keys = {name: self.key_format.format(name) for name in self.names}
+        shared = cache.get_many(keys.values())
+        return {name: shared.get(key, 0) for name, key in keys.items()}
@@ -0,0 +1,194 @@
+"""
+COPY-based bulk inserts for PostgreSQL.
+
+bulk_create() renders every batch as one INSERT with a bind parameter per
+cell, which Django has to build and PostgreSQL has to parse and plan. The
+loader here sends the same rows as COPY text instead:
+
+    CREATE TEMP TABLE stage AS SELECT <columns> FROM <table> WITH NO DATA
+    COPY stage (<columns>) FROM STDIN            -- one tab-separated line per row
+    DELETE FROM stage USING <table> WHERE stage.<other unique> = <table>.<other unique>
+        RETURNING stage.<unique column>
+    INSERT INTO <table> (<columns>) SELECT <columns> FROM stage
+        ON CONFLICT DO NOTHING RETURNING id, <unique column>
+
+Values go through each field's pre_save() and get_db_prep_save() exactly
+as in bulk_create(), so encrypted fields are encrypted and blind indexes
+computed before a row is written. Rows that conflict on the unique column
+(e.g. a student_id inserted by someone else since validation) are skipped
+rather than aborting the load; inserted objects get their primary keys.
+
+Rows that clash on one of the model's other unique columns (e.g.
+Student.national_id_bidx) are taken out of the stage table before the
+insert and are not written either. Their unique-column values are added to
+the `clashes` dict, keyed by field name, so the caller can report them:
+
+    clashes = {}
+    bulk_insert(Student, students, 'student_id', clashes=clashes)
+    clashes  # {'national_id_bidx': ['S0012', ...]}
+
+`bulk_insert()` uses COPY on PostgreSQL when settings.BULK_UPLOAD_COPY is
+on and falls back to bulk_create() everywhere else.
+"""
+
+import datetime
+import io
+import json
+import uuid
+
+from django.conf import settings
+from django.db import connections, router
+
+COPY_BATCH_SIZE = 5000
+
+
+def supports_copy(model, using=None):
+    using = using or router.db_for_write(model)
+    return connections[using].vendor == 'postgresql' and getattr(settings, 'BULK_UPLOAD_COPY', True)
+
+
+def _escape(text):
+    return text.replace('\\', '\\\\').replace('\t', '\\t').replace('\n', '\\n').replace('\r', '\\r')
+
+
+def _array_literal(values):
+    items = []
+    for value in values:
+        if value is None:
+            items.append('NULL')
+        else:
+            items.append('"' + str(value).replace('\\', '\\\\').replace('"', '\\"') + '"')
+    return '{' + ','.join(items) + '}'
+
+
+def _copy_value(value):
+    """One cell in COPY text format."""
+    if value is None:
+        return '\\N'
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    if isinstance(value, (list, tuple)):
+        value = _array_literal(value)
+    elif isinstance(value, (datetime.date, datetime.time)):
+        value = value.isoformat()
+    elif hasattr(value, 'adapted'):
+        # JSON adapter returned by JSONField.get_db_prep_save()
+        value = json.dumps(value.adapted)
+    else:
+        value = str(value)
+    return _escape(value)
+
+
+def _other_unique_fields(fields, key_field):
+    return [f for f in fields if f.unique and not f.primary_key and f is not key_field]
+
+
+def copy_insert(model, objs, conflict_field, batch_size=COPY_BATCH_SIZE, using=None, clashes=None):
+    """
+    Insert `objs` with COPY through a temporary staging table, skipping rows
+    whose `conflict_field` value already exists. Rows clashing on another
+    unique column are skipped too and recorded in `clashes` (see the module
+    docstring). Sets pk on the inserted objects and returns how many were
+    inserted.
+    """
+    using = using or router.db_for_write(model)
+    connection = connections[using]
+    qn = connection.ops.quote_name
+    opts = model._meta
+
+    fields = [f for f in opts.concrete_fields if not (f.primary_key and f.get_internal_type() in (
+        'AutoField', 'BigAutoField', 'SmallAutoField'
+    ))]
+    key_field = opts.get_field(conflict_field)
+    other_unique = _other_unique_fields(fields, key_field)
+    columns = ', '.join(qn(f.column) for f in fields)
+    stage = qn(f"copy_stage_{uuid.uuid4().hex[:12]}")
+
+    inserted = 0
+    with connection.cursor() as cursor:
+        cursor.execute(f"CREATE TEMP TABLE {stage} AS SELECT {columns} FROM {qn(opts.db_table)} WITH NO DATA")
+        try:
+            for start in range(0, len(objs), batch_size):
+                batch = objs[start:start + batch_size]
+                buffer = io.StringIO()
+                for obj in batch:
+                    buffer.write('\t'.join(
+                        _copy_value(f.get_db_prep_save(f.pre_save(obj, True), connection)) for f in fields
+                    ))
+                    buffer.write('\n')
+                buffer.seek(0)
+                cursor.copy_expert(f"COPY {stage} ({columns}) FROM STDIN", buffer)
+
+                for field in other_unique:
+                    cursor.execute(
+                        f"DELETE FROM {stage} USING {qn(opts.db_table)} "
+                        f"WHERE {stage}.{qn(field.column)} = {qn(opts.db_table)}.{qn(field.column)} "
+                        f"RETURNING {stage}.{qn(key_field.column)}"
+                    )
+                    keys = [key for (key,) in cursor.fetchall()]
+                    if keys and clashes is not None:
+                        clashes.setdefault(field.name, []).extend(keys)
+
+                # No conflict target: a clash on any unique column inserted
+                # since the DELETE above is skipped rather than aborting the load
+                cursor.execute(
+                    f"INSERT INTO {qn(opts.db_table)} ({columns}) SELECT {columns} FROM {stage} "
+                    f"ON CONFLICT DO NOTHING "
+                    f"RETURNING {qn(opts.pk.column)}, {qn(key_field.column)}"
+                )
+                pks = {key: pk for pk, key in cursor.fetchall()}
+                cursor.execute(f"TRUNCATE {stage}")
+
+                for obj in batch:
+                    pk = pks.pop(getattr(obj, key_field.attname), None)
+                    if pk is not None:
+                        obj.pk = pk
+                        obj._state.adding = False
+                        obj._state.db = using
+                        inserted += 1
+        finally:
+            cursor.execute(f"DROP TABLE IF EXISTS {stage}")
+    return inserted
+
+
+def _drop_clashes(model, objs, conflict_field, clashes, using):
+    """
+    bulk_create() counterpart of the stage-table DELETE in copy_insert():
+    the objects whose other unique values are already taken are left out
+    and recorded in `clashes`.
+    """
+    opts = model._meta
+    key_field = opts.get_field(conflict_field)
+    manager = model._default_manager.db_manager(using)
+    for field in _other_unique_fields(opts.concrete_fields, key_field):
+        values = [field.pre_save(obj, True) for obj in objs]
+        wanted = {value for value in values if value is not None}
+        if not wanted:
+            continue
+        taken = set(manager.filter(**{f'{field.attname}__in': wanted}).values_list(field.attname, flat=True))
+        if not taken:
+            continue
+        keep = []
+        for obj, value in zip(objs, values):
+            if value in taken:
+                if clashes is not None:
+                    clashes.setdefault(field.name, []).append(getattr(obj, key_field.attname))
+            else:
+                keep.append(obj)
+        objs = keep
+    return objs
+
+
+def bulk_insert(model, objs, conflict_field, batch_size=1000, using=None, clashes=None):
+    """
+    Insert `objs` with COPY where available (see copy_insert), otherwise
+    with bulk_create(batch_size). Objects clashing on another unique column
+    are not inserted and are recorded in `clashes`. Returns the objects
+    that were inserted.
+    """
+    if supports_copy(model, using):
+        copy_insert(model, objs, conflict_field, using=using, clashes=clashes)
+        return [obj for obj in objs if obj.pk is not None]
+    objs = _drop_clashes(model, objs, conflict_field, clashes, using)
+    model._default_manager.db_manager(using).bulk_create(objs, batch_size=batch_size)
+    return objs
@@ -11,18 +11,42 @@ Key rotation process:
 3. Deploy - old data still readable, new data uses new key
 4. Run: python manage.py reencrypt_data
 5. After all data re-encrypted, remove old key from CRYPTOGRAPHY_KEYS
+
+Ciphertext format:
+    v1:<key id>:<fernet token>
+The key id is a short fingerprint of the key that encrypted the value, so
+decryption goes straight to the right Fernet instead of letting MultiFernet
+try every configured key in turn. Bare Fernet tokens (written before the
+envelope existed) are still read through MultiFernet.
 """
 
 from cryptography.fernet import Fernet, MultiFernet, InvalidToken
 from django.conf import settings
 from django.core.exceptions import ImproperlyConfigured
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+import contextvars
+import datetime
+import hashlib
+import hmac
 import logging
+import re
 
 logger = logging.getLogger(__name__)
 
 # Cache the fernet instances
 _fernet_instance = None
 _multi_fernet_instance = None
+_blind_index_key = None
+_keyring = None
+
+ENVELOPE_VERSION = 'v1'
+ENVELOPE_PREFIX = f'{ENVELOPE_VERSION}:'
+LEGACY_TOKEN_PREFIX = 'gAAAAA'
+_ENVELOPE_RE = re.compile(rf'{ENVELOPE_VERSION}:[0-9a-f]{{8}}:{LEGACY_TOKEN_PREFIX}')
+
+# Decrypt counter for the current request / task (see DecryptionCounterMiddleware)
+_decrypt_count = contextvars.ContextVar('decrypt_count', default=None)
 
 
 def get_fernet_keys():
@@ -62,12 +86,91 @@ def get_multi_fernet():
     return _multi_fernet_instance
 
 
+def key_id(key: str) -> str:
+    """Short, stable fingerprint of a Fernet key (not secret, not reversible)."""
+    return hashlib.sha256(key.encode()).hexdigest()[:8]
+
+
+def get_keyring():
+    """
+    Get ({key id: Fernet}, primary key id) for all configured keys.
+    Key ids don't depend on position, so they survive a new key being
+    prepended during rotation.
+    """
+    global _keyring
+    if _keyring is None:
+        keys = get_fernet_keys()
+        _keyring = ({key_id(k): Fernet(k.encode()) for k in keys}, key_id(keys[0]))
+    return _keyring
+
+
+def is_encrypted(value) -> bool:
+    """Check if a string looks like an encrypted value (enveloped or legacy token)."""
+    if not isinstance(value, str):
+        return False
+    return value.startswith(LEGACY_TOKEN_PREFIX) or _ENVELOPE_RE.match(value) is not None
+
+
+def parse_envelope(value: str):
+    """Split an enveloped value into (key id, fernet token); (None, value) for legacy tokens."""
+    if value.startswith(ENVELOPE_PREFIX):
+        kid, _, token = value[len(ENVELOPE_PREFIX):].partition(':')
+        return kid, token
+    return None, value
+
+
+def encrypt_token(value: str) -> str:
+    """Encrypt a string with the primary key and wrap it in a key-id envelope."""
+    fernets, primary = get_keyring()
+    token = fernets[primary].encrypt(value.encode()).decode()
+    return f"{ENVELOPE_PREFIX}{primary}:{token}"
+
+
+def decrypt_token(value: str) -> str:
+    """
+    Decrypt an enveloped or legacy value. Raises InvalidToken on failure.
+
+    Enveloped values are decrypted by the one key that wrote them; an unknown
+    key id (e.g. the key was dropped from the list) and legacy tokens fall
+    back to trying every key.
+    """
+    counter = _decrypt_count.get()
+    if counter is not None:
+        counter[0] += 1
+
+    kid, token = parse_envelope(value)
+    if kid is not None:
+        fernets, _ = get_keyring()
+        fernet = fernets.get(kid)
+        if fernet is not None:
+            return fernet.decrypt(token.encode()).decode()
+    return get_multi_fernet().decrypt(token.encode()).decode()
+
+
+def track_decryptions():
+    """
+    Start counting decrypt_token() calls in the current context.
+    Returns a token for stop_tracking_decryptions().
+    """
+    # A mutable cell, so copies of the context (threads, async tasks) add to the same count
+    return _decrypt_count.set([0])
+
+
+def decryption_count() -> int:
+    """Number of values decrypted since track_decryptions() in this context."""
+    counter = _decrypt_count.get()
+    return counter[0] if counter is not None else 0
+
+
+def stop_tracking_decryptions(token):
+    _decrypt_count.reset(token)
+
+
 def encrypt_value(value: str) -> str:
     """Encrypt a string value using the primary key."""
     if not value:
         return value
-    f = get_multi_fernet()
-    return f.encrypt(value.encode()).decode()
+    return encrypt_token(value)
 
 
 def decrypt_value(value: str) -> str:
@@ -78,8 +181,7 @@ def decrypt_value(value: str) -> str:
     if not value:
         return value
     try:
-        f = get_multi_fernet()
-        return f.decrypt(value.encode()).decode()
+        return decrypt_token(value)
     except InvalidToken:
         # Data might be plain text or encrypted with unknown key
         logger.warning(f"Failed to decrypt value (length={len(value)}). May be plain text.")
@@ -92,27 +194,153 @@ def rotate_token(encrypted_value: str) -> str:
     Useful for key rotation - decrypts with any key, encrypts with newest.
 
     Returns:
+        - The same value if it is already enveloped under the primary key
         - Re-encrypted value if successful
         - Original value if it's not encrypted or decryption fails
     """
     if not encrypted_value:
         return encrypted_value
 
+    kid, _ = parse_envelope(encrypted_value)
+    if kid is not None and kid == get_keyring()[1]:
+        return encrypted_value
+
     try:
-        f = get_multi_fernet()
-        # MultiFernet.rotate() decrypts with any key and re-encrypts with the first
-        return f.rotate(encrypted_value.encode()).decode()
+        return encrypt_token(decrypt_token(encrypted_value))
     except InvalidToken:
         # Not a valid Fernet token - might be plain text
         # Encrypt it with the current key
         return encrypt_value(encrypted_value)
 
 
+def get_blind_index_key() -> bytes:
+    """
+    Get the HMAC key used for blind indexes.
+    Kept separate from FERNET_KEYS so rotating encryption keys never
+    invalidates the indexes (and vice versa).
+    """
+    global _blind_index_key
+    if _blind_index_key is None:
+        key = getattr(settings, 'BLIND_INDEX_KEY', '')
+        if not key:
+            # Also reported at startup by the core.W002 system check
+            raise ImproperlyConfigured(
+                "BLIND_INDEX_KEY is not set in .env. "
+                "Generate a key with: python manage.py generate_key"
+            )
+        _blind_index_key = key.encode()
+    return _blind_index_key
+
+
+def normalize_for_index(value):
+    """
+    Normalize a plaintext value before hashing.
+    Mirrors Student.save(): values are stripped and upper-cased.
+    """
+    if value is None:
+        return None
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        value = value.isoformat()
+    value = str(value).strip().upper()
+    return value or None
+
+
+def blind_index(value, context: str = '') -> str:
+    """
+    Deterministic keyed digest (HMAC-SHA256) of a plaintext value.
+
+    The context (normally the source field name) is mixed into the MAC so the
+    same value produces unrelated digests in different columns.
+    Returns None for empty values so NULLs stay NULL.
+    """
+    normalized = normalize_for_index(value)
+    if normalized is None:
+        return None
+    message = f"{context}:{normalized}".encode()
+    return hmac.new(get_blind_index_key(), message, hashlib.sha256).hexdigest()
+
+
+# Partial-match tokens: every 2- and 3-gram of each word is indexed, queries
+# use 3-grams (2-grams for two-letter terms). Tokens are truncated MACs.
+NGRAM_SIZES = (2, 3)
+NGRAM_TOKEN_LENGTH = 16
+
+
+def _words(value):
+    normalized = normalize_for_index(value)
+    return re.findall(r'\w+', normalized) if normalized else []
+
+
+def _ngram_token(gram: str, context: str) -> str:
+    message = f"{context}:{gram}".encode()
+    return hmac.new(get_blind_index_key(), message, hashlib.sha256).hexdigest()[:NGRAM_TOKEN_LENGTH]
+
+
+def ngram_tokens(value, context: str = '') -> list:
+    """
+    Keyed n-gram tokens of a plaintext value (index side).
+
+    A value is searchable by any substring of one of its words: the query's
+    tokens (see ngram_query_tokens) are always a subset of these.
+    """
+    grams = set()
+    for word in _words(value):
+        for n in NGRAM_SIZES:
+            grams.update(word[i:i + n] for i in range(len(word) - n + 1))
+    return sorted(_ngram_token(gram, context) for gram in grams)
+
+
+def ngram_query_tokens(term, context: str = '') -> list:
+    """
+    Tokens a stored value must contain to match `term` as a substring.
+    Single-letter words produce no tokens and so cannot be searched.
+    """
+    grams = set()
+    for word in _words(term):
+        if len(word) < NGRAM_SIZES[0]:
+            continue
+        n = min(len(word), NGRAM_SIZES[-1])
+        grams.update(word[i:i + n] for i in range(len(word) - n + 1))
+    return sorted(_ngram_token(gram, context) for gram in grams)
+
+
+def ngram_query_is_exact(term) -> bool:
+    """
+    True when the tokens of `term` can't match a value that lacks it.
+    A word of up to three letters is a single query gram; the 3-grams of a
+    longer word may all occur in a value without the word itself (taken from
+    different words, e.g. TIN + INA in "MARTIN NINA" for TINA).
+    """
+    return all(len(word) <= NGRAM_SIZES[-1] for word in _words(term))
+
+
+def ngram_match(term, values) -> bool:
+    """
+    Whether `term` matches the plaintext `values` the way the n-gram index
+    intends: every searchable word of the term is a substring of some word
+    of the values.
+    """
+    value_words = [word for value in values for word in _words(value)]
+    return all(
+        any(word in value_word for value_word in value_words)
+        for word in _words(term) if len(word) >= NGRAM_SIZES[0]
+    )
+
+
 def clear_cache():
-    """Clear cached Fernet instances. Call after key changes."""
-    global _fernet_instance, _multi_fernet_instance
+    """Clear cached Fernet instances and keys. Call after key changes."""
+    global _fernet_instance, _multi_fernet_instance, _blind_index_key, _keyring
     _fernet_instance = None
     _multi_fernet_instance = None
+    _blind_index_key = None
+    _keyring = None
+
+
+@receiver(setting_changed)
+def _clear_cache_on_key_change(setting, **kwargs):
+    # override_settings(FERNET_KEYS=..., BLIND_INDEX_KEY=...) in tests
+    if setting in ('FERNET_KEYS', 'BLIND_INDEX_KEY'):
+        clear_cache()
 
 
 def generate_key() -> str:
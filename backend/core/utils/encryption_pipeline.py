@@ -0,0 +1,119 @@
+"""
+Parallel encryption stage for bulk imports.
+
+Saving a Student encrypts four or five fields with Fernet and computes a
+blind index (HMAC) per encrypted field plus the name n-gram tokens, all in
+the process doing the INSERT. On a large upload that is the bulk of the
+CPU time, on one core. EncryptionPipeline does that work ahead of the
+insert, in a pool of worker processes:
+
+    with EncryptionPipeline(Student) as pipeline:     # settings.ENCRYPTION_WORKERS
+        for chunk in chunks:
+            students = [Student(...) for row in chunk]
+            pipeline.prepare(students)
+            bulk_insert(Student, students, 'student_id')
+
+prepare() puts the ciphertexts in the instances' encrypted fields, where
+EncryptedTextField.get_prep_value() recognizes them as tokens and passes
+them through, and leaves the index values where BlindIndexField and
+NgramIndexField.pre_save() pick them up instead of decrypting the tokens
+again (see core.fields._prepared_index).
+
+With one worker everything runs in-process. Otherwise the pool is a
+ProcessPoolExecutor on a billiard context (Celery's multiprocessing fork):
+unlike the standard library's, billiard processes may be started from
+inside a Celery prefork worker, which is itself a daemon process.
+"""
+
+import functools
+from concurrent.futures import ProcessPoolExecutor
+from types import SimpleNamespace
+
+import billiard
+from django.apps import apps
+from django.conf import settings
+
+from core.fields import BlindIndexField, EncryptedTextField, NgramIndexField
+
+# Rows sent to a worker per task
+PREPARE_BATCH_SIZE = 500
+
+
+@functools.lru_cache(maxsize=None)
+def _plan(model_label):
+    """(encrypted fields, index fields) of a model."""
+    model = apps.get_model(model_label)
+    fields = model._meta.concrete_fields
+    encrypted = [f for f in fields if isinstance(f, EncryptedTextField)]
+    indexes = [f for f in fields if isinstance(f, (BlindIndexField, NgramIndexField))]
+    return encrypted, indexes
+
+
+def _prepare_rows(model_label, rows):
+    """
+    Worker side: for each {attname: plaintext} row return
+    ({attname: ciphertext}, {index attname: (source ciphertexts, value)}).
+    """
+    encrypted, indexes = _plan(model_label)
+    prepared = []
+    for values in rows:
+        tokens = {f.attname: f.get_prep_value(values[f.attname]) for f in encrypted}
+        plain = SimpleNamespace(**values)
+        index_values = {}
+        for f in indexes:
+            if isinstance(f, BlindIndexField):
+                value = f.compute(values[f.source_field])
+            else:
+                value = f.compute_tokens(plain)
+            index_values[f.attname] = (tuple(tokens[name] for name in f.source_fields), value)
+        prepared.append((tokens, index_values))
+    return prepared
+
+
+def _init_worker():
+    # Children forked from a configured process already have Django set up;
+    # spawned ones (macOS, Windows) need it. Inherited database connections
+    # are deliberately left untouched: closing one would end the parent's
+    # session, and workers never query.
+    import django
+    if not apps.ready:
+        django.setup()
+
+
+class EncryptionPipeline:
+    """Pre-encrypts model instances before a bulk insert. Use as a context manager."""
+
+    def __init__(self, model, workers=None, batch_size=PREPARE_BATCH_SIZE):
+        self.model_label = model._meta.label
+        self.workers = workers or getattr(settings, 'ENCRYPTION_WORKERS', 1)
+        self.batch_size = batch_size
+        self.pool = None
+
+    def __enter__(self):
+        if self.workers > 1:
+            self.pool = ProcessPoolExecutor(
+                self.workers, mp_context=billiard.get_context(), initializer=_init_worker
+            )
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+
+    def prepare(self, objs):
+        """Encrypt and index `objs` in place; returns them."""
+        encrypted, _ = _plan(self.model_label)
+        rows = [{f.attname: obj.__dict__.get(f.attname) for f in encrypted} for obj in objs]
+        batches = [rows[i:i + self.batch_size] for i in range(0, len(rows), self.batch_size)]
+
+        if self.pool is None:
+            results = [_prepare_rows(self.model_label, batch) for batch in batches]
+        else:
+            results = self.pool.map(_prepare_rows, [self.model_label] * len(batches), batches)
+
+        prepared = (row for batch in results for row in batch)
+        for obj, (tokens, index_values) in zip(objs, prepared):
+            obj.__dict__.update(tokens)
+            obj.__dict__['_prepared_indexes'] = index_values
+        return objs
@@ -0,0 +1,67 @@
+"""
+Single-pass headcount metrics.
+
+Report and list endpoints used to count a queryset three times:
+
+    total = queryset.count()
+    male = queryset.filter(gender='Male').count()
+    female = queryset.filter(gender='Female').count()
+
+plus a GROUP BY for grouped reports, i.e. one scan of the same joins per
+number. summarize() gets them from one statement with conditional
+aggregation (COUNT(*) FILTER (WHERE ...) on PostgreSQL):
+
+    summary = summarize(queryset)                      # gender on the model
+    summary = summarize(queryset, 'student__gender')   # placements etc.
+    summary['total'], summary['male'], summary['female'], summary['other']
+
+    summary = summarize(queryset, group_by='inclusivity_category')
+    summary['groups']   # [{'inclusivity_category': ..., 'count', 'male', 'female'}, ...]
+
+With group_by the totals are summed from the groups, so grouping and
+metrics still share one scan.
+"""
+
+from django.db.models import Count, Q
+
+
+def gender_counts(gender_field='gender'):
+    """Male/female Count() expressions, for aggregate() or annotate()."""
+    return {
+        'male': Count('pk', filter=Q(**{gender_field: 'Male'})),
+        'female': Count('pk', filter=Q(**{gender_field: 'Female'})),
+    }
+
+
+def summarize(queryset, gender_field='gender', group_by=None):
+    """
+    Total, male, female and other (total - male - female) of a queryset in
+    one query. `gender_field=None` counts the total only (male, female and
+    other are 0).
+
+    With `group_by` (a field path) the result also has 'groups': one dict
+    per value with its 'count', 'male' and 'female', largest first.
+    """
+    counts = gender_counts(gender_field) if gender_field else {}
+
+    if group_by:
+        groups = list(
+            queryset.values(group_by).annotate(count=Count('pk'), **counts).order_by('-count')
+        )
+        total = sum(group['count'] for group in groups)
+        male = sum(group.get('male', 0) for group in groups)
+        female = sum(group.get('female', 0) for group in groups)
+    else:
+        groups = None
+        result = queryset.aggregate(total=Count('pk'), **counts)
+        total, male, female = result['total'], result.get('male', 0), result.get('female', 0)
+
+    summary = {
+        'total': total,
+        'male': male,
+        'female': female,
+        'other': total - male - female if gender_field else 0,
+    }
+    if groups is not None:
+        summary['groups'] = groups
+    return summary
@@ -0,0 +1,75 @@
+"""
+Worker side of `manage.py reencrypt_data`.
+
+Kept apart from the command (which imports models) because pool workers are
+spawned: they unpickle these functions before Django is set up.
+"""
+
+from cryptography.fernet import InvalidToken
+from django.apps import apps
+
+from core.fields import EncryptedTextField, BlindIndexField, NgramIndexField
+from core.utils.crypto import ENVELOPE_PREFIX, decrypt_token, encrypt_token, get_keyring, is_encrypted
+
+# Annotation prefix for the raw (still encrypted) column values
+RAW_PREFIX = '_raw_'
+
+
+def encrypted_fields(model_class):
+    return [f.name for f in model_class._meta.concrete_fields if isinstance(f, EncryptedTextField)]
+
+
+def derived_fields(model_class):
+    return [
+        f for f in model_class._meta.concrete_fields
+        if isinstance(f, (BlindIndexField, NgramIndexField))
+    ]
+
+
+def init_worker():
+    """Pool initializer: workers are spawned, so Django has to be set up again."""
+    import django
+    if not apps.ready:
+        django.setup()
+
+
+def rotate_batch(model_label, rows):
+    """
+    Re-encrypt one batch with the primary key. Runs in a worker process.
+
+    `rows` is [(pk, {field: raw db value})]. Returns (updates, failures):
+    updates are (pk, {attname: new value}) with the rotated ciphertexts and
+    the recomputed blind indexes / n-gram tokens; failures are (pk, field)
+    for values none of the configured keys can decrypt.
+    """
+    model_class = apps.get_model(model_label)
+    derived = derived_fields(model_class)
+    primary_prefix = f"{ENVELOPE_PREFIX}{get_keyring()[1]}:"
+
+    updates, failures = [], []
+    for pk, raw_values in rows:
+        plaintexts, changes, failed = {}, {}, False
+        for field_name, raw in raw_values.items():
+            if not raw:
+                plaintexts[field_name] = raw
+            elif not is_encrypted(raw):
+                # Plain text stored before encryption was switched on
+                plaintexts[field_name] = raw
+                changes[field_name] = encrypt_token(raw)
+            else:
+                try:
+                    plaintexts[field_name] = decrypt_token(raw)
+                except InvalidToken:
+                    failures.append((pk, field_name))
+                    failed = True
+                    continue
+                if not raw.startswith(primary_prefix):
+                    changes[field_name] = encrypt_token(plaintexts[field_name])
+
+        if not failed:
+            instance = model_class(pk=pk, **plaintexts)
+            for field in derived:
+                changes[field.attname] = field.pre_save(instance, add=False)
+        if changes:
+            updates.append((pk, changes))
+    return updates, failures
@@ -0,0 +1,108 @@
+"""
+Chunked readers for CSV / Excel uploads.
+
+Yield the sheet as a series of DataFrames of at most `chunk_size` rows, so
+an upload is never fully materialized in memory. Every value is a string
+(or None/NaN when the cell is empty), matching `pd.read_*(dtype=str)`, and
+the index keeps counting across chunks: `index + 2` is the spreadsheet row
+number (header on row 1). Blank rows are left out but still counted, so
+the numbers stay right below them.
+"""
+
+import pandas as pd
+from openpyxl import load_workbook
+
+DEFAULT_CHUNK_SIZE = 5000
+
+
+def normalize_column(name):
+    return str(name).strip().lower().replace(' ', '_')
+
+
+def _cell_to_str(value):
+    if value is None:
+        return None
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value)
+
+
+def _iter_xlsx_chunks(file, chunk_size):
+    workbook = load_workbook(file, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        columns = [normalize_column(c) for c in header]
+        width = len(columns)
+
+        # index = sheet row - 2, as for the other formats
+        buffer, index = [], []
+        for position, values in enumerate(rows):
+            if all(v is None for v in values):
+                continue
+            buffer.append([_cell_to_str(v) for v in values[:width]] + [None] * (width - len(values)))
+            index.append(position)
+            if len(buffer) >= chunk_size:
+                yield pd.DataFrame(buffer, columns=columns, index=index)
+                buffer, index = [], []
+        if buffer:
+            yield pd.DataFrame(buffer, columns=columns, index=index)
+    finally:
+        workbook.close()
+
+
+def iter_upload_chunks(file, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield DataFrames of up to `chunk_size` rows with normalized column names."""
+    if hasattr(file, 'seek'):
+        file.seek(0)
+    name = getattr(file, 'name', str(file)).lower()
+
+    if name.endswith('.csv'):
+        # Blank lines are read (and dropped below) so the index keeps their place
+        for chunk in pd.read_csv(file, dtype=str, chunksize=chunk_size, skip_blank_lines=False):
+            chunk = chunk.dropna(how='all')
+            if chunk.empty:
+                continue
+            chunk.columns = [normalize_column(c) for c in chunk.columns]
+            yield chunk
+    elif name.endswith(('.xlsx', '.xlsm')):
+        yield from _iter_xlsx_chunks(file, chunk_size)
+    else:
+        # Legacy formats (.xls) have no streaming reader; split after loading
+        df = pd.read_excel(file, dtype=str).dropna(how='all')
+        df.columns = [normalize_column(c) for c in df.columns]
+        for start in range(0, len(df), chunk_size):
+            yield df.iloc[start:start + chunk_size]
+
+
+def count_upload_rows(file):
+    """
+    Cheap data-row count for progress reporting, without parsing the sheet:
+    newlines for CSV (quoted line breaks make it an overestimate), the sheet
+    dimension for .xlsx. None when it cannot be told.
+    """
+    name = getattr(file, 'name', str(file)).lower()
+    try:
+        if name.endswith('.csv'):
+            file.seek(0)
+            lines = 0
+            last = b''
+            for block in iter(lambda: file.read(1 << 20), b''):
+                lines += block.count(b'\n')
+                last = block
+            if last and not last.endswith(b'\n'):
+                lines += 1
+            return max(lines - 1, 0)
+        if name.endswith(('.xlsx', '.xlsm')):
+            workbook = load_workbook(file, read_only=True)
+            try:
+                rows = workbook.active.max_row
+            finally:
+                workbook.close()
+            return max(rows - 1, 0) if rows else None
+        return None
+    finally:
+        if hasattr(file, 'seek'):
+            file.seek(0)
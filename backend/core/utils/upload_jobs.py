@@ -0,0 +1,91 @@
+"""
+Background bulk uploads.
+
+The web request only stores the file and queues a Celery task with the
+storage path (never the file contents, which would travel through Redis):
+
+    path = save_upload(request.FILES['file'], 'students')
+    task = process_student_upload.delay(path, institution_id)
+    # 202 {"task_id": task.id} -> poll /api/tasks/<task_id>/status/
+
+The task opens the file with `open_upload()` (which deletes it afterwards)
+and hands an `UploadProgress` to the service, which reports rows done/total
+and the error count as it goes. check_task_status returns that as
+`progress` while the task is in the PROGRESS state.
+"""
+
+import os
+import time
+import uuid
+from contextlib import contextmanager
+
+from django.core.files.storage import default_storage
+
+UPLOAD_DIR = 'uploads'
+
+
+def wants_async(request):
+    """True when the client asked for a background upload (?async=true or an `async` form field)."""
+    value = request.data.get('async', request.query_params.get('async', ''))
+    return str(value).lower() in ('true', '1', 'yes')
+
+
+def save_upload(file_obj, kind):
+    """Store an uploaded file for a background task and return its storage path."""
+    name = os.path.basename(file_obj.name)
+    return default_storage.save(f"{UPLOAD_DIR}/{kind}/{uuid.uuid4().hex}_{name}", file_obj)
+
+
+@contextmanager
+def open_upload(path):
+    """Open a stored upload for reading; it is deleted once the task is done with it."""
+    try:
+        with default_storage.open(path, 'rb') as f:
+            yield f
+    finally:
+        default_storage.delete(path)
+
+
+def upload_error_payload(error):
+    """{"detail": ..., "errors": [...]} for a ValidationError raised by an upload service."""
+    if hasattr(error, 'error_dict'):
+        messages = error.message_dict
+        return {
+            "detail": " ".join(messages.get('detail', [])) or "Bulk upload failed.",
+            "errors": messages.get('errors', []),
+        }
+    return {"detail": "Bulk upload failed.", "errors": error.messages}
+
+
+class UploadProgress:
+    """
+    Progress callback for the bulk upload services:
+
+        progress(stage, rows_done, rows_total, error_count)
+
+    Publishes the numbers as the Celery task's PROGRESS meta, at most once
+    per `interval` seconds (every call when the stage changes). Without a
+    task it does nothing, so services can call it unconditionally.
+    """
+
+    def __init__(self, task=None, interval=0.5):
+        self.task = task
+        self.interval = interval
+        self.stage = None
+        self.last_sent = 0.0
+
+    def __call__(self, stage, rows_done, rows_total=None, error_count=0):
+        if self.task is None:
+            return
+        now = time.monotonic()
+        if stage == self.stage and now - self.last_sent < self.interval:
+            return
+        self.stage = stage
+        self.last_sent = now
+        self.task.update_state(state='PROGRESS', meta={
+            'stage': stage,
+            'rows_done': rows_done,
+            'rows_total': rows_total,
+            'error_count': error_count,
+            'percent': round(100 * rows_done / rows_total, 1) if rows_total else None,
+        })
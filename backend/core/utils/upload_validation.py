@@ -0,0 +1,161 @@
+"""
+Column-wise validation for bulk uploads.
+
+Upload paths used to walk the sheet with `df.iterrows()`, boxing each row
+into a Series and calling `pd.notna(row.get(...))` per cell. The helpers
+here work on whole columns instead:
+
+    text = clean_text(df, 'first_name', upper=True)       # '' when blank
+    gender = normalize_choice(clean_text(df, 'gender'), GENDER_MAP)
+
+    errors = RowErrors(df.index)
+    errors.add(text == '', "First Name is required.")
+    errors.add(gender.isna() & ..., "Invalid gender choice: " + raw)
+    errors.messages(prefix)     # {row index: ["<prefix>: <message>", ...]}
+
+Each check is one boolean column of an error matrix; only rows with a True
+somewhere are visited in Python, to format their messages.
+"""
+
+import numpy as np
+import pandas as pd
+
+GENDER_MAP = {'m': 'Male', 'male': 'Male', 'f': 'Female', 'female': 'Female'}
+
+GRADE_MAP = {
+    'distinction': 'Distinction',
+    'credit': 'Credit',
+    'pass': 'Pass',
+    'fail': 'Fail',
+}
+
+SEMESTER_MAP = {
+    'semester 1': 'Semester 1',
+    'semester 2': 'Semester 2',
+    '1': 'Semester 1',
+    '2': 'Semester 2',
+}
+
+TRUE_VALUES = {'true', 'yes', '1', 'y', 't'}
+
+
+def choice_map(choices):
+    """{code.lower(): code, label.lower(): code} for a Django choices list."""
+    mapping = {}
+    for code, label in choices:
+        mapping[str(code).lower()] = code
+        mapping[str(label).lower()] = code
+    return mapping
+
+
+def clean_text(df, *columns, upper=False, default=''):
+    """
+    Stripped string values of the first of `columns` that has a value in
+    each row (so 'enrollment_semester' can fall back to 'semester').
+    Missing columns and blank cells give `default`.
+    """
+    result = None
+    for column in columns:
+        if column not in df.columns:
+            continue
+        values = df[column]
+        values = values.where(values.notna(), '').astype(str).str.strip()
+        result = values if result is None else result.where(result != '', values)
+    if result is None:
+        return pd.Series(default, index=df.index, dtype=object)
+    if upper:
+        result = result.str.upper()
+    if default != '':
+        result = result.where(result != '', default)
+    return result
+
+
+def normalize_choice(values, mapping, keep_unknown=True):
+    """
+    Map free text onto choice codes case-insensitively. Unknown values are
+    kept as typed (keep_unknown) or become NaN; blanks stay blank.
+    """
+    mapped = values.str.lower().map(mapping)
+    if keep_unknown:
+        return mapped.fillna(values)
+    return mapped
+
+
+def to_int(values, default=None):
+    """
+    (numbers, invalid) for a text column: numbers are truncated like
+    int(float(x)), blanks give `default`; `invalid` marks non-blank cells
+    that are not numbers.
+    """
+    numbers = pd.to_numeric(values.where(values != ''), errors='coerce')
+    invalid = (values != '') & numbers.isna()
+    numbers = np.trunc(numbers).astype('Int64').astype(object)
+    numbers = numbers.where(numbers.notna(), default)
+    return numbers, invalid
+
+
+def to_float(values):
+    """(numbers, invalid) for a text column; blanks are NaN but not invalid."""
+    numbers = pd.to_numeric(values.where(values != ''), errors='coerce')
+    return numbers, (values != '') & numbers.isna()
+
+
+def to_date(values, fmt='%Y-%m-%d'):
+    """(formatted dates, invalid) for a text column; blanks are None but not invalid."""
+    dates = pd.to_datetime(values.where(values != ''), errors='coerce', format='mixed')
+    formatted = dates.dt.strftime(fmt).astype(object)
+    return formatted.where(dates.notna(), None), (values != '') & dates.isna()
+
+
+class RowErrors:
+    """
+    Boolean error matrix for one DataFrame: one column per check, one row
+    per upload row.
+    """
+
+    def __init__(self, index):
+        self.index = index
+        self.masks = []
+        self.texts = []
+
+    def add(self, mask, message):
+        """Register a check. `message` is a string or a per-row Series of strings."""
+        mask = pd.Series(mask, index=self.index).fillna(False).astype(bool)
+        self.masks.append(mask)
+        self.texts.append(message)
+        return mask
+
+    def matrix(self):
+        if not self.masks:
+            return pd.DataFrame(index=self.index, dtype=bool)
+        return pd.concat(self.masks, axis=1, ignore_index=True)
+
+    def any(self):
+        """Boolean Series: the row failed at least one check."""
+        return self.matrix().any(axis=1) if self.masks else pd.Series(False, index=self.index)
+
+    def messages(self, prefix=None):
+        """
+        {row index: [messages]} for failing rows, checks in the order added.
+        `prefix` is a per-row Series (or array) of labels such as "Row 5".
+        """
+        if prefix is not None and not isinstance(prefix, pd.Series):
+            prefix = pd.Series(prefix, index=self.index)
+        matrix = self.matrix()
+        failing = matrix[matrix.any(axis=1)] if self.masks else matrix.iloc[0:0]
+        result = {}
+        for index, flags in zip(failing.index, failing.to_numpy()):
+            messages = []
+            for check, flagged in enumerate(flags):
+                if not flagged:
+                    continue
+                text = self.texts[check]
+                if not isinstance(text, str):
+                    text = text.loc[index]
+                messages.append(f"{prefix.loc[index]}: {text}" if prefix is not None else text)
+            result[index] = messages
+        return result
+
+    def flat(self, prefix=None):
+        """All messages in row order, as one list."""
+        return [m for messages in self.messages(prefix).values() for m in messages]
@@ -1,8 +1,11 @@
 from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
 from rest_framework.response import Response
 from celery.result import AsyncResult
 
+from faculties.hierarchy import hierarchy_stats
+from reports.result_cache import report_cache_stats
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def check_task_status(request, task_id):
@@ -13,10 +16,15 @@ def check_task_status(request, task_id):
     task = AsyncResult(task_id)
     
     response_data = {
-        'state': task.state,  # Will be 'PENDING', 'STARTED', 'SUCCESS', or 'FAILURE'
+        'state': task.state,  # Will be 'PENDING', 'STARTED', 'PROGRESS', 'SUCCESS', or 'FAILURE'
     }
     
-    if task.state == 'SUCCESS':
+    if task.state == 'PROGRESS':
+        # Bulk uploads report {stage, rows_done, rows_total, error_count, percent}
+        # (core.utils.upload_jobs.UploadProgress)
+        response_data['progress'] = task.info
+
+    elif task.state == 'SUCCESS':
         # This contains whatever your tasks.py function returned! 
         # (e.g. {"file_path": "/media/reports/..."})
         response_data['result'] = task.result
@@ -26,3 +34,13 @@ def check_task_status(request, task_id):
         response_data['error'] = str(task.info)
         
     return Response(response_data)
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def cache_stats(request):
+    """
+    Hit counts of the shared caches, for this worker process and for all
+    processes together. `hit_rate` is null until the first lookup.
+    """
+    return Response({'hierarchy': hierarchy_stats(), 'reports': report_cache_stats()})
@@ -0,0 +1,216 @@
+"""
+Per-institution cache of the academic hierarchy (Faculty -> Department -> Program).
+
+Bulk uploads, ingestion, report relation options and the student
+serializer all resolve faculty/department names and program codes of one
+institution. Instead of each building its own dictionaries from the
+database, they share an immutable snapshot:
+
+    hierarchy = get_hierarchy(institution_id)
+    node = hierarchy.program_by_code.get(code.lower())   # ProgramNode or None
+    Student(program_id=node.id, department_id=node.department_id, faculty_id=node.faculty_id)
+
+Snapshots are cached in two tiers: a small in-process LRU and Redis (the
+default cache), both keyed by an institution-level version counter kept
+in Redis. Faculty, Department and Program save()/delete() bump the
+counter when their transaction commits; queryset-level writes (bulk_create,
+update, delete) must call bump_hierarchy_version() themselves. A lookup
+costs one Redis GET for the version; the database is only read (four
+queries) when no tier holds the current version.
+
+Hit counts are kept per process and flushed to Redis totals for all
+processes in batches (core.utils.cache_stats); see hierarchy_stats() and
+GET /api/cache/stats/.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q
+
+from core.utils.cache_stats import CacheStats
+
+FacultyNode = namedtuple('FacultyNode', 'id name')
+DepartmentNode = namedtuple('DepartmentNode', 'id name code faculty_id')
+ProgramNode = namedtuple(
+    'ProgramNode',
+    'id name code department_id faculty_id duration semester_fee levels categories '
+    'is_critical_skill is_specialized_skill program_type',
+)
+
+VERSION_KEY = 'hierarchy:version:{}'
+SNAPSHOT_KEY = 'hierarchy:{}:{}'
+STATS_KEY = 'hierarchy:stats:{}'
+STAT_NAMES = ('local_hits', 'shared_hits', 'misses', 'invalidations')
+
+# Snapshots kept in each process
+LOCAL_MAX_ENTRIES = 256
+
+
+def program_node(program, faculty_id):
+    """ProgramNode of a Program instance (e.g. one created after the snapshot was taken)."""
+    return ProgramNode(
+        id=program.id, name=program.name, code=program.code, department_id=program.department_id,
+        faculty_id=faculty_id, duration=program.duration, semester_fee=program.semester_fee,
+        levels=tuple(program.levels or ()), categories=tuple(program.categories or ()),
+        is_critical_skill=program.is_critical_skill, is_specialized_skill=program.is_specialized_skill,
+        program_type=program.program_type,
+    )
+
+
+class InstitutionHierarchy:
+    """Immutable snapshot of one institution's faculties, departments and programs."""
+
+    def __init__(self, institution_id, version, institution_name, faculties, departments, programs):
+        self.institution_id = institution_id
+        self.version = version
+        self.institution_name = institution_name
+        self.faculties = {f.id: f for f in faculties}
+        self.departments = {d.id: d for d in departments}
+        self.programs = {p.id: p for p in programs}
+
+        # Case-insensitive indexes; on duplicates the first by name (then id) wins
+        self.faculty_by_name = {}
+        for f in faculties:
+            self.faculty_by_name.setdefault(f.name.strip().lower(), f)
+        self.department_by_name = {}
+        for d in departments:
+            self.department_by_name.setdefault((d.faculty_id, d.name.strip().lower()), d)
+        self.program_by_code = {}
+        for p in programs:
+            self.program_by_code.setdefault(p.code.strip().lower(), p)
+
+    def faculty_named(self, name):
+        return self.faculty_by_name.get(str(name or '').strip().lower())
+
+    def department_named(self, faculty_id, name):
+        return self.department_by_name.get((faculty_id, str(name or '').strip().lower()))
+
+    def program_coded(self, code):
+        return self.program_by_code.get(str(code or '').strip().lower())
+
+
+_local = OrderedDict()
+_local_lock = threading.Lock()
+_stats = CacheStats(STATS_KEY, STAT_NAMES)
+
+
+def _timeout():
+    return getattr(settings, 'HIERARCHY_CACHE_TIMEOUT', 60 * 60)
+
+
+def _current_version(institution_id):
+    key = VERSION_KEY.format(institution_id)
+    version = cache.get(key)
+    if version is None:
+        # Start from the clock rather than 1, so a counter lost from Redis
+        # can never come back at a value an old snapshot is stored under
+        cache.add(key, time.time_ns() // 1000, None)
+        version = cache.get(key)
+    return version
+
+
+def _build(institution_id, version):
+    from academic.models import Institution
+    from faculties.models import Department, Faculty, Program
+
+    institution_name = Institution.objects.filter(pk=institution_id).values_list('name', flat=True).first()
+    faculties = [
+        FacultyNode(*row)
+        for row in Faculty.objects.filter(institution_id=institution_id).order_by('name', 'id').values_list('id', 'name')
+    ]
+    departments = [
+        DepartmentNode(*row)
+        for row in Department.objects.filter(faculty__institution_id=institution_id)
+        .order_by('name', 'id').values_list('id', 'name', 'code', 'faculty_id')
+    ]
+    programs = [
+        ProgramNode(
+            id=row[0], name=row[1], code=row[2], department_id=row[3], faculty_id=row[4],
+            duration=row[5], semester_fee=row[6], levels=tuple(row[7] or ()), categories=tuple(row[8] or ()),
+            is_critical_skill=row[9], is_specialized_skill=row[10], program_type=row[11],
+        )
+        # Programs added without a department only carry the institution;
+        # their faculty_id is None (the faculty comes from the department)
+        for row in Program.objects.filter(
+            Q(institution_id=institution_id) | Q(department__faculty__institution_id=institution_id)
+        ).order_by('name', 'id').values_list(
+            'id', 'name', 'code', 'department_id', 'department__faculty_id', 'duration', 'semester_fee',
+            'levels', 'categories', 'is_critical_skill', 'is_specialized_skill', 'program_type',
+        )
+    ]
+    return InstitutionHierarchy(institution_id, version, institution_name, faculties, departments, programs)
+
+
+def get_hierarchy(institution_id):
+    """Current InstitutionHierarchy of an institution (empty for None)."""
+    if institution_id is None:
+        return InstitutionHierarchy(None, None, None, [], [], [])
+    institution_id = int(institution_id)
+    version = _current_version(institution_id)
+
+    with _local_lock:
+        hierarchy = _local.get(institution_id)
+        if hierarchy is not None and hierarchy.version == version:
+            _local.move_to_end(institution_id)
+            _stats.count('local_hits')
+            return hierarchy
+
+    key = SNAPSHOT_KEY.format(institution_id, version)
+    hierarchy = cache.get(key)
+    if hierarchy is not None:
+        _stats.count('shared_hits')
+    else:
+        _stats.count('misses')
+        hierarchy = _build(institution_id, version)
+        cache.set(key, hierarchy, _timeout())
+
+    with _local_lock:
+        _local[institution_id] = hierarchy
+        _local.move_to_end(institution_id)
+        while len(_local) > LOCAL_MAX_ENTRIES:
+            _local.popitem(last=False)
+    return hierarchy
+
+
+def bump_hierarchy_version(institution_id):
+    """
+    Invalidate an institution's cached hierarchy once the current transaction
+    commits (immediately outside one). Readers that run before the commit
+    keep the old snapshot, which is also what they can see in the database.
+    """
+    if institution_id is None:
+        return
+
+    def bump():
+        key = VERSION_KEY.format(institution_id)
+        try:
+            cache.incr(key)
+        except ValueError:
+            # No counter yet: the next lookup starts a fresh one
+            pass
+        _stats.count('invalidations')
+
+    transaction.on_commit(bump)
+
+
+def hierarchy_stats():
+    """Hit counts of this process and of all processes (from Redis), with hit rates."""
+    counts = _stats.process()
+    totals = _stats.all_processes()
+    return {
+        'process': {'pid': os.getpid(), **counts, 'hit_rate': _hit_rate(counts), 'cached_institutions': len(_local)},
+        'all_processes': {**totals, 'hit_rate': _hit_rate(totals)},
+    }
+
+
+def _hit_rate(counts):
+    lookups = counts['local_hits'] + counts['shared_hits'] + counts['misses']
+    if not lookups:
+        return None
+    return round((counts['local_hits'] + counts['shared_hits']) / lookups, 4)
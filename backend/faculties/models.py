@@ -1,5 +1,7 @@
 from django.db import models
 
+from .hierarchy import bump_hierarchy_version
+
 # --- CHOICES ---
 FACULTY_STATUSES = [
     ('Active', 'Active'),
@@ -56,6 +58,17 @@ class Faculty(models.Model):
         verbose_name_plural = "Faculties"
         ordering = ['name']
 
+    # Cached per institution by faculties.hierarchy
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        bump_hierarchy_version(self.institution_id)
+
+    def delete(self, *args, **kwargs):
+        institution_id = self.institution_id
+        result = super().delete(*args, **kwargs)
+        bump_hierarchy_version(institution_id)
+        return result
+
     def __str__(self):
         return f"{self.name}" 
 
@@ -80,6 +93,16 @@ class Department(models.Model):
     class Meta:
         ordering = ['name']
 
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        bump_hierarchy_version(self.faculty.institution_id)
+
+    def delete(self, *args, **kwargs):
+        institution_id = self.faculty.institution_id
+        result = super().delete(*args, **kwargs)
+        bump_hierarchy_version(institution_id)
+        return result
+
     def __str__(self):
         return f"{self.name} ({self.faculty.name})"
 
@@ -146,7 +169,19 @@ class Program(models.Model):
                 (float(self.duration_weeks) / 52.0) + 
                 (float(self.duration_days) / 365.0)
             ))
+        adding = self._state.adding
         super().save(*args, **kwargs)
+        bump_hierarchy_version(self.institution_id)
+        if not adding:
+            # Re-price the balance ledgers of this program's students
+            from academic.models import StudentBalance
+            StudentBalance.objects.sync_expected_fee(student__program_id=self.pk)
+
+    def delete(self, *args, **kwargs):
+        institution_id = self.institution_id
+        result = super().delete(*args, **kwargs)
+        bump_hierarchy_version(institution_id)
+        return result
 
     def __str__(self):
         return f"{self.name} ({self.code})"
\ No newline at end of file
@@ -0,0 +1,143 @@
+import pandas as pd
+from django.core.exceptions import ValidationError
+from django.db.models import Count
+from ..models import IseopProgram, IseopStudent
+from core.utils.upload_validation import GENDER_MAP, RowErrors, choice_map, clean_text, normalize_choice, to_int
+
+
+class IseopService:
+    @staticmethod
+    def bulk_create_from_file(file, institution, progress=None):
+        """
+        Parses an Excel/CSV file of ISEOP students. Valid rows are created
+        even when other rows fail; returns the created count and the errors.
+        `progress(stage, rows_done, rows_total, error_count)` is called after
+        validation and after every inserted batch.
+        """
+        try:
+            if file.name.endswith('.csv'):
+                df = pd.read_csv(file, dtype=str)
+            else:
+                df = pd.read_excel(file, dtype=str)
+                
+            # Normalize columns
+            df.columns = [c.strip().lower().replace(' ', '_').replace('/', '_') for c in df.columns]
+        except Exception as e:
+            raise ValidationError(f"Error parsing file: {str(e)}")
+
+        # ---------------- Column-wise validation ----------------
+        student_id = clean_text(df, 'student_id', upper=True)
+        first_name = clean_text(df, 'first_name', upper=True)
+        last_name = clean_text(df, 'last_name', upper=True)
+        national_id = clean_text(df, 'national_id', upper=True)
+        program_name = clean_text(df, 'program', upper=True)
+
+        contact = clean_text(df, 'email_or_phone', 'email_phone', 'email', 'phone')
+        has_at = contact.str.contains('@', regex=False)
+        email = contact.where(has_at, '')
+        phone = contact.where(~has_at, '')
+
+        gender = normalize_choice(clean_text(df, 'gender', default='Male'), GENDER_MAP)
+        status_value = normalize_choice(
+            clean_text(df, 'status', default='Active/Enrolled'), choice_map(IseopStudent.ISEOP_STATUS_CHOICES)
+        )
+        disability = normalize_choice(
+            clean_text(df, 'disability_type', default='None'), choice_map(IseopStudent.DISABILITY_TYPES)
+        )
+
+        # Enrollment year: from the enrollment date (YYYY-...) if given, else the year column
+        enrollment_date = clean_text(df, 'enrollment_date')
+        year_from_date, bad_date_year = to_int(
+            enrollment_date.str.split('-').str[0].where(enrollment_date.str.contains('-', regex=False), '')
+        )
+        year_column, bad_year = to_int(clean_text(df, 'enrollment_year'))
+        enrollment_year = year_from_date.where(enrollment_date != '', year_column)
+        bad_year = (bad_year & (enrollment_date == '')) | bad_date_year
+
+        # One query each for IDs and national IDs already taken
+        existing_ids = set(
+            IseopStudent.objects.filter(student_id__in=set(student_id) - {''})
+            .values_list('student_id', flat=True)
+        )
+        taken_national_ids = set(
+            IseopStudent.objects.filter(national_id__in=set(national_id) - {''})
+            .values_list('national_id', flat=True)
+        )
+
+        row_errors = RowErrors(df.index)
+        missing_id = row_errors.add(student_id == '', "Student ID is required.")
+        duplicate = row_errors.add(
+            ~missing_id & student_id.duplicated(),
+            "Duplicate Student ID '" + student_id + "' in the uploaded file.",
+        )
+        exists = row_errors.add(
+            ~missing_id & ~duplicate & student_id.isin(existing_ids),
+            "Student ID '" + student_id + "' already exists in database.",
+        )
+        live = ~(missing_id | duplicate | exists)
+        row_errors.add(live & (first_name == ''), "First Name is required.")
+        row_errors.add(live & (last_name == ''), "Last Name is required.")
+        no_national_id = row_errors.add(live & (national_id == ''), "National ID is required.")
+        row_errors.add(
+            live & ~no_national_id & national_id.duplicated(),
+            "Duplicate National ID in the uploaded file.",
+        )
+        row_errors.add(
+            live & ~no_national_id & national_id.isin(taken_national_ids),
+            "A student with this National ID already exists.",
+        )
+        no_program = row_errors.add(live & (program_name == ''), "Program name is required.")
+        row_errors.add(live & ~no_program & bad_year, "Enrollment Year must be a number.")
+
+        prefix = ("Student ID " + student_id).where(
+            ~missing_id, "Row " + (df.index + 2).astype(str) + " (No Student ID)"
+        )
+        errors = row_errors.flat(prefix)
+
+        # ---------------- Create the valid rows ----------------
+        valid = ~row_errors.any()
+        programs = {}
+        for name in program_name[valid].unique():
+            programs[name], _ = IseopProgram.objects.get_or_create(
+                name=name,
+                institution=institution,
+                defaults={'status': 'Active', 'capacity': 0}
+            )
+
+        students = [
+            IseopStudent(
+                student_id=student_id.at[i],
+                institution=institution,
+                first_name=first_name.at[i],
+                last_name=last_name.at[i],
+                national_id=national_id.at[i],
+                email=email.at[i],
+                phone=phone.at[i],
+                gender=gender.at[i],
+                status=status_value.at[i],
+                disability_type=disability.at[i],
+                program=programs[program_name.at[i]],
+                enrollment_year=enrollment_year.at[i],
+            )
+            for i in df.index[valid]
+        ]
+        if progress:
+            progress('validating', len(df), len(df), len(errors))
+        try:
+            for start in range(0, len(students), 1000):
+                IseopStudent.objects.bulk_create(students[start:start + 1000])
+                if progress:
+                    progress('saving', min(start + 1000, len(students)), len(df), len(errors))
+        except Exception as e:
+            raise ValidationError(f"Error saving students: {str(e)}")
+
+        # Refresh occupancy once per program touched
+        occupied = dict(
+            IseopStudent.objects.filter(program__in=programs.values())
+            .values_list('program').annotate(c=Count('id'))
+        )
+        for program in programs.values():
+            program.occupied = occupied.get(program.id, 0)
+            program.save()
+
+        return {"created_count": len(students), "errors": errors}
@@ -0,0 +1,34 @@
+from celery import shared_task
+from django.core.exceptions import ValidationError
+from academic.models import Institution
+from core.utils.upload_jobs import UploadProgress, open_upload
+from .services.iseop_services import IseopService
+import logging
+
+logger = logging.getLogger(__name__)
+
+@shared_task(bind=True)
+def process_iseop_upload(self, file_path, institution_id):
+    """
+    Celery task for large ISEOP student uploads. Receives the storage path of
+    the file saved by the web request; progress is published as PROGRESS state.
+    Like the synchronous endpoint, valid rows are created even if others fail.
+    """
+    logger.info(f"Starting async ISEOP upload for institution {institution_id}")
+    try:
+        with open_upload(file_path) as file_obj:
+            result = IseopService.bulk_create_from_file(
+                file_obj, Institution.objects.get(id=institution_id), progress=UploadProgress(self)
+            )
+    except ValidationError as e:
+        return {"status": "error", "detail": e.messages[0], "errors": []}
+    except Exception:
+        logger.exception("Failed to process async ISEOP upload")
+        raise
+
+    return {
+        "status": "error" if result["errors"] else "success",
+        "created_count": result["created_count"],
+        "error_count": len(result["errors"]),
+        "errors": result["errors"],
+    }
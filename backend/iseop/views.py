@@ -6,6 +6,7 @@ from rest_framework.response import Response
 from django.shortcuts import get_object_or_404
 from django.db.models import Count
 from django.http import Http404
+from django.core.exceptions import ValidationError as DjangoValidationError
 import csv
 
 from .models import IseopProgram, IseopStudent
@@ -13,6 +14,10 @@ from .serializers import IseopProgramSerializer, IseopStudentSerializer
 
 
 from core.mixins import InstitutionalIsolationMixin
+from core.pagination import KeysetCursorPagination
+from core.utils.upload_jobs import save_upload, wants_async
+from .services.iseop_services import IseopService
+from .tasks import process_iseop_upload
 
 class IseopProgramViewSet(InstitutionalIsolationMixin, viewsets.ModelViewSet):
     queryset = IseopProgram.objects.all()
@@ -25,6 +30,7 @@ class IseopStudentViewSet(InstitutionalIsolationMixin, viewsets.ModelViewSet):
     queryset = IseopStudent.objects.all()
     serializer_class = IseopStudentSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetCursorPagination
     institution_lookup_path = 'institution'
     lookup_field = "id"
 
@@ -176,7 +182,6 @@ class IseopStudentViewSet(InstitutionalIsolationMixin, viewsets.ModelViewSet):
     @action(detail=False, methods=["post"], url_path="bulk_upload")
     @parser_classes([MultiPartParser])
     def bulk_upload(self, request):
-        import pandas as pd
         file = request.FILES.get("file")
         if not file:
             return Response({"detail": "No file uploaded"}, status=400)
@@ -198,129 +203,16 @@ class IseopStudentViewSet(InstitutionalIsolationMixin, viewsets.ModelViewSet):
             else:
                 return Response({"detail": "User has no institution context."}, status=403)
 
-        try:
-            if file.name.endswith('.csv'):
-                df = pd.read_csv(file, dtype=str)
-            else:
-                df = pd.read_excel(file, dtype=str)
-                
-            # Normalize columns
-            df.columns = [c.strip().lower().replace(' ', '_').replace('/', '_') for c in df.columns]
-        except Exception as e:
-            return Response({"detail": f"Error parsing file: {str(e)}"}, status=400)
-
-        created_count = 0
-        errors = []
-        seen_in_file = set()
-
-        existing_ids = set(
-            IseopStudent.objects.filter(institution=user_inst)
-            .values_list('student_id', flat=True)
-        )
+        if wants_async(request):
+            task = process_iseop_upload.delay(save_upload(file, 'iseop'), user_inst.id)
+            return Response({"task_id": task.id}, status=status.HTTP_202_ACCEPTED)
 
-        for index, row in df.iterrows():
-            row_num = index + 2
-            error_prefix = f"Row {row_num}"
-            try:
-                # ---------------- ID & Basics ----------------
-                student_id_raw = row.get('student_id')
-                student_id = str(student_id_raw).strip().upper() if pd.notna(student_id_raw) else ""
-                error_prefix = f"Student ID {student_id}" if student_id else f"Row {row_num} (No Student ID)"
-                
-                if not student_id:
-                    errors.append(f"{error_prefix}: Student ID is required.")
-                    continue
-
-                if student_id in seen_in_file:
-                    errors.append(f"{error_prefix}: Duplicate Student ID '{student_id}' in the uploaded file.")
-                    continue
-                seen_in_file.add(student_id)
-
-                if student_id in existing_ids:
-                    errors.append(f"{error_prefix}: Student ID '{student_id}' already exists in database.")
-                    continue
-
-                first_name_raw = row.get('first_name')
-                last_name_raw = row.get('last_name')
-                first_name = str(first_name_raw).strip().upper() if pd.notna(first_name_raw) else ""
-                last_name = str(last_name_raw).strip().upper() if pd.notna(last_name_raw) else ""
-
-                if not first_name:
-                    errors.append(f"{error_prefix}: First Name is required.")
-                if not last_name:
-                    errors.append(f"{error_prefix}: Last Name is required.")
-
-                national_id_raw = row.get('national_id')
-                national_id = str(national_id_raw).strip().upper() if pd.notna(national_id_raw) else ""
-                if not national_id:
-                    errors.append(f"{error_prefix}: National ID is required.")
-
-                # ---------------- Contact Info ----------------
-                contact_raw = row.get('email_or_phone', row.get('email_phone', row.get('email', row.get('phone'))))
-                contact = str(contact_raw).strip() if pd.notna(contact_raw) else ""
-                email = contact if "@" in contact else ""
-                phone = contact if "@" not in contact else ""
-
-                gender_raw = str(row.get('gender', 'Male')).strip() if pd.notna(row.get('gender')) else "Male"
-                
-                # ---------------- Program ----------------
-                program_raw = row.get('program')
-                program_name = str(program_raw).strip().upper() if pd.notna(program_raw) else ""
-                if not program_name:
-                    errors.append(f"{error_prefix}: Program name is required.")
-                    continue
-
-                program, _ = IseopProgram.objects.get_or_create(
-                    name=program_name,
-                    institution=user_inst,
-                    defaults={'status': 'Active', 'capacity': 0}
-                )
-
-                # ---------------- Dates ----------------
-                enrollment_date = row.get('enrollment_date')
-                enrollment_year_raw = row.get('enrollment_year')
-                enrollment_year = None
-                
-                if pd.notna(enrollment_date):
-                    enrollment_date_str = str(enrollment_date).strip()
-                    if "-" in enrollment_date_str:
-                        enrollment_year = int(enrollment_date_str.split("-")[0])
-                elif pd.notna(enrollment_year_raw):
-                    try:
-                        enrollment_year = int(float(str(enrollment_year_raw).strip()))
-                    except ValueError:
-                        errors.append(f"{error_prefix}: Enrollment Year must be a number.")
-
-                # ---------------- Status & Disability ----------------
-                status_raw = str(row.get('status', 'Active/Enrolled')).strip() if pd.notna(row.get('status')) else 'Active/Enrolled'
-                disability_raw = str(row.get('disability_type', 'None')).strip() if pd.notna(row.get('disability_type')) else 'None'
-
-                # If we encountered basic validation errors, skip creating this row
-                if errors and any(e.startswith(error_prefix) for e in errors):
-                    continue
-
-                student = IseopStudent.objects.create(
-                    student_id=student_id,
-                    institution=user_inst,
-                    first_name=first_name,
-                    last_name=last_name,
-                    national_id=national_id,
-                    email=email,
-                    phone=phone,
-                    gender=gender_raw,
-                    status=status_raw,
-                    disability_type=disability_raw,
-                    program=program,
-                    enrollment_year=enrollment_year,
-                )
-                
-                program.occupied = IseopStudent.objects.filter(program=program).count()
-                program.save()
-
-                created_count += 1
-
-            except Exception as e:
-                errors.append(f"{error_prefix}: {str(e)}")
+        try:
+            result = IseopService.bulk_create_from_file(file, user_inst)
+        except DjangoValidationError as e:
+            return Response({"detail": e.messages[0]}, status=400)
+        errors = result["errors"]
+        created_count = result["created_count"]
 
         if errors:
             return Response({
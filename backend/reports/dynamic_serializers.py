@@ -57,9 +57,9 @@ class ReportGenerateSerializer(serializers.Serializer):
     )
 
     format = serializers.ChoiceField(
-        choices=['pdf', 'json', 'preview'],
+        choices=['pdf', 'json', 'preview', 'csv', 'ndjson'],
         default='pdf',
-        help_text="Output format: pdf, json data, or preview (first 10 rows)"
+        help_text="Output format: pdf, json data, preview (first 10 rows), or a streamed csv / ndjson export"
     )
 
     orientation = serializers.ChoiceField(
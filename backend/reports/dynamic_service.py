@@ -7,12 +7,22 @@ Handles building querysets, applying filters, aggregations, and generating repor
 from django.db.models import Count, Q
 from django.apps import apps
 
+from core.utils.metrics import summarize
+
+from .query_planner import plan_report
 from .schema_config import get_schema, get_field_by_key, REPORT_SCHEMAS
+from faculties.hierarchy import get_hierarchy
 
 
 class DynamicReportService:
     """Service for generating dynamic reports based on schema configuration."""
 
+    # Rows fetched per server-side cursor round trip by export_rows()
+    EXPORT_CHUNK_SIZE = 2000
+
+    # Records (or groups) returned by generate_preview()
+    PREVIEW_ROWS = 10
+
     @staticmethod
     def get_model(report_type: str):
         """Get the Django model for a report type."""
@@ -55,17 +65,8 @@ class DynamicReportService:
         if base_filter:
             queryset = queryset.filter(**base_filter)
 
-        # Add select_related for relation fields to optimize queries
-        select_related = []
-        if report_type == 'staff':
-            select_related = ['institution', 'faculty', 'department']
-        elif report_type in ['students', 'graduates']:
-            select_related = ['institution', 'program', 'program__department', 'program__department__faculty']
-        elif report_type in ['placements', 'scholarships']:
-            select_related = ['student', 'student__institution', 'student__program']
-
-        if select_related:
-            queryset = queryset.select_related(*select_related)
+        # Joins and column projection are left to the report's ReportPlan
+        # (query_planner), which knows which columns were selected
 
         # Apply user-provided filters
         if filters:
@@ -237,7 +238,15 @@ class DynamicReportService:
         Returns:
             QuerySet with aggregation applied, returning group name and count
         """
-        # Map group_by field to actual model field
+        actual_field = DynamicReportService._group_field(report_type, group_by)
+
+        return queryset.values(actual_field).annotate(
+            count=Count('id')
+        ).order_by('-count')
+
+    @staticmethod
+    def _group_field(report_type: str, group_by: str) -> str:
+        """Map a group_by field key to the model field path it groups on."""
         group_field_map = {
             'staff': {
                 'position': 'position',
@@ -289,11 +298,7 @@ class DynamicReportService:
             }
         }
 
-        actual_field = group_field_map.get(report_type, {}).get(group_by, group_by)
-
-        return queryset.values(actual_field).annotate(
-            count=Count('id')
-        ).order_by('-count')
+        return group_field_map.get(report_type, {}).get(group_by, group_by)
 
     @staticmethod
     def extract_record_data(obj, columns: list, report_type: str) -> dict:
@@ -326,7 +331,7 @@ class DynamicReportService:
             return f"{obj.student.first_name} {obj.student.last_name}" if hasattr(obj, 'student') and obj.student else ''
         if key == 'student_id_number':
             return obj.student.student_id if hasattr(obj, 'student') and obj.student else ''
-        if key == 'gender' and report_type in ['placements', 'scholarships']:
+        if key == 'gender' and report_type in ['placements', 'scholarships', 'mobility']:
             return obj.student.gender if hasattr(obj, 'student') and obj.student else ''
 
         # Handle relation display fields
@@ -352,7 +357,105 @@ class DynamicReportService:
         return getattr(obj, key, '')
 
     @staticmethod
-    def generate_report_data(config: dict) -> dict:
+    def export_rows(config: dict, chunk_size: int = EXPORT_CHUNK_SIZE):
+        """
+        Streaming counterpart of generate_report_data for non-aggregated
+        reports (format=csv / ndjson).
+
+        Rows are read through a server-side cursor `chunk_size` at a time and
+        yielded one dict per record, so memory stays flat for a national
+        extract. Only the fields and joins the selected columns need are
+        fetched (see query_planner.ReportPlan).
+
+        Returns (column_defs, rows); the query runs when `rows` is iterated.
+        """
+        report_type = config.get('report_type')
+        queryset, columns = DynamicReportService._report_queryset(config)
+        plan = plan_report(report_type, columns)
+        queryset = plan.apply(queryset)
+
+        def rows():
+            for row in queryset.iterator(chunk_size=chunk_size):
+                yield plan.record(row)
+
+        return DynamicReportService._column_defs(report_type, columns), rows()
+
+    @staticmethod
+    def _gender_field(report_type: str) -> str:
+        """Lookup of the gender a report's records carry ('' if none)."""
+        # Check if the model has a gender field or a student relation
+        Model = DynamicReportService.get_model(report_type)
+        field_names = [f.name for f in Model._meta.get_fields()]
+        if 'gender' in field_names:
+            return 'gender'
+        if 'student' in field_names:
+            return 'student__gender'
+        return ''
+
+    @staticmethod
+    def _summary_metrics(summary: dict, has_gender: bool) -> dict:
+        """Summary metrics block of a report from core.utils.metrics.summarize()."""
+        total = summary['total']
+        metrics = {
+            'total': total,
+            'male_count': summary['male'],
+            'female_count': summary['female'],
+            'other_count': summary['other'],
+            'male_pct': 0,
+            'female_pct': 0,
+        }
+        if has_gender and total > 0:
+            metrics['male_pct'] = round((summary['male'] / total) * 100, 1)
+            metrics['female_pct'] = round((summary['female'] / total) * 100, 1)
+        return metrics
+
+    @staticmethod
+    def _report_queryset(config: dict):
+        """Filtered queryset and selected columns (schema defaults if none) of a report config."""
+        report_type = config.get('report_type')
+        filters = config.get('filters', {})
+        user = config.get('user')
+        institution_id = config.get('institution_id')
+
+        # Add explicit institution filter if provided and user is superuser
+        if institution_id and user and user.is_superuser:
+            filters['institution_id'] = institution_id
+
+        columns = config.get('columns', []) or get_schema(report_type).get('default_columns', [])
+        queryset = DynamicReportService.build_queryset(
+            report_type=report_type,
+            filters=filters,
+            user=user
+        )
+        return queryset, columns
+
+    @staticmethod
+    def pdf_institution_name(user, institution_id: int = None):
+        """Institution named in a report's PDF header."""
+        # Get institution name from authenticated user
+        if hasattr(user, 'institution') and user.institution:
+            return user.institution.name
+        if user.is_superuser and institution_id:
+            # For superusers, they might still provide an institution_id for the PDF header
+            from academic.models import Institution
+            return Institution.objects.filter(id=institution_id).values_list('name', flat=True).first()
+        return None
+
+    @staticmethod
+    def _column_defs(report_type: str, columns: list) -> list:
+        """Key/label pairs of the selected columns."""
+        column_defs = []
+        for col in columns:
+            field_def = get_field_by_key(report_type, col)
+            if field_def:
+                column_defs.append({
+                    'key': col,
+                    'label': field_def['label']
+                })
+        return column_defs
+
+    @staticmethod
+    def generate_report_data(config: dict, limit: int = None) -> dict:
         """
         Main entry point for generating report data.
 
@@ -363,6 +466,8 @@ class DynamicReportService:
                 - columns: List of columns to include
                 - group_by: Optional field to group by
                 - user: The authenticated user to enforce institutional isolation
+            limit: Optional number of records (LIMIT in SQL) or largest groups
+                to return; total and metrics still cover the whole scope
 
         Returns:
             Dictionary containing:
@@ -374,98 +479,32 @@ class DynamicReportService:
                 - group_by: Group by field (if aggregated)
         """
         report_type = config.get('report_type')
-        filters = config.get('filters', {})
-        columns = config.get('columns', [])
         group_by = config.get('group_by')
-        user = config.get('user')
-        institution_id = config.get('institution_id')
-
-        # Add explicit institution filter if provided and user is superuser
-        if institution_id and user and user.is_superuser:
-            filters['institution_id'] = institution_id
 
-        # Get schema and default columns if none specified
-        schema = get_schema(report_type)
-        if not columns:
-            columns = schema.get('default_columns', [])
+        # Base queryset and columns (schema defaults if none specified)
+        queryset, columns = DynamicReportService._report_queryset(config)
 
-        # Build base queryset
-        queryset = DynamicReportService.build_queryset(
-            report_type=report_type,
-            filters=filters,
-            user=user
-        )
-
-        total = queryset.count()
-
-        # --- NEW: Calculate Summary Metrics ---
-        metrics = {
-            'total': total,
-            'male_count': 0,
-            'female_count': 0,
-            'other_count': 0,
-            'male_pct': 0,
-            'female_pct': 0,
-        }
-
-        # Check if the model has a gender field or a student relation
-        Model = DynamicReportService.get_model(report_type)
-        field_names = [f.name for f in Model._meta.get_fields()]
-        
-        has_gender = False
-        gender_field = ''
-        
-        if 'gender' in field_names:
-            has_gender = True
-            gender_field = 'gender'
-        elif 'student' in field_names:
-            has_gender = True
-            gender_field = 'student__gender'
-
-        if has_gender:
-            # Use filters from build_queryset to keep metrics accurate to the report scope
-            metrics['male_count'] = queryset.filter(**{gender_field: 'Male'}).count()
-            metrics['female_count'] = queryset.filter(**{gender_field: 'Female'}).count()
-            metrics['other_count'] = total - (metrics['male_count'] + metrics['female_count'])
-            
-            if total > 0:
-                metrics['male_pct'] = round((metrics['male_count'] / total) * 100, 1)
-                metrics['female_pct'] = round((metrics['female_count'] / total) * 100, 1)
+        # Summary metrics (total, male/female split) are counted in the same
+        # query as the groups or, for record reports, in one aggregate query
+        gender_field = DynamicReportService._gender_field(report_type)
 
         # Handle aggregated reports
         if group_by:
-            aggregated = DynamicReportService.apply_aggregation(
-                queryset=queryset,
-                group_by=group_by,
-                report_type=report_type
-            )
+            actual_field = DynamicReportService._group_field(report_type, group_by)
+            summary = summarize(queryset, gender_field or None, group_by=actual_field)
+            total = summary['total']
+            metrics = DynamicReportService._summary_metrics(summary, bool(gender_field))
+            groups = summary['groups']
+            if limit:
+                # Already ordered by count: keep the largest groups
+                groups = groups[:limit]
 
             field_def = get_field_by_key(report_type, group_by)
             group_label = field_def['label'] if field_def else group_by
 
-            # Map for human readable display
-            actual_field = group_by
-            if report_type == 'staff':
-                actual_field = {
-                    'institution_name': 'institution__name',
-                    'faculty_name': 'faculty__name',
-                    'department_name': 'department__name',
-                }.get(group_by, group_by)
-            elif report_type in ['students', 'graduates']:
-                 actual_field = {
-                    'institution_name': 'institution__name',
-                    'program_name': 'program__name',
-                }.get(group_by, group_by)
-            elif report_type in ['placements', 'scholarships']:
-                 actual_field = {
-                    'institution_name': 'student__institution__name',
-                    'program_name': 'student__program__name',
-                    'gender': 'student__gender',
-                }.get(group_by, group_by)
-
             data = []
-            for item in aggregated:
-                group_value = item.get(actual_field, item.get(group_by, 'Unknown'))
+            for item in groups:
+                group_value = item.get(actual_field, 'Unknown')
                 # Handle boolean display
                 if group_by == 'is_active':
                     group_value = 'Active' if group_value else 'Inactive'
@@ -491,20 +530,15 @@ class DynamicReportService:
             }
 
         # Non-aggregated: return individual records
-        data = []
-        for obj in queryset:
-            record = DynamicReportService.extract_record_data(obj, columns, report_type)
-            data.append(record)
+        summary = summarize(queryset, gender_field or None)
+        total = summary['total']
+        metrics = DynamicReportService._summary_metrics(summary, bool(gender_field))
 
-        # Get column definitions for selected columns
-        column_defs = []
-        for col in columns:
-            field_def = get_field_by_key(report_type, col)
-            if field_def:
-                column_defs.append({
-                    'key': col,
-                    'label': field_def['label']
-                })
+        plan = plan_report(report_type, columns)
+        queryset = plan.apply(queryset)
+        if limit:
+            queryset = queryset[:limit]
+        data = [plan.record(row) for row in queryset]
 
         return {
             'data': data,
@@ -512,9 +546,48 @@ class DynamicReportService:
             'metrics': metrics,
             'is_aggregated': False,
             'group_by': None,
+            'columns': DynamicReportService._column_defs(report_type, columns)
+        }
+
+    @staticmethod
+    def generate_report_stream(config: dict) -> dict:
+        """
+        generate_report_data() for rendering a PDF of any size: 'data' is an
+        iterator of records read through a server-side cursor (see
+        export_rows), so the records are never all in memory. Aggregated
+        reports are one row per group and come from generate_report_data().
+        """
+        if config.get('group_by'):
+            return DynamicReportService.generate_report_data(config)
+
+        report_type = config.get('report_type')
+        queryset, _ = DynamicReportService._report_queryset(config)
+        gender_field = DynamicReportService._gender_field(report_type)
+        summary = summarize(queryset, gender_field or None)
+        column_defs, rows = DynamicReportService.export_rows(config)
+
+        return {
+            'data': rows,
+            'total': summary['total'],
+            'metrics': DynamicReportService._summary_metrics(summary, bool(gender_field)),
+            'is_aggregated': False,
+            'group_by': None,
             'columns': column_defs
         }
 
+    @staticmethod
+    def generate_preview(config: dict, limit: int = PREVIEW_ROWS) -> dict:
+        """
+        First `limit` records (or largest groups) of a report with its full
+        total and metrics. Records are limited in SQL and only the selected
+        columns are read, so a preview costs two queries however many
+        records match.
+        """
+        preview_data = DynamicReportService.generate_report_data(config, limit=limit)
+        preview_data['preview'] = True
+        preview_data['showing'] = len(preview_data['data'])
+        return preview_data
+
     @staticmethod
     def get_relation_options(report_type: str, field_key: str, institution_id: int = None) -> list:
         """
@@ -537,17 +610,23 @@ class DynamicReportService:
             return []
 
         app_label, model_name = relation_model.split('.')
-        Model = apps.get_model(app_label, model_name)
 
-        queryset = Model.objects.all()
-
-        # Apply institution filter for nested relations
-        if institution_id:
+        # An institution's faculties, departments and programs come from the
+        # cached hierarchy (already ordered by name); labels match str(obj)
+        if institution_id and model_name in ('Program', 'Faculty', 'Department'):
+            hierarchy = get_hierarchy(institution_id)
             if model_name == 'Program':
-                queryset = queryset.filter(
-                    department__faculty__institution_id=institution_id
-                )
-            elif model_name in ['Faculty', 'Department']:
-                queryset = queryset.filter(institution_id=institution_id)
+                options = [(p.id, f"{p.name} ({p.code})") for p in hierarchy.programs.values()]
+            elif model_name == 'Faculty':
+                options = [(f.id, f.name) for f in hierarchy.faculties.values()]
+            else:
+                options = [
+                    (d.id, f"{d.name} ({hierarchy.faculties[d.faculty_id].name})")
+                    for d in hierarchy.departments.values()
+                ]
+            return [{'id': pk, 'name': name} for pk, name in options[:100]]
+
+        Model = apps.get_model(app_label, model_name)
+        queryset = Model.objects.all()
 
         return [{'id': obj.id, 'name': str(obj)} for obj in queryset.order_by('name')[:100]]
@@ -3,17 +3,24 @@ Dynamic Report API Views
 
 Provides endpoints for:
 - Getting report schema/field definitions
-- Generating reports (PDF, JSON, preview)
+- Generating reports (PDF, JSON, preview, streamed CSV/NDJSON)
 - Getting relation field options
 """
 
+import csv
+import json
 import logging
-from django.http import HttpResponse
+from datetime import datetime
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponse, StreamingHttpResponse
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
 
+from core.utils.upload_jobs import wants_async
+
 from .schema_config import (
     get_schema,
     get_filterable_fields,
@@ -27,6 +34,8 @@ from .dynamic_serializers import (
     RelationOptionsRequestSerializer
 )
 from .pdf_generator import generate_dynamic_report_pdf
+from .result_cache import cached_report
+from .services import ReportService
 
 logger = logging.getLogger(__name__)
 
@@ -103,14 +112,18 @@ class DynamicReportGenerateView(APIView):
         "columns": ["employee_id", "full_name", "position", "department_name"],
         "group_by": "position",  // optional
         "institution_id": 1,  // optional
-        "format": "pdf",  // pdf, json, or preview
-        "orientation": "auto"  // portrait, landscape, or auto
+        "format": "pdf",  // pdf, json, preview, csv or ndjson
+        "orientation": "auto",  // portrait, landscape, or auto
+        "async": false  // pdf only: render in a background worker
     }
 
     Returns:
     - PDF file download (format=pdf)
+    - 202 {report_id, task_id, status} (format=pdf, async=true); poll
+      /api/reports/status/<report_id>/ and fetch /api/reports/download/<report_id>/
     - JSON data (format=json)
     - Preview data - first 10 rows (format=preview)
+    - Streamed CSV / newline-delimited JSON download (format=csv / ndjson)
     """
     permission_classes = [IsAuthenticated]
 
@@ -133,54 +146,93 @@ class DynamicReportGenerateView(APIView):
             'user': request.user, # PASS THE USER
         }
 
-        # Generate report data
-        try:
-            report_data = DynamicReportService.generate_report_data(config)
-        except Exception as e:
-            logger.exception("Failed to generate report data")
-            return Response(
-                {'error': f'Failed to generate report: {str(e)}'},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR
-            )
-
-        # Handle preview format - return first 10 rows
+        # Exports stream rows straight from a database cursor
+        if output_format in ('csv', 'ndjson') and not config['group_by']:
+            try:
+                column_defs, rows = DynamicReportService.export_rows(config)
+            except Exception as e:
+                logger.exception("Failed to build report export")
+                return Response(
+                    {'error': f'Failed to generate report: {str(e)}'},
+                    status=status.HTTP_500_INTERNAL_SERVER_ERROR
+                )
+            return stream_export(report_type, column_defs, rows, output_format)
+
+        # Handle preview format - first 10 rows, limited in SQL
         if output_format == 'preview':
-            preview_data = report_data.copy()
-            preview_data['data'] = report_data['data'][:10]
-            preview_data['preview'] = True
-            preview_data['showing'] = min(10, len(report_data['data']))
-            return Response(preview_data)
-
-        # Handle JSON format - return all data
+            try:
+                return Response(
+                    cached_report(config, 'preview', lambda: DynamicReportService.generate_preview(config))
+                )
+            except Exception as e:
+                logger.exception("Preview generation failed")
+                return Response(
+                    {'error': f'Failed to generate preview: {str(e)}'},
+                    status=status.HTTP_500_INTERNAL_SERVER_ERROR
+                )
+
+        # JSON, and the PDF below, are served from the result cache until the
+        # data they read changes (reports.result_cache)
         if output_format == 'json':
-            return Response(report_data)
+            try:
+                return Response(
+                    cached_report(config, 'json', lambda: DynamicReportService.generate_report_data(config))
+                )
+            except Exception as e:
+                logger.exception("Failed to generate report data")
+                return Response(
+                    {'error': f'Failed to generate report: {str(e)}'},
+                    status=status.HTTP_500_INTERNAL_SERVER_ERROR
+                )
+
+        # Grouped exports are one row per group: small enough to build first
+        if output_format in ('csv', 'ndjson'):
+            try:
+                report_data = DynamicReportService.generate_report_data(config)
+            except Exception as e:
+                logger.exception("Failed to generate report data")
+                return Response(
+                    {'error': f'Failed to generate report: {str(e)}'},
+                    status=status.HTTP_500_INTERNAL_SERVER_ERROR
+                )
+            return stream_export(report_type, report_data['columns'], report_data['data'], output_format)
 
         # Handle PDF format
         schema = get_schema(report_type)
         title = data.get('title') or schema.get('title', f'{report_type.title()} Report')
+        orientation = data.get('orientation', 'auto')
 
-        # Get institution name from authenticated user
-        institution_name = None
-        if hasattr(request.user, 'institution') and request.user.institution:
-            institution_name = request.user.institution.name
-        elif request.user.is_superuser:
-            # For superusers, they might still provide an institution_id for the PDF header
-            institution_id = data.get('institution_id')
-            if institution_id:
-                from academic.models import Institution
-                try:
-                    institution = Institution.objects.get(id=institution_id)
-                    institution_name = institution.name
-                except Institution.DoesNotExist:
-                    pass
+        # Background PDF: a worker renders it to storage; poll the report's
+        # status and fetch it from DownloadReportView
+        if wants_async(request):
+            try:
+                report = ReportService.queue_dynamic_pdf(config, title, orientation)
+            except Exception as e:
+                logger.exception("Failed to queue PDF generation")
+                return Response(
+                    {'error': f'Failed to queue PDF: {str(e)}'},
+                    status=status.HTTP_500_INTERNAL_SERVER_ERROR
+                )
+            return Response(
+                {'report_id': str(report.id), 'task_id': report.task_id, 'status': report.status},
+                status=status.HTTP_202_ACCEPTED
+            )
 
-        try:
-            pdf_buffer = generate_dynamic_report_pdf(
+        def build_pdf():
+            # Records are streamed from the database into the PDF tables
+            report_data = DynamicReportService.generate_report_stream(config)
+            return generate_dynamic_report_pdf(
                 report_type=report_type,
                 title=title,
                 report_data=report_data,
-                institution_name=institution_name,
-                orientation=data.get('orientation', 'auto')
+                institution_name=DynamicReportService.pdf_institution_name(request.user, data.get('institution_id')),
+                orientation=orientation
+            ).getvalue()
+
+        try:
+            pdf_bytes = cached_report(
+                # The header names the user's own institution, even for superusers
+                config, ['pdf', title, orientation, getattr(request.user, 'institution_id', None)], build_pdf
             )
         except Exception as e:
             logger.exception("PDF generation failed")
@@ -190,19 +242,54 @@ class DynamicReportGenerateView(APIView):
             )
 
         # Create filename
-        from datetime import datetime
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         filename = f"{report_type}_report_{timestamp}.pdf"
 
         # Return PDF response
         response = HttpResponse(
-            pdf_buffer.getvalue(),
+            pdf_bytes,
             content_type='application/pdf'
         )
         response['Content-Disposition'] = f'attachment; filename="{filename}"'
         return response
 
 
+class _Echo:
+    """File-like object whose write() hands the line back, for csv.writer in a generator."""
+
+    def write(self, value):
+        return value
+
+
+def stream_export(report_type, column_defs, rows, output_format):
+    """
+    StreamingHttpResponse writing `rows` (dicts keyed by column) as CSV with a
+    header of column labels, or as one JSON object per line (ndjson).
+    """
+    keys = [col['key'] for col in column_defs]
+
+    if output_format == 'csv':
+        writer = csv.writer(_Echo())
+
+        def lines():
+            yield writer.writerow([col['label'] for col in column_defs])
+            for row in rows:
+                yield writer.writerow(['' if row.get(key) is None else row.get(key) for key in keys])
+
+        content_type = 'text/csv'
+    else:
+        def lines():
+            for row in rows:
+                yield json.dumps({key: row.get(key) for key in keys}, cls=DjangoJSONEncoder) + '\n'
+
+        content_type = 'application/x-ndjson'
+
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    response = StreamingHttpResponse(lines(), content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="{report_type}_report_{timestamp}.{output_format}"'
+    return response
+
+
 class DynamicReportPreviewView(APIView):
     """
     POST /api/reports/dynamic/preview/
@@ -232,8 +319,9 @@ class DynamicReportPreviewView(APIView):
             'user': request.user,
         }
 
+        # First 10 rows, limited in SQL; total and metrics cover the whole report
         try:
-            report_data = DynamicReportService.generate_report_data(config)
+            preview_data = cached_report(config, 'preview', lambda: DynamicReportService.generate_preview(config))
         except Exception as e:
             logger.exception("Preview generation failed")
             return Response(
@@ -241,12 +329,6 @@ class DynamicReportPreviewView(APIView):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
-        # Return preview (first 10 rows)
-        preview_data = report_data.copy()
-        preview_data['data'] = report_data['data'][:10]
-        preview_data['preview'] = True
-        preview_data['showing'] = min(10, len(report_data['data']))
-
         return Response(preview_data)
 
 
@@ -0,0 +1,102 @@
+"""
+Management command to benchmark the dynamic report query planner.
+
+Creates a synthetic institution with the requested number of students and
+generates the students report with 1 to 4 columns, timing:
+  * Instances: full model instances with the joins build_queryset used to
+    add for every students report, read through extract_record_data()
+    (the path before reports.query_planner).
+  * Planned: the ReportPlan for the selected columns, i.e. a values_list()
+    projection until an encrypted column (full_name) is selected, then
+    only() on just the columns read.
+
+Everything runs inside a rolled-back transaction, so nothing is left in
+the database.
+
+Usage:
+    python manage.py benchmark_report_columns
+    python manage.py benchmark_report_columns --rows 100000
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from academic.models import Institution, Student
+from faculties.models import Department, Faculty, Program
+from reports.dynamic_service import DynamicReportService
+from reports.query_planner import plan_report
+
+# Cheapest first; full_name reads the encrypted first_name/last_name
+COLUMN_SETS = [
+    ['student_id'],
+    ['student_id', 'gender'],
+    ['student_id', 'gender', 'inclusivity_category'],
+    ['student_id', 'gender', 'inclusivity_category', 'full_name'],
+]
+LEGACY_JOINS = ['institution', 'program', 'program__department', 'program__department__faculty']
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the students report by number of selected columns'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rows',
+            type=int,
+            default=50000,
+            help='Number of students in the benchmark institution (default: 50000)',
+        )
+
+    def handle(self, *args, **options):
+        size = options['rows']
+
+        with transaction.atomic():
+            institution = self._seed(size)
+
+            self.stdout.write(f"\n{'='*60}")
+            self.stdout.write(f"Students report, {size:,} rows")
+            self.stdout.write(f"{'='*60}")
+            self.stdout.write(f"{'Columns':<9}{'Instances (s)':>15}{'Planned (s)':>14}{'Speedup':>10}  Projection")
+
+            for columns in COLUMN_SETS:
+                queryset = Student.objects.filter(institution=institution)
+
+                started = time.perf_counter()
+                for obj in queryset.select_related(*LEGACY_JOINS):
+                    DynamicReportService.extract_record_data(obj, columns, 'students')
+                legacy = time.perf_counter() - started
+
+                plan = plan_report('students', columns)
+                started = time.perf_counter()
+                for row in plan.apply(queryset):
+                    plan.record(row)
+                planned = time.perf_counter() - started
+
+                projection = 'values_list' if plan.uses_values else 'only'
+                self.stdout.write(
+                    f"{len(columns):<9}{legacy:>15.2f}{planned:>14.2f}{legacy / planned:>9.1f}x  {projection}"
+                )
+
+            transaction.set_rollback(True)
+
+    def _seed(self, size):
+        institution = Institution.objects.create(
+            name='Report Benchmark', type='Other', location='-', established=2000
+        )
+        faculty = Faculty.objects.create(institution=institution, name='Benchmark Faculty')
+        department = Department.objects.create(faculty=faculty, name='Benchmark Department')
+        program = Program.objects.create(department=department, name='Benchmark Program', code='RB1', duration=3)
+        Student.objects.bulk_create(
+            [
+                Student(
+                    student_id=f"RBENCH{i:07d}", first_name=f"FIRST{i % 997}", last_name=f"LAST{i % 991}",
+                    gender='Female' if i % 2 else 'Male', enrollment_year=2020 + i % 5,
+                    inclusivity_category='None', institution=institution, program=program,
+                )
+                for i in range(size)
+            ],
+            batch_size=5000,
+        )
+        return institution
@@ -0,0 +1,98 @@
+"""
+Management command to benchmark dynamic report PDF rendering.
+
+Renders a detail report of synthetic student rows (4 columns, portrait)
+through generate_dynamic_report_pdf() for each requested row count, with
+the rows fed from a generator the way generate_report_stream() feeds
+them from a database cursor. Each size runs in its own forked process,
+so its peak RSS isn't inflated by an earlier, larger run.
+
+Reports, per size: pages, seconds, seconds per 1,000 rows, the process'
+RSS before rendering and its peak RSS while rendering, and the PDF size.
+
+Usage:
+    python manage.py benchmark_report_pdf
+    python manage.py benchmark_report_pdf --rows 1000 10000 100000
+"""
+
+import multiprocessing
+import resource
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from reports.pdf_generator import generate_dynamic_report_pdf
+
+COLUMNS = [
+    {'key': 'student_id', 'label': 'Student ID'},
+    {'key': 'full_name', 'label': 'Full Name'},
+    {'key': 'gender', 'label': 'Gender'},
+    {'key': 'inclusivity_category', 'label': 'Inclusivity Category'},
+]
+
+
+def _rss_mb():
+    # ru_maxrss is in KiB on Linux, bytes on macOS
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maxrss / (1024 * 1024) if sys.platform == 'darwin' else maxrss / 1024
+
+
+def _records(size):
+    for i in range(size):
+        yield {
+            'student_id': f"S{i:07d}",
+            'full_name': f"FIRST{i % 997} LAST{i % 991}",
+            'gender': 'Female' if i % 2 else 'Male',
+            'inclusivity_category': 'None',
+        }
+
+
+def _render(size, results):
+    before = _rss_mb()
+    report_data = {
+        'data': _records(size), 'total': size, 'columns': COLUMNS,
+        'is_aggregated': False, 'metrics': {},
+    }
+    started = time.perf_counter()
+    buffer = generate_dynamic_report_pdf('students', 'Benchmark Students', report_data, orientation='portrait')
+    seconds = time.perf_counter() - started
+    pdf = buffer.getvalue()
+    results.put((seconds, before, _rss_mb(), pdf.count(b'/Type /Page\n'), len(pdf)))
+
+
+class Command(BaseCommand):
+    help = 'Benchmark PDF rendering time and peak memory by number of rows'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rows',
+            type=int,
+            nargs='+',
+            default=[1000, 10000, 100000],
+            help='Row counts to render (default: 1000 10000 100000)',
+        )
+
+    def handle(self, *args, **options):
+        context = multiprocessing.get_context('fork')
+
+        self.stdout.write(f"\n{'='*60}")
+        self.stdout.write("Dynamic report PDF rendering")
+        self.stdout.write(f"{'='*60}")
+        self.stdout.write(
+            f"{'Rows':>8}{'Pages':>7}{'Seconds':>9}{'s/1k rows':>11}{'RSS before':>12}{'Peak RSS':>10}{'PDF':>9}"
+        )
+
+        for size in options['rows']:
+            results = context.Queue()
+            process = context.Process(target=_render, args=(size, results))
+            process.start()
+            process.join()
+            if process.exitcode != 0:
+                raise CommandError(f"Rendering {size:,} rows failed (exit code {process.exitcode})")
+            seconds, before, peak, pages, pdf_bytes = results.get()
+
+            self.stdout.write(
+                f"{size:>8,}{pages:>7,}{seconds:>9.2f}{seconds / size * 1000:>11.3f}"
+                f"{before:>9.0f} MB{peak:>7.0f} MB{pdf_bytes / 1e6:>6.1f} MB"
+            )
@@ -1,6 +1,15 @@
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
 import uuid
 
+REPORT_STATUSES = [
+    ('Pending', 'Pending'),
+    ('Running', 'Running'),
+    ('Completed', 'Completed'),
+    ('Failed', 'Failed'),
+]
+
 class GeneratedReport(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     report_type = models.CharField(max_length=100)
@@ -9,5 +18,24 @@ class GeneratedReport(models.Model):
     created_by = models.CharField(max_length=100, default="Admin")
     file = models.FileField(upload_to="reports/", null=True, blank=True)
 
+    # Background PDFs of dynamic reports (reports.tasks.generate_async_pdf_report)
+    # are created Pending. Reports generated in the request, including every
+    # row from before this field existed, are Completed.
+    status = models.CharField(max_length=20, choices=REPORT_STATUSES, default='Completed')
+    file_size = models.PositiveBigIntegerField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    # Report config without the user: report_type, filters, columns, group_by,
+    # institution_id, title, orientation
+    config = models.JSONField(null=True, blank=True, encoder=DjangoJSONEncoder)
+    requested_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name='generated_reports'
+    )
+    # Institution the report is limited to (None: all institutions)
+    institution = models.ForeignKey(
+        'academic.Institution', on_delete=models.SET_NULL, null=True, blank=True, related_name='generated_reports'
+    )
+    task_id = models.CharField(max_length=255, blank=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+
     def __str__(self):
-        return self.name
\ No newline at end of file
+        return self.name
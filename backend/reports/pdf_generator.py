@@ -23,7 +23,7 @@ from reportlab.lib.units import inch, mm
 from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
 from reportlab.platypus import (
     SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle,
-    PageBreak, Image, HRFlowable
+    PageBreak, Image, HRFlowable, Flowable
 )
 from reportlab.pdfgen import canvas
 
@@ -38,6 +38,9 @@ WHITE = colors.white
 BLACK = colors.black
 GRAY = colors.HexColor('#64748b')  # Slate gray
 
+# Detail rows laid out per Table by StreamedTable: a page or two of rows
+TABLE_CHUNK_ROWS = 50
+
 # SCALAREYE Logo URL
 SCALAREYE_LOGO_URL = 'https://scalareye.co.zw/wp-content/uploads/2025/04/scalareye-logo.jpg'
 
@@ -67,28 +70,38 @@ def get_scalareye_logo():
 
 
 class NumberedCanvas(canvas.Canvas):
-    """Custom canvas that adds page numbers and footer to each page."""
+    """
+    Custom canvas that adds page numbers and footer to each page.
+
+    The footer is drawn as each page is finished. The page total is only
+    known once the document is saved, so "Page X of Y" is a form XObject
+    per page that save() defines; nothing of a finished page is kept
+    around (a copy of every page's canvas state used to be, to draw the
+    footers at the end).
+    """
 
     def __init__(self, *args, **kwargs):
-        canvas.Canvas.__init__(self, *args, **kwargs)
-        self._saved_page_states = []
         self.institution_name = kwargs.pop('institution_name', '')
         self.report_title = kwargs.pop('report_title', 'Report')
+        canvas.Canvas.__init__(self, *args, **kwargs)
 
     def showPage(self):
-        self._saved_page_states.append(dict(self.__dict__))
-        self._startPage()
+        self.draw_page_footer()
+        canvas.Canvas.showPage(self)
 
     def save(self):
-        """Add page numbers to all pages."""
-        num_pages = len(self._saved_page_states)
-        for state in self._saved_page_states:
-            self.__dict__.update(state)
-            self.draw_page_footer(num_pages)
-            canvas.Canvas.showPage(self)
+        """Define every page's "Page X of Y" now that the total is known."""
+        page_count = self._pageNumber - 1
+        page_width = self._pagesize[0]
+        for page_number in range(1, page_count + 1):
+            self.beginForm(f'page_number_{page_number}')
+            self.setFont('Helvetica', 9)
+            self.setFillColor(GRAY)
+            self.drawRightString(page_width - 30, 25, f"Page {page_number} of {page_count}")
+            self.endForm()
         canvas.Canvas.save(self)
 
-    def draw_page_footer(self, page_count):
+    def draw_page_footer(self):
         """Draw footer with page number and confidentiality notice."""
         page_width, page_height = self._pagesize
 
@@ -97,13 +110,12 @@ class NumberedCanvas(canvas.Canvas):
         self.setLineWidth(0.5)
         self.line(30, 40, page_width - 30, 40)
 
-        # Page number - right side
-        self.setFont('Helvetica', 9)
-        self.setFillColor(GRAY)
-        page_text = f"Page {self._pageNumber} of {page_count}"
-        self.drawRightString(page_width - 30, 25, page_text)
+        # Page number - right side, filled in by save()
+        self.doForm(f'page_number_{self._pageNumber}')
 
         # Confidentiality notice - left side
+        self.setFont('Helvetica', 9)
+        self.setFillColor(GRAY)
         self.drawString(30, 25, "Confidential - For Internal Use Only")
 
         # Generation timestamp - center
@@ -111,6 +123,64 @@ class NumberedCanvas(canvas.Canvas):
         self.drawCentredString(page_width / 2, 25, f"Generated: {timestamp}")
 
 
+class StreamedTable(Flowable):
+    """
+    Detail table fed from an iterator of rows.
+
+    One Table holding every row is laid out again each time it is split
+    at a page break, so time grows with rows x pages and the whole table
+    stays in memory. StreamedTable pulls `chunk_rows` rows at a time and
+    builds a Table of just those (`make_table(rows, first_index)`); what
+    doesn't fit the page is carried into a new StreamedTable with the rest
+    of the iterator.
+    """
+
+    def __init__(self, make_table, rows, chunk_rows, first_index=0, pending=None):
+        Flowable.__init__(self)
+        self._make_table = make_table
+        self._rows = rows
+        self._chunk_rows = chunk_rows
+        self._first_index = first_index
+        self._pending = pending or []
+        self._table = None
+        self._more = False
+
+    def _fill(self):
+        """Pull the next chunk and build its Table; True if rows may be left after it."""
+        if self._table is None:
+            while len(self._pending) < self._chunk_rows:
+                row = next(self._rows, None)
+                if row is None:
+                    break
+                self._pending.append(row)
+            self._more = len(self._pending) == self._chunk_rows
+            self._table = self._make_table(self._pending, self._first_index)
+        return self._more
+
+    def wrap(self, availWidth, availHeight):
+        more = self._fill()
+        width, height = self._table.wrap(availWidth, availHeight)
+        # Rows left after this chunk: too tall, so the frame split()s
+        return width, availHeight + 1 if more else height
+
+    def split(self, availWidth, availHeight):
+        self._fill()
+        parts = self._table.split(availWidth, availHeight)
+        if not parts:
+            return []
+        shown = len(self._pending) if len(parts) == 1 else len(parts[0]._cellvalues) - 1
+        if shown == len(self._pending) and not self._more:
+            return [parts[0]]
+        rest = StreamedTable(
+            self._make_table, self._rows, self._chunk_rows,
+            first_index=self._first_index + shown, pending=self._pending[shown:],
+        )
+        return [parts[0], rest]
+
+    def draw(self):
+        self._table.drawOn(self.canv, 0, 0)
+
+
 class ProfessionalPDFGenerator:
     """
     Generates professional PDF reports with SCALAREYE branding.
@@ -282,35 +352,28 @@ class ProfessionalPDFGenerator:
 
         return elements
 
-    def _create_data_table(self, data: list, columns: list, is_aggregated: bool = False) -> Table:
+    def _row_values(self, record: dict, columns: list, is_aggregated: bool = False) -> list:
+        """Cell strings of one record."""
+        row = []
+        for col in columns:
+            value = record.get(col['key'], '')
+            # Handle None values
+            if value is None:
+                value = ''
+            # Truncate long values
+            str_value = str(value)
+            if len(str_value) > 50 and not is_aggregated:
+                str_value = str_value[:47] + '...'
+            row.append(str_value)
+        return row
+
+    def _build_table(self, rows: list, columns: list, is_aggregated: bool = False, first_index: int = 0) -> Table:
         """
-        Create a styled data table.
-
-        Args:
-            data: List of data dictionaries
-            columns: List of column definitions with 'key' and 'label'
-            is_aggregated: Whether this is an aggregated (grouped) table
+        Styled table of `rows` (cell strings) under a header row; `first_index`
+        is the number of rows before them, so row shading continues across
+        the chunks of a StreamedTable.
         """
-        if not data:
-            return Paragraph("No data available", self.styles['Normal'])
-
-        # Build table data
-        header_row = [col['label'] for col in columns]
-        table_data = [header_row]
-
-        for record in data:
-            row = []
-            for col in columns:
-                value = record.get(col['key'], '')
-                # Handle None values
-                if value is None:
-                    value = ''
-                # Truncate long values
-                str_value = str(value)
-                if len(str_value) > 50 and not is_aggregated:
-                    str_value = str_value[:47] + '...'
-                row.append(str_value)
-            table_data.append(row)
+        table_data = [[col['label'] for col in columns]] + rows
 
         # Calculate column widths
         page_width = self.pagesize[0] - 60  # margins
@@ -353,7 +416,7 @@ class ProfessionalPDFGenerator:
 
         # Alternating row colors - light blue tint
         for i in range(1, len(table_data)):
-            if i % 2 == 0:
+            if (first_index + i) % 2 == 0:
                 style_commands.append(
                     ('BACKGROUND', (0, i), (-1, i), ROW_ALT)
                 )
@@ -365,6 +428,37 @@ class ProfessionalPDFGenerator:
         table.setStyle(TableStyle(style_commands))
         return table
 
+    def _create_data_table(self, data: list, columns: list, is_aggregated: bool = False) -> Table:
+        """
+        Create a styled data table.
+
+        Args:
+            data: List of data dictionaries
+            columns: List of column definitions with 'key' and 'label'
+            is_aggregated: Whether this is an aggregated (grouped) table
+        """
+        if not data:
+            return Paragraph("No data available", self.styles['Normal'])
+
+        rows = [self._row_values(record, columns, is_aggregated) for record in data]
+        return self._build_table(rows, columns, is_aggregated)
+
+    def _create_streamed_table(self, data, columns: list):
+        """
+        Detail table of `data` (a list or any iterator of records, e.g. a
+        database cursor), rendered TABLE_CHUNK_ROWS rows at a time by
+        StreamedTable so only about a page of rows is held at once.
+        """
+        rows = (self._row_values(record, columns) for record in data)
+        first = next(rows, None)
+        if first is None:
+            return Paragraph("No data available", self.styles['Normal'])
+
+        def make_table(chunk, first_index):
+            return self._build_table(chunk, columns, first_index=first_index)
+
+        return StreamedTable(make_table, rows, TABLE_CHUNK_ROWS, pending=[first])
+
     def _create_summary_stats(self, report_data: dict) -> list:
         """Create summary statistics section with metrics."""
         elements = []
@@ -430,24 +524,25 @@ class ProfessionalPDFGenerator:
         elements.append(Spacer(1, 20))
         return elements
 
-    def generate(self, report_data: dict) -> BytesIO:
+    def generate(self, report_data: dict, output=None) -> BytesIO:
         """
         Generate the PDF report.
 
         Args:
             report_data: Dictionary containing:
-                - data: List of records
+                - data: List (or iterator) of records
                 - total: Total record count
                 - columns: Column definitions
                 - is_aggregated: Whether data is aggregated
                 - group_by: Group by field (if aggregated)
                 - group_label: Human-readable group label
                 - metrics: Summary metrics (optional)
+            output: Optional file-like object to write the PDF to
 
         Returns:
-            BytesIO buffer containing the PDF
+            `output` or a BytesIO buffer containing the PDF
         """
-        buffer = BytesIO()
+        buffer = output if output is not None else BytesIO()
 
         # Determine if landscape is needed based on column count
         columns = report_data.get('columns', [])
@@ -477,12 +572,15 @@ class ProfessionalPDFGenerator:
         # Summary stats & Metrics
         elements.extend(self._create_summary_stats(report_data))
 
-        # Data table
-        data_table = self._create_data_table(
-            data=report_data.get('data', []),
-            columns=columns,
-            is_aggregated=report_data.get('is_aggregated', False)
-        )
+        # Data table; detail rows are streamed a chunk at a time
+        if report_data.get('is_aggregated', False):
+            data_table = self._create_data_table(
+                data=report_data.get('data', []),
+                columns=columns,
+                is_aggregated=True
+            )
+        else:
+            data_table = self._create_streamed_table(report_data.get('data', []), columns)
         elements.append(data_table)
 
         # Build PDF with custom canvas for page numbers/footers
@@ -509,13 +607,11 @@ class ProfessionalPDFGenerator:
         Returns:
             Path to the saved file
         """
-        buffer = self.generate(report_data)
-
         # Ensure directory exists
         os.makedirs(os.path.dirname(file_path), exist_ok=True)
 
         with open(file_path, 'wb') as f:
-            f.write(buffer.getvalue())
+            self.generate(report_data, output=f)
 
         return file_path
 
@@ -525,7 +621,8 @@ def generate_dynamic_report_pdf(
     title: str,
     report_data: dict,
     institution_name: str = None,
-    orientation: str = 'auto'
+    orientation: str = 'auto',
+    output=None
 ) -> BytesIO:
     """
     Convenience function to generate a PDF report.
@@ -536,9 +633,10 @@ def generate_dynamic_report_pdf(
         report_data: Data from DynamicReportService.generate_report_data()
         institution_name: Optional institution name
         orientation: 'portrait', 'landscape', or 'auto'
+        output: Optional file-like object to write the PDF to
 
     Returns:
-        BytesIO buffer containing the PDF
+        `output` or a BytesIO buffer containing the PDF
     """
     # Auto-detect orientation based on columns
     if orientation == 'auto':
@@ -551,4 +649,4 @@ def generate_dynamic_report_pdf(
         orientation=orientation
     )
 
-    return generator.generate(report_data)
+    return generator.generate(report_data, output=output)
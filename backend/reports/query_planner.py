@@ -0,0 +1,183 @@
+"""
+Column-driven query planning for dynamic reports.
+
+A report used to load full model instances with a fixed select_related()
+list per report type, then read every cell through
+DynamicReportService._get_field_value (a dict of lambdas with hasattr
+checks). ReportPlan compiles the selected columns once per request into:
+
+- the field paths the columns read, e.g. full_name -> first_name, last_name
+- a values_list() projection when none of them is encrypted; otherwise
+  only() plus the minimal select_related() set, so just the selected
+  encrypted columns are fetched and (lazily) decrypted
+- one extractor per column that turns a fetched row into the cell value
+
+    plan = plan_report('students', ['student_id', 'full_name'])
+    for row in plan.apply(queryset).iterator():
+        record = plan.record(row)   # {'student_id': ..., 'full_name': ...}
+
+Columns that don't map to model fields fall back to full instances and
+_get_field_value (plan.paths is None).
+"""
+
+from functools import lru_cache
+
+from django.apps import apps
+
+from core.fields import EncryptedTextField
+
+from .schema_config import get_schema
+
+
+def _blank_if_none(value):
+    return '' if value is None else value
+
+
+def _identity(value):
+    return value
+
+
+def _full_name(first, last):
+    if first is None and last is None:
+        return ''
+    return f"{first} {last}"
+
+
+def _active_label(value):
+    return 'Active' if value else 'Inactive'
+
+
+def _yes_no(value):
+    return 'Yes' if value else 'No'
+
+
+def _column_spec(field_names, report_type, key):
+    """
+    (paths, combine) for a column: the field paths it reads and a function of
+    their values returning the cell, or None if it isn't backed by fields.
+    Mirrors DynamicReportService._get_field_value.
+    """
+    # Placements, scholarships and mobility reach the student's fields through `student`
+    via = 'student__' if 'student' in field_names and 'institution' not in field_names else ''
+
+    if key == 'full_name':
+        return ['first_name', 'last_name'], _full_name
+    if key == 'student_name':
+        return ['student__first_name', 'student__last_name'], _full_name
+    if key == 'student_id_number':
+        return ['student__student_id'], _blank_if_none
+    if key == 'gender' and via:
+        return ['student__gender'], _blank_if_none
+
+    relation_paths = {
+        'institution_name': f'{via}institution__name',
+        'faculty_name': 'faculty__name',
+        'department_name': 'department__name',
+        'program_name': f'{via}program__name',
+    }
+    if key in relation_paths:
+        return [relation_paths[key]], _blank_if_none
+    if key == 'program_level':
+        return [f'{via}selected_level'], _identity
+    if key == 'program_category':
+        return [f'{via}selected_category'], _identity
+
+    if key not in field_names:
+        return None
+    if key == 'is_active':
+        return [key], _active_label
+    if key in ('is_iseop', 'is_work_for_fees'):
+        return [key], _yes_no
+    return [key], _identity
+
+
+def _resolve_field(Model, path):
+    """Model field a double-underscore path ends on."""
+    *relations, name = path.split('__')
+    for relation in relations:
+        Model = Model._meta.get_field(relation).related_model
+    return Model._meta.get_field(name)
+
+
+def _path_getter(path):
+    """Read a field path off an instance, None if a relation on the way is empty."""
+    attrs = path.split('__')
+
+    def get(obj):
+        for attr in attrs:
+            if obj is None:
+                return None
+            obj = getattr(obj, attr)
+        return obj
+
+    return get
+
+
+class ReportPlan:
+    """Projection and per-column extractors of one report type and column list."""
+
+    def __init__(self, report_type, columns):
+        app_label, model_name = get_schema(report_type)['model'].split('.')
+        Model = apps.get_model(app_label, model_name)
+        field_names = {f.name for f in Model._meta.concrete_fields}
+
+        self.report_type = report_type
+        self.columns = list(columns)
+        self.paths = []
+        self.extractors = []
+        for key in self.columns:
+            spec = _column_spec(field_names, report_type, key)
+            if spec is None:
+                self.paths = None
+                self.extractors = None
+                break
+            paths, combine = spec
+            indexes = []
+            for path in paths:
+                if path not in self.paths:
+                    self.paths.append(path)
+                indexes.append(self.paths.index(path))
+            self.extractors.append((key, tuple(indexes), combine))
+
+        if self.paths is None:
+            self.encrypted = True
+            self.relations = ()
+            return
+        self.encrypted = any(isinstance(_resolve_field(Model, path), EncryptedTextField) for path in self.paths)
+        self.relations = tuple(sorted({path.rsplit('__', 1)[0] for path in self.paths if '__' in path}))
+        self._getters = [_path_getter(path) for path in self.paths]
+
+    @property
+    def uses_values(self):
+        """Whether rows are fetched as values_list() tuples rather than instances."""
+        return self.paths is not None and not self.encrypted
+
+    def apply(self, queryset):
+        """Narrow a report queryset to the planned projection and joins."""
+        if self.paths is None:
+            return queryset
+        if self.uses_values:
+            return queryset.values_list(*self.paths)
+        queryset = queryset.select_related(None)
+        if self.relations:
+            queryset = queryset.select_related(*self.relations)
+        return queryset.only(*self.paths)
+
+    def record(self, row):
+        """Column dict of a row fetched through apply()."""
+        if self.paths is None:
+            from .dynamic_service import DynamicReportService
+            return DynamicReportService.extract_record_data(row, self.columns, self.report_type)
+        if not self.uses_values:
+            row = [get(row) for get in self._getters]
+        return {key: combine(*[row[i] for i in indexes]) for key, indexes, combine in self.extractors}
+
+
+@lru_cache(maxsize=256)
+def _cached_plan(report_type, columns):
+    return ReportPlan(report_type, columns)
+
+
+def plan_report(report_type, columns):
+    """ReportPlan for a report type and column list (plans are immutable and cached)."""
+    return _cached_plan(report_type, tuple(columns))
@@ -0,0 +1,196 @@
+"""
+Result cache for dynamic reports.
+
+Building a report reads every matching row (and renders a PDF), yet the
+same report is typically requested again and again between two writes to
+the data behind it. Generated JSON/preview payloads and PDF bytes are kept
+in Redis (the default cache) under a hash of:
+
+- the normalized report config: filters without empty values, list values
+  sorted, the caller's ignored institution overrides dropped, plus the
+  variant (json, preview, or pdf with its title and orientation)
+- the caller's institution scope: the user's institution, or for
+  superusers the requested institution or 'all'
+- the current data versions of the models the report reads, e.g.
+  placements read IndustryPlacement and Student
+
+    payload = cached_report(config, 'json', lambda: DynamicReportService.generate_report_data(config))
+
+Data versions are counters per model and institution kept in Redis.
+Student, Staff, IndustryPlacement, StudentScholarship and
+InternationalMobility save()/delete() bump them when their transaction
+commits; queryset-level writes (bulk_create, bulk_update, update, COPY,
+delete) must call bump_report_version() themselves. A write bumps its
+institution's counter and the 'all' counter read by cross-institution
+reports; a write whose institution isn't known bumps the '*' counter,
+which every report of that model reads. Stale entries are never read
+again and expire after REPORT_CACHE_TIMEOUT.
+
+Hit counts are kept per process and flushed to Redis totals for all
+processes in batches (core.utils.cache_stats); see report_cache_stats()
+and GET /api/cache/stats/.
+"""
+
+import hashlib
+import json
+import os
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+
+from core.utils.cache_stats import CacheStats
+
+VERSION_KEY = 'report:version:{}:{}'
+RESULT_KEY = 'report:result:{}'
+STATS_KEY = 'report:stats:{}'
+STAT_NAMES = ('hits', 'misses', 'invalidations')
+
+# Scope of cross-institution (superuser) reports; bumped by every write
+ALL_INSTITUTIONS = 'all'
+# Bumped by writes of unknown institution; read by every report of the model
+ANY_INSTITUTION = '*'
+# Scope of users without an institution, whose reports are always empty
+NO_INSTITUTION = 'none'
+
+# Models each report type reads, as model labels
+REPORT_MODELS = {
+    'staff': ('staff.staff',),
+    'students': ('academic.student',),
+    'graduates': ('academic.student',),
+    'placements': ('academic.industryplacement', 'academic.student'),
+    'scholarships': ('academic.studentscholarship', 'academic.student'),
+    'mobility': ('academic.internationalmobility', 'academic.student'),
+}
+
+_stats = CacheStats(STATS_KEY, STAT_NAMES)
+
+
+def _timeout():
+    return getattr(settings, 'REPORT_CACHE_TIMEOUT', 15 * 60)
+
+
+def bump_report_version(model, institution_id):
+    """
+    Invalidate cached reports reading `model` (a model class or label) in an
+    institution once the current transaction commits (immediately outside
+    one). institution_id=None invalidates them in every institution.
+    """
+    label = model if isinstance(model, str) else model._meta.label_lower
+    if institution_id is None:
+        scopes = [ANY_INSTITUTION]
+    else:
+        scopes = [int(institution_id), ALL_INSTITUTIONS]
+
+    def bump():
+        for scope in scopes:
+            try:
+                cache.incr(VERSION_KEY.format(label, scope))
+            except ValueError:
+                # No counter yet: the next lookup starts a fresh one
+                pass
+        _stats.count('invalidations')
+
+    transaction.on_commit(bump)
+
+
+def _versions(labels, scope):
+    keys = [VERSION_KEY.format(label, s) for label in labels for s in (scope, ANY_INSTITUTION)]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            # Start from the clock rather than 1, so a counter lost from Redis
+            # can never come back at a value an old result is stored under
+            cache.add(key, time.time_ns() // 1000, None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def report_scope(config):
+    """Institution a report's rows are limited to, mirroring build_queryset's isolation."""
+    user = config.get('user')
+    if user is None or user.is_superuser:
+        institution_id = config.get('institution_id') or (config.get('filters') or {}).get('institution_id')
+        try:
+            return int(institution_id) if institution_id else ALL_INSTITUTIONS
+        except (TypeError, ValueError):
+            return ALL_INSTITUTIONS
+    return getattr(user, 'institution_id', None) or NO_INSTITUTION
+
+
+def _normalized(value):
+    if isinstance(value, dict):
+        return {key: _normalized(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        items = [_normalized(item) for item in value]
+        if all(not isinstance(item, (dict, list)) for item in items):
+            # Lists are IN filters: their order doesn't matter
+            items.sort(key=lambda item: (type(item).__name__, str(item)))
+        return items
+    return value
+
+
+def normalize_config(config):
+    """The parts of a report config that decide its result, in canonical form."""
+    user = config.get('user')
+    superuser = user is None or user.is_superuser
+    filters = {
+        key: value for key, value in (config.get('filters') or {}).items()
+        # build_queryset skips these
+        if value is not None and value != '' and value != 'all'
+        and (superuser or key != 'institution_id')
+    }
+    return {
+        'report_type': config.get('report_type'),
+        'filters': _normalized(filters),
+        'columns': list(config.get('columns') or []),
+        'group_by': config.get('group_by') or None,
+        'institution_id': config.get('institution_id') if superuser else None,
+    }
+
+
+def result_key(config, variant):
+    """Cache key of a report result: normalized config, variant, scope and data versions."""
+    scope = report_scope(config)
+    versions = _versions(REPORT_MODELS.get(config.get('report_type'), ()), scope)
+    payload = json.dumps(
+        [normalize_config(config), variant, scope, versions],
+        sort_keys=True, separators=(',', ':'), cls=DjangoJSONEncoder,
+    )
+    return RESULT_KEY.format(hashlib.sha256(payload.encode()).hexdigest())
+
+
+def cached_report(config, variant, build):
+    """
+    Cached result of a report variant, e.g. 'json', 'preview' or
+    ['pdf', title, orientation]; `build()` makes it on a miss.
+    """
+    key = result_key(config, variant)
+    result = cache.get(key)
+    if result is not None:
+        _stats.count('hits')
+        return result
+
+    _stats.count('misses')
+    result = build()
+    cache.set(key, result, _timeout())
+    return result
+
+
+def report_cache_stats():
+    """Hit counts of this process and of all processes (from Redis), with hit rates."""
+    counts = _stats.process()
+    totals = _stats.all_processes()
+    return {
+        'process': {'pid': os.getpid(), **counts, 'hit_rate': _hit_rate(counts)},
+        'all_processes': {**totals, 'hit_rate': _hit_rate(totals)},
+    }
+
+
+def _hit_rate(counts):
+    lookups = counts['hits'] + counts['misses']
+    if not lookups:
+        return None
+    return round(counts['hits'] / lookups, 4)
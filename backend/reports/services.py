@@ -1,7 +1,15 @@
+import tempfile
 from datetime import datetime
+
+from django.core.files import File
+from django.utils import timezone
+
 from .models import GeneratedReport
 from .pdf_utils import generate_pdf_file
 
+# Config keys stored on a GeneratedReport; the user is stored as requested_by
+DYNAMIC_CONFIG_KEYS = ('report_type', 'filters', 'columns', 'group_by', 'institution_id')
+
 class ReportService:
 
     @staticmethod
@@ -31,6 +39,92 @@ class ReportService:
         )
 
         report.file = file_path
+        report.file_size = report.file.size
+        report.status = 'Completed'
+        report.completed_at = timezone.now()
         report.save()
 
-        return report
\ No newline at end of file
+        return report
+
+    @staticmethod
+    def queue_dynamic_pdf(config: dict, title: str, orientation: str = 'auto'):
+        """
+        GeneratedReport for a dynamic report PDF rendered by a Celery worker.
+
+        Only the report's id travels through the broker: the worker reads the
+        config from the row and the user from requested_by, so the web
+        request returns as soon as the row exists.
+        """
+        from .result_cache import report_scope
+        from .tasks import generate_async_pdf_report
+
+        user = config['user']
+        scope = report_scope(config)
+        report = GeneratedReport.objects.create(
+            report_type=config['report_type'],
+            name=f"{title} - {datetime.today().strftime('%Y-%m-%d')}",
+            created_by=(user.email or user.username)[:100],
+            config={
+                **{key: config.get(key) for key in DYNAMIC_CONFIG_KEYS},
+                'title': title,
+                'orientation': orientation,
+            },
+            requested_by=user,
+            institution_id=scope if isinstance(scope, int) else None,
+            # render_dynamic_pdf() only claims Pending reports
+            status='Pending',
+        )
+
+        task = generate_async_pdf_report.delay(str(report.id))
+        # update(), not save(): the worker may already have moved the row on
+        GeneratedReport.objects.filter(pk=report.pk).update(task_id=task.id)
+        report.refresh_from_db()
+        return report
+
+    @staticmethod
+    def render_dynamic_pdf(report_id):
+        """
+        Render a queued dynamic report PDF to storage (GeneratedReport.file),
+        recording status, file size and completion time. Reports no longer
+        Pending (e.g. a redelivered task) are left as they are.
+        """
+        from .dynamic_service import DynamicReportService
+        from .pdf_generator import generate_dynamic_report_pdf
+
+        claimed = GeneratedReport.objects.filter(pk=report_id, status='Pending').update(status='Running')
+        report = GeneratedReport.objects.select_related('requested_by').get(pk=report_id)
+        if not claimed:
+            return report
+
+        try:
+            user = report.requested_by
+            if user is None:
+                raise ValueError("The user who requested this report no longer exists.")
+            config = {key: report.config.get(key) for key in DYNAMIC_CONFIG_KEYS}
+            config['user'] = user
+
+            # Records are streamed from the database into the PDF, which is
+            # written to a temporary file rather than held in memory
+            report_data = DynamicReportService.generate_report_stream(config)
+            with tempfile.TemporaryFile() as pdf_file:
+                generate_dynamic_report_pdf(
+                    report_type=report.report_type,
+                    title=report.config.get('title'),
+                    report_data=report_data,
+                    institution_name=DynamicReportService.pdf_institution_name(user, config.get('institution_id')),
+                    orientation=report.config.get('orientation', 'auto'),
+                    output=pdf_file
+                )
+                report.file.save(f"{report.id}.pdf", File(pdf_file), save=False)
+        except Exception as e:
+            report.status = 'Failed'
+            report.error = str(e)
+            report.completed_at = timezone.now()
+            report.save(update_fields=['status', 'error', 'completed_at'])
+            raise
+
+        report.file_size = report.file.size
+        report.status = 'Completed'
+        report.completed_at = timezone.now()
+        report.save(update_fields=['file', 'file_size', 'status', 'completed_at'])
+        return report
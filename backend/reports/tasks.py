@@ -1,46 +1,30 @@
 from celery import shared_task
-from .dynamic_service import DynamicReportService
-from .pdf_generator import generate_dynamic_report_pdf
-from django.core.files.storage import default_storage
-from django.core.files.base import ContentFile
-import time
+from .services import ReportService
 import logging
 
 logger = logging.getLogger(__name__)
 
 @shared_task(bind=True)
-def generate_async_pdf_report(self, report_type, config, user_email):
+def generate_async_pdf_report(self, report_id):
     """
     Celery task to generate heavy PDFs.
-    Instead of returning the PDF to the HTTP request, it saves it to disk (or S3)
-    and we could email the user a secure download link.
+
+    DynamicReportGenerateView (format=pdf, async=true) creates a
+    GeneratedReport holding the report config and passes only its id, so
+    nothing unserializable (the request user) goes through the broker. The
+    PDF is written to storage on the GeneratedReport, which records status
+    and file size; DownloadReportView serves it.
     """
-    logger.info(f"Starting background PDF generation for {report_type}")
-    
+    logger.info(f"Starting background PDF generation for report {report_id}")
+
     try:
-        # 1. Heavy Database Aggregation
-        report_data = DynamicReportService.generate_report_data(config)
-        
-        # 2. Heavy CPU PDF Generation
-        pdf_buffer = generate_dynamic_report_pdf(
-            report_type=report_type,
-            config=config,
-            report_data=report_data
-        )
-        
-        # 3. Save the PDF to permanent storage
-        filename = f"reports/async_{report_type}_{int(time.time())}.pdf"
-        saved_path = default_storage.save(filename, ContentFile(pdf_buffer.getvalue()))
-        
-        # 4. Notify the user (Pseudo-code)
-        # download_link = f"https://tesc.zchpc.ac.zw/media/{saved_path}"
-        # send_email("Your Report is Ready", f"Download here: {download_link}", user_email)
-        
-        return {
-            "status": "success",
-            "file_path": saved_path
-        }
-        
-    except Exception as e:
+        report = ReportService.render_dynamic_pdf(report_id)
+    except Exception:
         logger.exception("Failed to generate background PDF")
         raise
+
+    return {
+        "status": report.status.lower(),
+        "report_id": str(report.id),
+        "file_size": report.file_size,
+    }
@@ -1,5 +1,5 @@
 from django.urls import path
-from .views import GenerateReportView, DownloadReportView
+from .views import GenerateReportView, DownloadReportView, ReportStatusView
 from .dynamic_views import (
     ReportSchemaView,
     ReportSchemaListView,
@@ -12,6 +12,7 @@ urlpatterns = [
     # Legacy endpoints
     path("generate/", GenerateReportView.as_view()),
     path("download/<uuid:report_id>/", DownloadReportView.as_view()),
+    path("status/<uuid:report_id>/", ReportStatusView.as_view(), name="report-status"),
 
     # Dynamic report endpoints
     path("schemas/", ReportSchemaListView.as_view(), name="report-schema-list"),
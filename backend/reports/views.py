@@ -1,26 +1,132 @@
+import re
+
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from django.http import FileResponse, Http404
+from rest_framework.permissions import IsAuthenticated
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
 
 from .services import ReportService
 from .models import GeneratedReport
 from .serializers import GeneratedReportSerializer
 
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+# Bytes read from storage per chunk of a range response
+RANGE_CHUNK_SIZE = 64 * 1024
+
 class GenerateReportView(APIView):
     def post(self, request):
         report = ReportService.generate_report(request.data)
         serializer = GeneratedReportSerializer(report)
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
+
+def get_report_for(user, report_id):
+    """GeneratedReport the user may see: their own, their institution's, or any for superusers."""
+    try:
+        report = GeneratedReport.objects.get(id=report_id)
+    except GeneratedReport.DoesNotExist:
+        raise Http404("Report not found")
+
+    if (
+        user.is_superuser
+        or report.requested_by_id == user.id
+        or (report.institution_id and report.institution_id == getattr(user, 'institution_id', None))
+        # Reports from GenerateReportView have no owner
+        or (report.requested_by_id is None and report.config is None)
+    ):
+        return report
+    raise Http404("Report not found")
+
+
+class ReportStatusView(APIView):
+    """
+    GET /api/reports/status/<report_id>/
+
+    Status (Pending, Running, Completed, Failed), file size and error of a
+    report, for polling a background PDF.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, report_id):
+        report = get_report_for(request.user, report_id)
+        return Response(GeneratedReportSerializer(report).data)
+
+
 class DownloadReportView(APIView):
+    """
+    GET /api/reports/download/<report_id>/
+
+    The report's PDF. Supports single `Range: bytes=start-end` requests
+    (206 Partial Content), so large files can be resumed or fetched in parts.
+    """
+    permission_classes = [IsAuthenticated]
+
     def get(self, request, report_id):
-        try:
-            report = GeneratedReport.objects.get(id=report_id)
-        except GeneratedReport.DoesNotExist:
-            raise Http404("Report not found")
+        report = get_report_for(request.user, report_id)
 
+        if report.status in ('Pending', 'Running'):
+            return Response(
+                {"detail": "Report is still being generated.", "status": report.status},
+                status=status.HTTP_409_CONFLICT
+            )
+        if report.status == 'Failed':
+            return Response(
+                {"detail": "Report generation failed.", "status": report.status, "error": report.error},
+                status=status.HTTP_409_CONFLICT
+            )
         if not report.file:
             raise Http404("File missing")
 
-        return FileResponse(open(report.file.path, "rb"), content_type='application/pdf')
\ No newline at end of file
+        try:
+            f = report.file.open('rb')
+        except FileNotFoundError:
+            raise Http404("File missing")
+        return ranged_file_response(request, f, report.file.size, 'application/pdf', f"{report.name}.pdf")
+
+
+def ranged_file_response(request, f, size, content_type, filename):
+    """
+    FileResponse of an open file, or 206 with just the requested bytes for a
+    single-range `Range` header (416 if it lies outside the file). Other
+    Range forms (several ranges, other units) get the whole file.
+    """
+    match = RANGE_RE.match(request.headers.get('Range', '').strip())
+    if not match or not any(match.groups()):
+        response = FileResponse(f, content_type=content_type, as_attachment=True, filename=filename)
+        response['Accept-Ranges'] = 'bytes'
+        return response
+
+    first, last = match.groups()
+    if first:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    else:
+        # Suffix range: the last N bytes
+        start = max(size - int(last), 0)
+        end = size - 1
+    if start > end or start >= size:
+        f.close()
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+
+    def chunks():
+        try:
+            f.seek(start)
+            remaining = end - start + 1
+            while remaining > 0:
+                data = f.read(min(RANGE_CHUNK_SIZE, remaining))
+                if not data:
+                    break
+                remaining -= len(data)
+                yield data
+        finally:
+            f.close()
+
+    response = StreamingHttpResponse(chunks(), status=206, content_type=content_type)
+    response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    response['Content-Length'] = str(end - start + 1)
+    response['Accept-Ranges'] = 'bytes'
+    response['Content-Disposition'] = 'attachment; filename="{}"'.format(filename.replace('"', ''))
+    return response
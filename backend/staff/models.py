@@ -1,6 +1,9 @@
+from django.contrib.postgres.indexes import GinIndex
 from django.db import models
 from django.conf import settings
-from core.fields import EncryptedTextField   # 🔐 Custom AES-256 encrypted field
+from core.fields import EncryptedTextField, BlindIndexField, NgramIndexField   # 🔐 Custom AES-256 encrypted field
+from core.managers import EncryptedManager
+from reports.result_cache import bump_report_version
 
 
 # --- CHOICES ---
@@ -70,6 +73,14 @@ class Staff(models.Model):
     phone = EncryptedTextField()
     gender = EncryptedTextField(blank=True, null=True)
 
+    # 🔎 BLIND INDEXES (keyed digests used for search / exact lookups)
+    first_name_bidx = BlindIndexField(source_field='first_name')
+    last_name_bidx = BlindIndexField(source_field='last_name')
+    email_bidx = BlindIndexField(source_field='email')
+    phone_bidx = BlindIndexField(source_field='phone')
+    # Partial-name search (prefixes / fragments of first or last name)
+    name_tokens = NgramIndexField(source_fields=['first_name', 'last_name'])
+
     # Employment Details
     employee_id = models.CharField(max_length=50, unique=True)
     position = models.CharField(max_length=50, choices=STAFF_POSITIONS)
@@ -85,14 +96,32 @@ class Staff(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # Encrypted fields are decrypted on first access, not on load
+    objects = EncryptedManager()
+
     class Meta:
+        base_manager_name = 'objects'
         verbose_name_plural = "Staff Members"
         ordering = ['employee_id']
+        indexes = [
+            GinIndex(fields=['name_tokens'], name='staff_name_tokens_gin'),
+        ]
 
     @property
     def full_name(self):
         return f"{self.first_name} {self.last_name}"
 
+    # Cached dynamic reports (reports.result_cache) read staff
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        bump_report_version(self, self.institution_id)
+
+    def delete(self, *args, **kwargs):
+        institution_id = self.institution_id
+        result = super().delete(*args, **kwargs)
+        bump_report_version(self, institution_id)
+        return result
+
     def __str__(self):
         return f"{self.full_name} ({self.position})"
 
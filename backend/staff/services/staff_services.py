@@ -2,8 +2,13 @@
 import pandas as pd
 from django.db import transaction
 from django.core.exceptions import ValidationError
-from ..models import Staff, Vacancy
+from ..models import Staff, Vacancy, STAFF_POSITIONS, QUALIFICATIONS
+from faculties.hierarchy import get_hierarchy
 from faculties.models import Faculty, Department
+from core.utils.copy_loader import bulk_insert
+from core.utils.encryption_pipeline import EncryptionPipeline
+from core.utils.upload_validation import GENDER_MAP, RowErrors, choice_map, clean_text, normalize_choice, to_date
+from reports.result_cache import bump_report_version
 
 class StaffService:
     @staticmethod
@@ -34,114 +39,136 @@ class StaffService:
         
     
     @staticmethod
-    def bulk_create_from_file(file, institution_id):
+    def bulk_create_from_file(file, institution_id, progress=None):
         """
         Parses an Excel/CSV file and creates staff records.
         Auto-creates Faculties and Departments if they don't exist.
+        Rows are validated column by column (core.utils.upload_validation)
+        and encrypted in settings.ENCRYPTION_WORKERS processes before being
+        loaded with COPY on PostgreSQL (core.utils.copy_loader).
+        `progress(stage, rows_done, rows_total, error_count)` is called after
+        validation and after every inserted batch.
         """
         try:
             # 1. Read File
             if file.name.endswith('.csv'):
-                df = pd.read_csv(file)
+                df = pd.read_csv(file, dtype=str)
             else:
-                df = pd.read_excel(file)
+                df = pd.read_excel(file, dtype=str)
 
             # 2. Normalize headers
             df.columns = [c.strip().lower().replace(' ', '_') for c in df.columns]
 
-            # 3. Pre-fetch existing data (Optimization)
-            # Map: "faculty name (lower)" -> Faculty Object
-            faculties_map = {
-                f.name.strip().lower(): f 
-                for f in Faculty.objects.filter(institution_id=institution_id)
-            }
-            
-            # Map: "(faculty_id, dept name lower)" -> Department Object
-            # We assume departments are unique by name within a faculty
-            departments_map = {
-                (d.faculty_id, d.name.strip().lower()): d 
-                for d in Department.objects.filter(faculty__institution_id=institution_id)
-            }
-
-            staff_to_create = []
-            errors = []
-
-            # 4. Process Rows
-            for index, row in df.iterrows():
-                row_num = index + 2
-                
-                try:
-                    # --- A. Handle Faculty ---
-                    raw_f_name = str(row.get('faculty_name', 'General')).strip()
-                    f_name_key = raw_f_name.lower()
-                    
-                    faculty_obj = faculties_map.get(f_name_key)
-                    
+            # 3. Normalize columns
+            rows = pd.DataFrame(index=df.index)
+            for field in ['first_name', 'last_name', 'email', 'employee_id']:
+                rows[field] = clean_text(df, field)
+            rows['phone'] = clean_text(df, 'phone')
+            rows['specialization'] = clean_text(df, 'specialization')
+            rows['position'] = normalize_choice(clean_text(df, 'position', default='Other'), choice_map(STAFF_POSITIONS))
+            rows['qualification'] = normalize_choice(
+                clean_text(df, 'qualification', default='Other'), choice_map(QUALIFICATIONS)
+            )
+            gender = clean_text(df, 'gender')
+            rows['gender'] = normalize_choice(gender, GENDER_MAP, keep_unknown=False)
+            # Excel date cells arrive as '2024-01-05 00:00:00' (dtype=str)
+            rows['date_joined'], date_joined_invalid = to_date(clean_text(df, 'date_joined', default='2024-01-01'))
+            rows['faculty_name'] = clean_text(df, 'faculty_name', default='General')
+            rows['department_name'] = clean_text(df, 'department_name', default='General')
+
+            # 4. Validate
+            errors = RowErrors(rows.index)
+            errors.add(rows['first_name'] == '', "First Name is required.")
+            errors.add(rows['last_name'] == '', "Last Name is required.")
+            errors.add(rows['email'] == '', "Email is required.")
+            missing_id = errors.add(rows['employee_id'] == '', "Employee ID is required.")
+            errors.add(
+                ~missing_id & rows['employee_id'].duplicated(),
+                "Duplicate Employee ID '" + rows['employee_id'] + "' in the uploaded file.",
+            )
+            existing_ids = set(
+                Staff.objects.filter(employee_id__in=set(rows['employee_id']) - {''})
+                .values_list('employee_id', flat=True)
+            )
+            errors.add(
+                rows['employee_id'].isin(existing_ids),
+                "Employee ID '" + rows['employee_id'] + "' already exists.",
+            )
+            errors.add(
+                (gender != '') & rows['gender'].isna(),
+                "Invalid gender choice: " + gender + ". Gender must be 'Male' or 'Female'.",
+            )
+            errors.add(date_joined_invalid, "Invalid date joined. Use YYYY-MM-DD.")
+
+            error_list = errors.flat("Row " + (rows.index + 2).astype(str))
+            if progress:
+                progress('validating', len(rows), len(rows), len(error_list))
+            if error_list:
+                # Fail all if any errors, to maintain integrity
+                raise ValidationError({"detail": "Bulk upload failed.", "errors": error_list})
+
+            # 5. Save all staff
+            with transaction.atomic():
+                # Copies of the cached hierarchy (faculties.hierarchy):
+                # "faculty name (lower)" -> faculty, "(faculty_id, dept name lower)" -> department
+                hierarchy = get_hierarchy(institution_id)
+                faculties_map = dict(hierarchy.faculty_by_name)
+                departments_map = dict(hierarchy.department_by_name)
+
+                # Create missing faculties/departments once per distinct name
+                pairs = rows[['faculty_name', 'department_name']].drop_duplicates()
+                for raw_f_name, raw_d_name in pairs.itertuples(index=False):
+                    faculty_obj = faculties_map.get(raw_f_name.lower())
                     if not faculty_obj:
-                        # CREATE FACULTY ON THE FLY
                         faculty_obj = Faculty.objects.create(
                             institution_id=institution_id,
                             name=raw_f_name, # Use original casing
                             description="Auto-created via bulk upload",
                             status='Active'
                         )
-                        # Update cache so we don't create it again for the next row
-                        faculties_map[f_name_key] = faculty_obj
-
-                    # --- B. Handle Department ---
-                    raw_d_name = str(row.get('department_name', 'General')).strip()
-                    d_name_key = raw_d_name.lower()
-                    
-                    # Composite key to ensure we get the department belonging to THIS faculty
-                    dept_lookup_key = (faculty_obj.id, d_name_key)
-                    department_obj = departments_map.get(dept_lookup_key)
-
-                    if not department_obj:
-                        # CREATE DEPARTMENT ON THE FLY
-                        department_obj = Department.objects.create(
-                            faculty=faculty_obj,
+                        faculties_map[raw_f_name.lower()] = faculty_obj
+
+                    dept_lookup_key = (faculty_obj.id, raw_d_name.lower())
+                    if dept_lookup_key not in departments_map:
+                        departments_map[dept_lookup_key] = Department.objects.create(
+                            faculty_id=faculty_obj.id,
                             name=raw_d_name, # Use original casing
                             code=raw_d_name[:3].upper(), # Auto-generate a simple code
                             description="Auto-created via bulk upload"
                         )
-                        # Update cache
-                        departments_map[dept_lookup_key] = department_obj
 
-                    # --- C. Prepare Staff Object ---
-                    staff = Staff(
+                staff_to_create = []
+                for r in rows.to_dict('records'):
+                    faculty_obj = faculties_map[r['faculty_name'].lower()]
+                    staff_to_create.append(Staff(
                         institution_id=institution_id,
-                        first_name=row.get('first_name'),
-                        last_name=row.get('last_name'),
-                        email=row.get('email'),
-                        phone=row.get('phone', ''),
-                        employee_id=row.get('employee_id'),
-                        position=row.get('position', 'Other'),
-                        qualification=row.get('qualification', 'Other'),
-                        specialization=row.get('specialization', ''),
-                        # Basic date handling; pandas Timestamp to string or default
-                        date_joined=row.get('date_joined') or '2024-01-01', 
-                        
-                        # Link foreign keys
-                        faculty=faculty_obj,
-                        department=department_obj,
-                        
+                        first_name=r['first_name'],
+                        last_name=r['last_name'],
+                        email=r['email'],
+                        phone=r['phone'],
+                        gender=r['gender'] if pd.notna(r['gender']) else None,
+                        employee_id=r['employee_id'],
+                        position=r['position'],
+                        qualification=r['qualification'],
+                        specialization=r['specialization'],
+                        date_joined=r['date_joined'],
+                        faculty_id=faculty_obj.id,
+                        department_id=departments_map[(faculty_obj.id, r['department_name'].lower())].id,
                         is_active=True
-                    )
-                    staff_to_create.append(staff)
-
-                except Exception as e:
-                    errors.append(f"Row {row_num}: {str(e)}")
-
-            if errors:
-                # Decide: Fail all if any errors, or just report errors?
-                # Usually safer to fail all in bulk uploads to maintain integrity.
-                raise ValidationError({"detail": "Bulk upload failed.", "errors": errors})
-
-            # 5. Save all staff
-            with transaction.atomic():
-                Staff.objects.bulk_create(staff_to_create)
-                
-            return len(staff_to_create)
+                    ))
+                # COPY on PostgreSQL; an employee_id taken since validation is skipped
+                created = 0
+                with EncryptionPipeline(Staff) as pipeline:
+                    for start in range(0, len(staff_to_create), 5000):
+                        batch = pipeline.prepare(staff_to_create[start:start + 5000])
+                        created += len(bulk_insert(Staff, batch, 'employee_id'))
+                        if progress:
+                            progress('saving', min(start + 5000, len(staff_to_create)), len(rows), 0)
+                if created:
+                    # COPY skips Staff.save(): invalidate cached reports here
+                    bump_report_version(Staff, institution_id)
+
+            return created
 
         except Exception as e:
             if isinstance(e, ValidationError):
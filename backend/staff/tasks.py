@@ -0,0 +1,25 @@
+from celery import shared_task
+from django.core.exceptions import ValidationError
+from core.utils.upload_jobs import UploadProgress, open_upload, upload_error_payload
+from .services.staff_services import StaffService
+import logging
+
+logger = logging.getLogger(__name__)
+
+@shared_task(bind=True)
+def process_staff_upload(self, file_path, institution_id):
+    """
+    Celery task for large staff uploads. Receives the storage path of the
+    file saved by the web request; progress is published as PROGRESS state.
+    """
+    logger.info(f"Starting async staff upload for institution {institution_id}")
+    try:
+        with open_upload(file_path) as file_obj:
+            count = StaffService.bulk_create_from_file(file_obj, institution_id, progress=UploadProgress(self))
+    except ValidationError as e:
+        return {"status": "error", **upload_error_payload(e)}
+    except Exception:
+        logger.exception("Failed to process async staff upload")
+        raise
+
+    return {"status": "success", "imported": count}
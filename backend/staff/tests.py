@@ -1,3 +1,61 @@
-from django.test import TestCase
+import datetime
+import io
 
-# Create your tests here.
+from django.core.exceptions import ValidationError
+from django.test import TestCase, override_settings
+from openpyxl import Workbook
+
+from academic.models import Institution
+from staff.models import Staff
+from staff.services.staff_services import StaffService
+
+# Staff are encrypted and blind-indexed on save; don't depend on the keys in .env
+crypto_keys = override_settings(
+    FERNET_KEYS=['yBLS1mQrzuAhD23gMo8FPUGnV0lAKm_Q84Ifi1-mpj4='],
+    BLIND_INDEX_KEY='staff-tests-blind-index-key',
+)
+
+HEADERS = ['Employee ID', 'First Name', 'Last Name', 'Email', 'Gender', 'Date Joined']
+
+
+def staff_sheet(rows):
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.append(HEADERS)
+    for row in rows:
+        sheet.append(row)
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    buffer.seek(0)
+    buffer.name = 'staff.xlsx'
+    return buffer
+
+
+@crypto_keys
+class StaffBulkUploadDateTests(TestCase):
+    """bulk_create_from_file parses Date Joined whether it is a date cell or text."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.institution = Institution.objects.create(name="Test Poly", type="Polytechnic", location="Harare", established=1990)
+
+    def test_excel_date_cells_are_saved(self):
+        sheet = staff_sheet([
+            ['E001', 'Tendai', 'Moyo', 'tendai@example.com', 'Male', datetime.datetime(2024, 1, 5)],
+            ['E002', 'Rudo', 'Dube', 'rudo@example.com', 'Female', '2023-09-01'],
+            ['E003', 'Farai', 'Ncube', 'farai@example.com', 'Male', None],
+        ])
+        self.assertEqual(StaffService.bulk_create_from_file(sheet, self.institution.id), 3)
+        # date_joined is stored (encrypted) as ISO text, never '2024-01-05 00:00:00'
+        joined = {staff.employee_id: staff.date_joined for staff in Staff.objects.all()}
+        self.assertEqual(joined, {'E001': '2024-01-05', 'E002': '2023-09-01', 'E003': '2024-01-01'})
+
+    def test_invalid_date_is_a_row_error(self):
+        sheet = staff_sheet([
+            ['E001', 'Tendai', 'Moyo', 'tendai@example.com', 'Male', datetime.datetime(2024, 1, 5)],
+            ['E002', 'Rudo', 'Dube', 'rudo@example.com', 'Female', 'last spring'],
+        ])
+        with self.assertRaises(ValidationError) as raised:
+            StaffService.bulk_create_from_file(sheet, self.institution.id)
+        self.assertEqual(raised.exception.message_dict['errors'], ["Row 3: Invalid date joined. Use YYYY-MM-DD."])
+        self.assertFalse(Staff.objects.exists())
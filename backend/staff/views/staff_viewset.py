@@ -1,5 +1,5 @@
 from django.db.models import Count
-from rest_framework import viewsets, status, filters
+from rest_framework import viewsets, status
 from rest_framework.response import Response
 from rest_framework.decorators import action
 from rest_framework.parsers import MultiPartParser, FormParser, JSONParser 
@@ -9,6 +9,7 @@ from django.core.exceptions import ValidationError
 from ..models import Staff
 from ..serializers.staff_serializers import StaffSerializer
 from ..services.staff_services import StaffService
+from ..tasks import process_staff_upload
 
 # Optional Color Map for Charts
 COLOR_MAP = {
@@ -20,13 +21,19 @@ COLOR_MAP = {
 }
 
 from core.mixins import InstitutionalIsolationMixin
+from core.filters import BlindIndexSearchFilter
+from core.pagination import KeysetCursorPagination
+from core.utils.upload_jobs import save_upload, wants_async
 
 class StaffViewSet(InstitutionalIsolationMixin, viewsets.ModelViewSet):
     queryset = Staff.objects.all()
     serializer_class = StaffSerializer
     institution_lookup_path = 'institution'
-    filter_backends = [filters.SearchFilter]
-    search_fields = ['first_name', 'last_name', 'employee_id', 'email'] 
+    filter_backends = [BlindIndexSearchFilter]
+    search_fields = ['employee_id']
+    blind_index_search_fields = ['email']
+    ngram_search_fields = ['name_tokens']
+    pagination_class = KeysetCursorPagination
     parser_classes = (MultiPartParser, FormParser, JSONParser)
 
     def get_queryset(self):
@@ -154,6 +161,10 @@ class StaffViewSet(InstitutionalIsolationMixin, viewsets.ModelViewSet):
             else:
                 return Response({"detail": "Institution ID is required."}, status=status.HTTP_400_BAD_REQUEST)
 
+        if wants_async(request):
+            task = process_staff_upload.delay(save_upload(file_obj, 'staff'), institution_id)
+            return Response({"task_id": task.id}, status=status.HTTP_202_ACCEPTED)
+
         try:
             count = StaffService.bulk_create_from_file(file_obj, institution_id)
             return Response(
@@ -99,6 +99,10 @@ class AuditTrail(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Matches CreatedAtCursorPagination's (-created_at, -id) ordering
+            models.Index(fields=['-created_at', '-id'], name='audit_created_id_idx'),
+        ]
 
     def __str__(self):
         return f"{self.user} - {self.action} on {self.created_at}"
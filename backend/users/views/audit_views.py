@@ -1,5 +1,6 @@
 from rest_framework import viewsets, permissions
 from core.mixins import InstitutionalIsolationMixin
+from core.pagination import CreatedAtCursorPagination
 from ..models import AuditTrail
 from ..serializers.audit_serializers import AuditTrailSerializer
 
@@ -12,5 +13,6 @@ class AuditTrailViewSet(InstitutionalIsolationMixin, viewsets.ReadOnlyModelViewS
     serializer_class = AuditTrailSerializer
     permission_classes = [permissions.IsAuthenticated]
     institution_lookup_path = 'institution'
+    pagination_class = CreatedAtCursorPagination
     
     # Optionally add filtering by module, user, date, etc.
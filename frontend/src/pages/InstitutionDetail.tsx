@@ -30,6 +30,7 @@ import {
   Download
 } from "lucide-react";
 import apiClient from "@/services/api";
+import { getAll } from "@/services/pagination";
 import { Badge } from "@/components/ui/badge";
 import { Card, CardContent, CardHeader, CardTitle } from "@/components/ui/card";
 import {
@@ -66,9 +67,8 @@ function DynamicDataTable({ endpoint, institutionId, categoryTitle }: { endpoint
     queryFn: async () => {
       // We must pass institution_id to filter the data for this specific institution
       const separator = endpoint.includes("?") ? "&" : "?";
-      const res = await apiClient.get(`${endpoint}${separator}institution_id=${institutionId}&institution=${institutionId}`);
-      // Some endpoints return paginated data (res.data.results), others return arrays (res.data)
-      return Array.isArray(res.data) ? res.data : (res.data?.results || []);
+      // Paginated endpoints are followed to the last page; the others return arrays
+      return getAll(`${endpoint}${separator}institution_id=${institutionId}&institution=${institutionId}`);
     }
   });
 
@@ -1,11 +1,11 @@
 import apiClient from "./api";
+import { getAll } from "./pagination";
 import { 
   Program, 
   Facility, 
   Staff, 
   StaffWriteData, 
-  StaffSummaryStats,
-  PaginatedResponse 
+  StaffSummaryStats
 } from "@/lib/types/academic.types";
 
 // --- Facility & Program ---
@@ -36,16 +36,9 @@ export const getStaffSummary = async (institutionId?: number): Promise<StaffSumm
   return response.data;
 };
 
-/** Fetch All Staff (Paginated) */
-export const getAllStaff = async (
-  page: number = 1, 
-  pageSize: number = 25,
-  search?: string
-): Promise<PaginatedResponse<Staff>> => {
-  const response = await apiClient.get<PaginatedResponse<Staff>>("/staff/members/", {
-    params: { page, page_size: pageSize, search },
-  });
-  return response.data;
+/** Fetch All Staff (follows every cursor page) */
+export const getAllStaff = async (search?: string): Promise<Staff[]> => {
+  return getAll<Staff>("/staff/members/", { search });
 };
 
 export const getStaffById = async (id: number): Promise<Staff> => {
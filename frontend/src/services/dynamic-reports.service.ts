@@ -12,6 +12,8 @@ import type {
   ReportConfig,
   ReportDataResponse,
   RelationOptionsResponse,
+  QueuedReportResponse,
+  GeneratedReportStatusResponse,
 } from '../lib/types/report.types';
 
 const REPORTS_BASE = '/v1/reports';
@@ -91,22 +93,53 @@ export const generateReportData = async (
   return response.data;
 };
 
+// Seconds between status polls of a background PDF, and how long to wait in all
+const PDF_POLL_INTERVAL = 2;
+const PDF_POLL_TIMEOUT = 600;
+
+const sleep = (seconds: number) => new Promise((resolve) => setTimeout(resolve, seconds * 1000));
+
 /**
  * Generate and download PDF report
+ *
+ * The PDF is rendered by a background worker: the request is queued
+ * (202 with a report_id), its status polled until Completed, and the file
+ * fetched from the download endpoint, so a large report doesn't hold a
+ * request open while every row is written.
  */
 export const generateReportPDF = async (
   config: Omit<ReportConfig, 'format'>
 ): Promise<void> => {
-  const response = await apiClient.post(
+  const queued = await apiClient.post<QueuedReportResponse>(
     `${REPORTS_BASE}/dynamic/generate/`,
     {
       ...config,
       format: 'pdf',
-    },
-    {
-      responseType: 'blob',
+      async: true,
     }
   );
+  const reportId = queued.data.report_id;
+
+  let waited = 0;
+  let status = queued.data.status;
+  while (status !== 'Completed') {
+    if (status === 'Failed') {
+      throw new Error('Report generation failed');
+    }
+    if (waited >= PDF_POLL_TIMEOUT) {
+      throw new Error('Report generation timed out');
+    }
+    await sleep(PDF_POLL_INTERVAL);
+    waited += PDF_POLL_INTERVAL;
+    const polled = await apiClient.get<GeneratedReportStatusResponse>(
+      `${REPORTS_BASE}/status/${reportId}/`
+    );
+    status = polled.data.status;
+  }
+
+  const response = await apiClient.get(`${REPORTS_BASE}/download/${reportId}/`, {
+    responseType: 'blob',
+  });
 
   // Create download link
   const blob = new Blob([response.data], { type: 'application/pdf' });
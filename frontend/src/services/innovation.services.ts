@@ -1,4 +1,5 @@
 import apiClient from "./api";
+import { getAll } from "./pagination";
 import type { AxiosResponse } from "axios";
 import type { DashboardInnovationStats, DetailedInnovation } from "@/lib/types/academic.types";
 
@@ -70,8 +71,7 @@ export const IseopService = {
     if (params?.work_area) searchParams.append('work_area', params.work_area);
     if (params?.status) searchParams.append('status', params.status);
     const query = searchParams.toString() ? `?${searchParams.toString()}` : '';
-    const response = await apiClient.get(`/iseop/students/${query}`);
-    return response.data;
+    return getAll(`/iseop/students/${query}`);
   },
 
   getStudent: async (id: number | string) => {
@@ -1,5 +1,6 @@
 // services/iseop.service.ts
 import apiClient from "./api";
+import { getAll } from "./pagination";
 import { IseopStudent, IseopStats } from "@/lib/types/iseop.types"; // Assuming this is where your types are
 
 const ENDPOINTS = {
@@ -10,8 +11,7 @@ const ENDPOINTS = {
  * Fetch all ISEOP students
  */
 export const getIseopStudents = async (): Promise<IseopStudent[]> => {
-  const response = await apiClient.get<IseopStudent[]>(ENDPOINTS.STUDENTS);
-  return response.data;
+  return getAll<IseopStudent>(ENDPOINTS.STUDENTS);
 };
 
 /**
@@ -0,0 +1,46 @@
+import apiClient from "./api";
+
+// List endpoints are cursor-paginated (core.pagination.KeysetCursorPagination).
+// Ask for the largest page the server allows and follow `next` until the end.
+export const PAGE_SIZE = 200;
+
+export interface CursorPage<T> {
+  next: string | null;
+  previous: string | null;
+  results: T[];
+  [extra: string]: unknown;
+}
+
+// `next` is an absolute URL; only its cursor is reused so the request still
+// goes through apiClient (base URL, auth header, token refresh).
+export const cursorFrom = (next: string | null) =>
+  next ? new URL(next).searchParams.get("cursor") : null;
+
+/**
+ * Fetches every page of a list endpoint. The first page's extra keys
+ * (e.g. report totals) are kept; `results` holds the rows of all pages.
+ * Endpoints that still answer with a bare array are returned as one page.
+ */
+export const getAllPages = async <R extends { results: unknown[] } = CursorPage<unknown>>(
+  url: string,
+  params: object = {}
+): Promise<R> => {
+  const first = await apiClient.get(url, { params: { ...params, page_size: PAGE_SIZE } });
+  if (Array.isArray(first.data)) {
+    return { next: null, previous: null, results: first.data } as R;
+  }
+  const page = first.data as R & CursorPage<unknown>;
+  const results = [...page.results];
+  let cursor = cursorFrom(page.next);
+  while (cursor) {
+    const res = await apiClient.get<CursorPage<unknown>>(url, {
+      params: { ...params, page_size: PAGE_SIZE, cursor },
+    });
+    results.push(...res.data.results);
+    cursor = cursorFrom(res.data.next);
+  }
+  return { ...page, next: null, results } as R;
+};
+
+export const getAll = async <T>(url: string, params: object = {}): Promise<T[]> =>
+  (await getAllPages<CursorPage<T>>(url, params)).results;
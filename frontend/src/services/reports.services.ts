@@ -1,4 +1,4 @@
-import apiClient from "./api";
+import { getAllPages } from "./pagination";
 
 // Define interfaces for STEM Students
 export interface StemStudent {
@@ -30,8 +30,7 @@ export async function getStemStudents(institution_id?: number | string, search_q
   if (params.length > 0) {
     url += `?${params.join("&")}`;
   }
-  const response = await apiClient.get<StemStudentsAPIResponse>(url);
-  return response.data;
+  return getAllPages<StemStudentsAPIResponse>(url);
 }
 
 // Define interfaces for Inclusivity Students
@@ -65,8 +64,7 @@ export async function getInclusivityStudents(institution_id?: number | string, s
   if (params.length > 0) {
     url += `?${params.join("&")}`;
   }
-  const response = await apiClient.get<InclusivityStudentsAPIResponse>(url);
-  return response.data;
+  return getAllPages<InclusivityStudentsAPIResponse>(url);
 }
 
 // Define interfaces for In-Country Transfers
@@ -96,8 +94,7 @@ export async function getInCountryTransfers(institution_id?: number | string, se
   if (params.length > 0) {
     url += `?${params.join("&")}`;
   }
-  const response = await apiClient.get<InCountryTransfersAPIResponse>(url);
-  return response.data;
+  return getAllPages<InCountryTransfersAPIResponse>(url);
 }
 
 // Define interfaces for Possible Graduates
@@ -132,8 +129,7 @@ export async function getPossibleGraduates(institution_id?: number | string, sea
   if (params.length > 0) {
     url += `?${params.join("&")}`;
   }
-  const response = await apiClient.get<PossibleGraduatesAPIResponse>(url);
-  return response.data;
+  return getAllPages<PossibleGraduatesAPIResponse>(url);
 }
 
 // Define interfaces for Specialized Students
@@ -166,8 +162,7 @@ export async function getSpecializedStudents(institution_id?: number | string, s
   if (params.length > 0) {
     url += `?${params.join("&")}`;
   }
-  const response = await apiClient.get<SpecializedStudentsAPIResponse>(url);
-  return response.data;
+  return getAllPages<SpecializedStudentsAPIResponse>(url);
 }
 
 // Define interfaces for Critical Students
@@ -200,6 +195,5 @@ export async function getCriticalStudents(institution_id?: number | string, sear
   if (params.length > 0) {
     url += `?${params.join("&")}`;
   }
-  const response = await apiClient.get<CriticalStudentsAPIResponse>(url);
-  return response.data;
+  return getAllPages<CriticalStudentsAPIResponse>(url);
 }
@@ -1,6 +1,7 @@
 // services/student.service.ts
 
 import apiClient from "./api"; // Use your new api.ts
+import { getAll } from "./pagination";
 import { 
   Student, 
   StudentWriteData, 
@@ -14,11 +15,7 @@ const BASE_PATH = "/academic/students/";
  * Fetch all students
  */
 export const getAllStudents = async (): Promise<Student[]> => {
-  console.log("Fetching all students...");
-  const response = await apiClient.get<Student[]>(BASE_PATH);
-  console.log(response);
-  
-  return response.data;
+  return getAll<Student>(BASE_PATH);
 };
 
 /**
@@ -64,8 +61,7 @@ export const getGraduates = async (institutionId?: string | number): Promise<Stu
   const params: any = { status: 'Graduated' };
   if (institutionId) params.institution = institutionId;
   
-  const response = await apiClient.get<StudentGraduate[]>(BASE_PATH, { params });
-  return response.data;
+  return getAll<StudentGraduate>(BASE_PATH, params);
 };
 
 /**
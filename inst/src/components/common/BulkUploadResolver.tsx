@@ -87,6 +87,9 @@ interface BackendRowResult {
   data: any;
 }
 
+// Validated rows are staged on the server; pages are fetched with the cursor of the `next` link
+const cursorFrom = (next: string | null) => (next ? new URL(next).searchParams.get("cursor") : null);
+
 interface Props {
   moduleType: string;
   onSuccess: () => void;
@@ -98,6 +101,11 @@ export function BulkUploadResolver({ moduleType, onSuccess }: Props) {
   const [previewHeaders, setPreviewHeaders] = useState<string[]>([]);
   const [previewRows, setPreviewRows] = useState<any[]>([]);
   const [validationResults, setValidationResults] = useState<BackendRowResult[]>([]);
+  const [uploadId, setUploadId] = useState<string | null>(null);
+  const [rowCount, setRowCount] = useState(0);
+  const [errorCount, setErrorCount] = useState(0);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [isLoadingMore, setIsLoadingMore] = useState(false);
   
   const [isUploading, setIsUploading] = useState(false);
   const [isCommitting, setIsCommitting] = useState(false);
@@ -111,6 +119,7 @@ export function BulkUploadResolver({ moduleType, onSuccess }: Props) {
     setPreviewHeaders([]);
     setPreviewRows([]);
     setValidationResults([]);
+    setUploadId(null);
     setValidationError(null);
   }, [moduleType]);
 
@@ -201,9 +210,12 @@ export function BulkUploadResolver({ moduleType, onSuccess }: Props) {
       const res = await apiClient.post(`/academic/ingestion/validate/${moduleType}/`, formData);
       if (res.data && res.data.status === "success" && Array.isArray(res.data.processed_data)) {
         setValidationResults(res.data.processed_data);
-        const errorRows = res.data.processed_data.filter((r: BackendRowResult) => r.status === "Error");
-        if (errorRows.length > 0) {
-          toast.error(`Validation complete with ${errorRows.length} error(s). Please review row statuses.`);
+        setUploadId(res.data.upload_id);
+        setRowCount(res.data.row_count);
+        setErrorCount(res.data.error_count);
+        setNextCursor(cursorFrom(res.data.next));
+        if (res.data.error_count > 0) {
+          toast.error(`Validation complete with ${res.data.error_count} error(s). Please review row statuses.`);
         } else {
           toast.success("Validation successful! All rows are ready to commit.");
         }
@@ -218,27 +230,41 @@ export function BulkUploadResolver({ moduleType, onSuccess }: Props) {
     }
   };
 
+  const handleLoadMore = async () => {
+    if (!uploadId || !nextCursor) return;
+    setIsLoadingMore(true);
+    try {
+      const res = await apiClient.get(`/academic/ingestion/uploads/${uploadId}/rows/`, {
+        params: { cursor: nextCursor },
+      });
+      setValidationResults(prev => [...prev, ...res.data.results]);
+      setNextCursor(cursorFrom(res.data.next));
+    } catch (e) {
+      toast.error("Failed to load more rows");
+    } finally {
+      setIsLoadingMore(false);
+    }
+  };
+
   const handleCommit = async () => {
-    if (validationResults.length === 0) return;
+    if (!uploadId) return;
     setIsCommitting(true);
     try {
-      const payload = {
-        data: validationResults,
-        institution_id: user?.institution?.id
-      };
-      const res = await apiClient.post(`/academic/ingestion/commit/${moduleType}/`, payload);
+      // Only the upload id is sent: the rows are already on the server
+      const res = await apiClient.post(`/academic/ingestion/uploads/${uploadId}/commit/`);
       if (res.data && res.data.success) {
         toast.success(`Successfully imported ${res.data.imported} records!`);
         setFile(null);
         setPreviewHeaders([]);
         setPreviewRows([]);
         setValidationResults([]);
+        setUploadId(null);
         onSuccess();
       } else {
         toast.error("Commit failed");
       }
     } catch (e: any) {
-      const detail = e.response?.data?.error || "Commit failed";
+      const detail = e.response?.data?.detail || e.response?.data?.error || "Commit failed";
       toast.error(detail);
     } finally {
       setIsCommitting(false);
@@ -246,7 +272,7 @@ export function BulkUploadResolver({ moduleType, onSuccess }: Props) {
   };
 
   const hasErrors = validationResults.some(r => r.status === "Error");
-  const readyCount = validationResults.filter(r => r.status === "Success").length;
+  const readyCount = rowCount - errorCount;
 
   return (
     <div className="space-y-4">
@@ -288,7 +314,7 @@ export function BulkUploadResolver({ moduleType, onSuccess }: Props) {
                 <FileSpreadsheet className="h-4 w-4 text-green-600 shrink-0" />
                 <span className="truncate font-medium">{file.name}</span>
               </div>
-              <Button variant="ghost" size="icon" className="h-6 w-6" onClick={() => { setFile(null); setPreviewHeaders([]); setPreviewRows([]); setValidationResults([]); setValidationError(null); }}>
+              <Button variant="ghost" size="icon" className="h-6 w-6" onClick={() => { setFile(null); setPreviewHeaders([]); setPreviewRows([]); setValidationResults([]); setUploadId(null); setValidationError(null); }}>
                 <X className="h-4 w-4" />
               </Button>
             </div>
@@ -351,11 +377,11 @@ export function BulkUploadResolver({ moduleType, onSuccess }: Props) {
             <div>
               <h4 className="text-xs font-semibold text-foreground">Validation Results</h4>
               <p className="text-[11px] text-muted-foreground">
-                {readyCount} rows ready. {validationResults.length - readyCount} rows contain errors.
+                {readyCount} rows ready. {errorCount} rows contain errors.
               </p>
             </div>
             <div className="flex gap-2">
-              <Button variant="outline" size="sm" onClick={() => setValidationResults([])} className="h-8">Re-validate</Button>
+              <Button variant="outline" size="sm" onClick={() => { setValidationResults([]); setUploadId(null); }} className="h-8">Re-validate</Button>
               <Button onClick={handleCommit} disabled={readyCount === 0 || isCommitting} size="sm" className="h-8">
                 {isCommitting && <Loader2 className="mr-1.5 h-3.5 w-3.5 animate-spin" />}
                 Commit {readyCount} Valid Rows
@@ -393,6 +419,12 @@ export function BulkUploadResolver({ moduleType, onSuccess }: Props) {
               </TableBody>
             </Table>
           </div>
+          {nextCursor && (
+            <Button variant="ghost" size="sm" onClick={handleLoadMore} disabled={isLoadingMore} className="w-full h-8 text-xs">
+              {isLoadingMore && <Loader2 className="mr-1.5 h-3.5 w-3.5 animate-spin" />}
+              Showing {validationResults.length} of {rowCount} rows. Load more
+            </Button>
+          )}
         </div>
       )}
     </div>
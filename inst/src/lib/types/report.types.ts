@@ -131,6 +131,31 @@ export interface RelationOptionsResponse {
   options: RelationOption[];
 }
 
+/**
+ * Background PDF status (Pending, Running, Completed, Failed)
+ */
+export type GeneratedReportStatus = 'Pending' | 'Running' | 'Completed' | 'Failed';
+
+/**
+ * Response of a PDF request sent with async: true (202 Accepted)
+ */
+export interface QueuedReportResponse {
+  report_id: string;
+  task_id: string;
+  status: GeneratedReportStatus;
+}
+
+/**
+ * Polled status of a background PDF
+ */
+export interface GeneratedReportStatusResponse {
+  id: string;
+  name: string;
+  status: GeneratedReportStatus;
+  file_size: number | null;
+  error: string;
+}
+
 /**
  * Report builder state
  */
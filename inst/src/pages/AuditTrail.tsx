@@ -1,5 +1,7 @@
 import { useState, useEffect } from "react";
 import apiClient from "@/services/api";
+import { CursorPage, cursorFrom } from "@/services/pagination";
+import { Button } from "@/components/ui/button";
 import {
   Table,
   TableBody,
@@ -25,6 +27,9 @@ interface AuditLog {
 export default function AuditTrail() {
   const [logs, setLogs] = useState<AuditLog[]>([]);
   const [isLoading, setIsLoading] = useState(true);
+  // Cursor of the next (older) page; null once the oldest log is shown
+  const [cursor, setCursor] = useState<string | null>(null);
+  const [isLoadingMore, setIsLoadingMore] = useState(false);
 
   useEffect(() => {
     fetchLogs();
@@ -33,8 +38,9 @@ export default function AuditTrail() {
   const fetchLogs = async () => {
     try {
       setIsLoading(true);
-      const response = await apiClient.get("/users/audit-logs/");
-      setLogs(response.data);
+      const response = await apiClient.get<CursorPage<AuditLog>>("/users/audit-logs/");
+      setLogs(response.data.results);
+      setCursor(cursorFrom(response.data.next));
     } catch (error) {
       console.error("Failed to fetch audit logs", error);
       toast.error("Failed to load audit logs");
@@ -43,6 +49,22 @@ export default function AuditTrail() {
     }
   };
 
+  const fetchOlderLogs = async () => {
+    try {
+      setIsLoadingMore(true);
+      const response = await apiClient.get<CursorPage<AuditLog>>("/users/audit-logs/", {
+        params: { cursor },
+      });
+      setLogs((current) => [...current, ...response.data.results]);
+      setCursor(cursorFrom(response.data.next));
+    } catch (error) {
+      console.error("Failed to fetch audit logs", error);
+      toast.error("Failed to load audit logs");
+    } finally {
+      setIsLoadingMore(false);
+    }
+  };
+
   return (
     <div className="space-y-6">
       <div>
@@ -96,6 +118,15 @@ export default function AuditTrail() {
           </TableBody>
         </Table>
       </div>
+
+      {cursor && (
+        <div className="flex justify-center">
+          <Button variant="outline" onClick={fetchOlderLogs} disabled={isLoadingMore}>
+            {isLoadingMore && <Loader2 className="mr-2 h-4 w-4 animate-spin" />}
+            Load older activity
+          </Button>
+        </div>
+      )}
     </div>
   );
 }
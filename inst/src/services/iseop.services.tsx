@@ -1,4 +1,5 @@
 import apiClient from "./api";
+import { getAll } from "./pagination";
 
 // ----------------- TYPES -----------------
 export interface IseopStudent {
@@ -42,8 +43,7 @@ const ENDPOINTS = {
 
 // ----------------- STUDENTS -----------------
 export const getStudents = async (params?: { institution_id?: number; search?: string }) => {
-  const response = await apiClient.get<IseopStudent[]>(ENDPOINTS.STUDENTS, { params });
-  return response.data;
+  return getAll<IseopStudent>(ENDPOINTS.STUDENTS, params);
 };
 
 export const createStudent = async (data: Partial<IseopStudent>) => {
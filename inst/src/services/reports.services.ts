@@ -1,4 +1,4 @@
-import apiClient from "./api";
+import { getAllPages } from "./pagination";
 
 // Define interfaces for STEM Students
 export interface StemStudent {
@@ -24,8 +24,7 @@ export async function getStemStudents(institution_id: number, search_query?: str
   if (search_query) {
     url += `&search=${search_query}`;
   }
-  const response = await apiClient.get<StemStudentsAPIResponse>(url);
-  return response.data;
+  return getAllPages<StemStudentsAPIResponse>(url);
 }
 
 // Define interfaces for Inclusivity Students
@@ -52,8 +51,7 @@ export async function getInclusivityStudents(institution_id: number, search_quer
   if (search_query) {
     url += `&search=${search_query}`;
   }
-  const response = await apiClient.get<InclusivityStudentsAPIResponse>(url);
-  return response.data;
+  return getAllPages<InclusivityStudentsAPIResponse>(url);
 }
 
 // Define interfaces for In-Country Transfers
@@ -76,8 +74,7 @@ export async function getInCountryTransfers(institution_id: number, search_query
   if (search_query) {
     url += `&search=${search_query}`;
   }
-  const response = await apiClient.get<InCountryTransfersAPIResponse>(url);
-  return response.data;
+  return getAllPages<InCountryTransfersAPIResponse>(url);
 }
 
 // Define interfaces for Possible Graduates
@@ -105,8 +102,7 @@ export async function getPossibleGraduates(institution_id: number, search_query?
   if (search_query) {
     url += `&search=${search_query}`;
   }
-  const response = await apiClient.get<PossibleGraduatesAPIResponse>(url);
-  return response.data;
+  return getAllPages<PossibleGraduatesAPIResponse>(url);
 }
 
 // Define interfaces for Specialized Students
@@ -132,8 +128,7 @@ export async function getSpecializedStudents(institution_id: number, search_quer
   if (search_query) {
     url += `&search=${search_query}`;
   }
-  const response = await apiClient.get<SpecializedStudentsAPIResponse>(url);
-  return response.data;
+  return getAllPages<SpecializedStudentsAPIResponse>(url);
 }
 
 // Define interfaces for Critical Students
@@ -159,6 +154,5 @@ export async function getCriticalStudents(institution_id: number, search_query?:
   if (search_query) {
     url += `&search=${search_query}`;
   }
-  const response = await apiClient.get<CriticalStudentsAPIResponse>(url);
-  return response.data;
+  return getAllPages<CriticalStudentsAPIResponse>(url);
 }
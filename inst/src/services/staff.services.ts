@@ -1,6 +1,7 @@
 import apiClient from "./api";
+import { getAll } from "./pagination";
 import * as XLSX from "xlsx"; // Import SheetJS
-import { Staff, StaffFilters, PaginatedResponse, CreateStaffData, Vacancy } from "@/lib/types/academic.types";
+import { Staff, StaffFilters, CreateStaffData, Vacancy } from "@/lib/types/academic.types";
 // --- Types ---
 
 export interface Staff {
@@ -79,15 +80,8 @@ const END_POINT = '/staff/members/';
 const VACANCY_ENDPOINT = '/staff/vacancies/';
 
 // --- Staff Services ---
-export const getStaff = async (
-  filters?: StaffFilters,
-  page: number = 1,
-  pageSize: number = 50
-): Promise<PaginatedResponse<Staff>> => {
-  const response = await apiClient.get<PaginatedResponse<Staff>>(END_POINT, {
-    params: { ...filters, page, page_size: pageSize },
-  });
-  return response.data; // contains count, next, previous, results
+export const getStaff = async (filters?: StaffFilters): Promise<Staff[]> => {
+  return getAll<Staff>(END_POINT, filters);
 };
 
 export const getStaffById = async (id: number) => {
@@ -1,4 +1,5 @@
 import apiClient from "./api";
+import { getAll } from "./pagination";
 
 // --- Types ---
 export interface Student {
@@ -92,10 +93,7 @@ export const getStudents = async (filters?: StudentFilters) => {
     if (params.institution_id === undefined && params.institution !== undefined) {
       params.institution_id = params.institution;
     }
-    const response = await apiClient.get<Student[]>(END_POINT, {
-      params,
-    });
-    return response.data;
+    return await getAll<Student>(END_POINT, params);
   } catch (error) {
     console.error("Error fetching students:", error);
     throw error;
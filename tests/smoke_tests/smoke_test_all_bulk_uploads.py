@@ -170,10 +170,9 @@ def run_all_bulk_upload_smoke_tests():
                 print(f"❌ Row validation failed for {module_name}: {processed[0]['messages']}")
                 sys.exit(1)
             
-            # C. Commit
+            # C. Commit the staged rows by upload id
             commit_res = requests.post(
-                f"{BASE_URL}/academic/ingestion/commit/{module_name}/",
-                json={'data': processed, 'institution_id': inst_id},
+                f"{BASE_URL}/academic/ingestion/uploads/{val_json['upload_id']}/commit/",
                 headers=admin_headers,
                 verify=False
             )